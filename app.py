@@ -1,213 +1,37 @@
-import subprocess
 import os
-import time
-import sys
-import pathlib  # For platform-independent file path handling
 import json     # For application settings
-import socket   # For internet connection check
-import psutil   # For checking running processes
+import importlib
 
-from bs4 import BeautifulSoup # HTML parsing
 import customtkinter as ctk    # GUI framework
 from customtkinter import filedialog # GUI file dialogs
-from PIL import Image          # Icon handling
 import threading               # For background tasks
-
-# Selenium Imports - for browser automation
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, WebDriverException
-
-# --- Base Directory Configuration (for .exe bundling) ---
-if getattr(sys, 'frozen', False): # Running as a bundled exe
-    BUNDLE_DIR = sys._MEIPASS
-else: # Running as a .py script
-    BUNDLE_DIR = os.path.dirname(os.path.abspath(__file__))
-
-# --- Configuration File for User Settings ---
-# Stored in user's home directory for persistence.
-CONFIG_DIR = os.path.join(os.path.expanduser('~'), 'CircleFTPDownloaderConfig')
-CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
-
-# --- Resource Directories ---
-DRIVER_DIR = os.path.join(BUNDLE_DIR, "drivers")
-ASSETS_DIR = os.path.join(BUNDLE_DIR, "assets")
-
-CHROMEDRIVER_PATH = os.path.join(DRIVER_DIR, "chromedriver.exe")
-GECKODRIVER_PATH = os.path.join(DRIVER_DIR, "geckodriver.exe")
-EDGEDRIVER_PATH = os.path.join(DRIVER_DIR, "msedgedriver.exe")
-
-# --- Utility Functions ---
-def is_connected_to_internet(host="8.8.8.8", port=53, timeout=3):
-    """Checks for an active internet connection."""
-    try:
-        socket.create_connection((host, port), timeout=timeout)
-        return True
-    except OSError:
-        return False
-
-# --- Selenium HTML Fetching ---
-def get_full_html_content_selenium(url, browser_type, log_callback, progress_callback=None):
-    """Fetches HTML from a URL or local file using Selenium."""
-    url_to_load = url
-    is_local_file = False
-
-    # Determine if input is a local file path and convert to URI if so
-    if not (url.startswith('http://') or url.startswith('https://') or url.startswith('file:///')):
-        if os.path.exists(url):
-            is_local_file = True
-            try:
-                url_to_load = pathlib.Path(url).as_uri()
-            except Exception as e:
-                log_callback(f"Error converting local path to URI: {e}. Trying original path.")
-    elif url.startswith('file:///'):
-        is_local_file = True
-
-    if is_local_file:
-        log_callback(f"Loading local HTML: {url_to_load}")
-    else:
-        log_callback(f"Fetching web URL via {browser_type}: {url_to_load}")
-
-    if progress_callback: progress_callback(0.05)
-    driver = None
-    try:
-        # WebDriver setup (service, options) based on browser_type
-        service = None
-        options = None
-
-        if browser_type.lower() == 'chrome':
-            service = ChromeService(executable_path=CHROMEDRIVER_PATH)
-            options = webdriver.ChromeOptions()
-        elif browser_type.lower() == 'firefox':
-            service = FirefoxService(executable_path=GECKODRIVER_PATH)
-            options = webdriver.FirefoxOptions()
-            options.add_argument("-headless") # Firefox needs this specific argument for headless
-        elif browser_type.lower() == 'edge':
-            service = EdgeService(executable_path=EDGEDRIVER_PATH)
-            options = webdriver.EdgeOptions()
-        else:
-            log_callback(f"ERROR: Unsupported browser: {browser_type}.")
-            return None
-
-        # Common headless options for Chrome and Edge
-        if options and browser_type.lower() != 'firefox':
-            options.add_argument("--headless")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--log-level=3")
-            options.add_argument("--disable-logging")
-
-        # Initialize WebDriver
-        if browser_type.lower() == 'chrome':
-            driver = webdriver.Chrome(service=service, options=options)
-        elif browser_type.lower() == 'firefox':
-            driver = webdriver.Firefox(service=service, options=options)
-        elif browser_type.lower() == 'edge':
-            driver = webdriver.Edge(service=service, options=options)
-
-        driver.get(url_to_load)
-        if progress_callback: progress_callback(0.15)
-
-        # Wait for the main download section to ensure page is fully loaded,
-        # but skip this for local files as content is assumed static.
-        if not is_local_file:
-            wait = WebDriverWait(driver, 20) # 20-second timeout
-            wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "section.bg-light.mt-2.rounded.p-2.w-75.mx-auto"))
-            )
-            log_callback("Main download section loaded.")
-        else:
-            log_callback("Local file loaded; skipping dynamic element wait.")
-
-        if progress_callback: progress_callback(0.8)
-        full_html = driver.page_source
-        log_callback("Successfully fetched/loaded full HTML.")
-        if progress_callback: progress_callback(1.0)
-        return full_html
-
-    except FileNotFoundError as e:
-        log_callback(f"ERROR: WebDriver for {browser_type} not found at '{e.filename}'. Check 'drivers' folder.")
-        if progress_callback: progress_callback(0)
-        return None
-    except TimeoutException:
-        log_callback(f"ERROR: Timeout waiting for download section on {url_to_load}.")
-        if is_local_file: log_callback("For local files, section might be missing or JS-dependent.")
-        if progress_callback: progress_callback(0)
-        return None
-    except WebDriverException as e:
-        log_callback(f"ERROR: Selenium WebDriver failed for {browser_type} with {url_to_load}: {e}")
-        if "net::ERR_FILE_NOT_FOUND" in str(e).lower():
-            log_callback(f"Hint: Local file path '{url}' might be incorrect.")
-        if progress_callback: progress_callback(0)
-        return None
-    except Exception as e:
-        log_callback(f"Unexpected error during Selenium fetching for {url_to_load}: {e}")
-        if progress_callback: progress_callback(0)
-        return None
-    finally:
-        if driver:
-            driver.quit() # Ensure browser closes
-
-# --- HTML Parsing ---
-def extract_download_links_from_html(html_content, log_callback):
-    """Extracts download URLs from the provided HTML content."""
-    log_callback("Parsing HTML for download links...")
-    soup = BeautifulSoup(html_content, 'html.parser')
-    download_urls = []
-    
-    # Specific selector for the download links section on the target site
-    download_section = soup.find('section', class_='bg-light mt-2 rounded p-2 w-75 mx-auto')
-    if not download_section:
-        log_callback("WARNING: Download section not found. HTML structure might have changed.")
-        return []
-    
-    # Specific selector for the download anchor tags
-    links = download_section.find_all('a', class_='btn btn-success', href=True)
-    if not links:
-        log_callback("WARNING: No download links (<a> tags with 'btn-success') found in section.")
-        return []
-        
-    for link in links:
-        url = link['href']
-        if url:
-            download_urls.append(url)
-            
-    log_callback(f"Found {len(download_urls)} potential download links.")
-    return list(set(download_urls)) # Return unique links
-
-# --- IDM Integration ---
-def initiate_idm_direct_downloads(urls, idm_exec_path, log_callback, count_progress_callback=None):
-    """Sends a list of URLs to IDM for downloading."""
-    if not urls:
-        log_callback("No URLs provided to IDM for this batch.")
-        if count_progress_callback: count_progress_callback(0)
-        return 0
-
-    log_callback(f"Sending {len(urls)} links to IDM for this batch...")
-    successfully_sent_count = 0
-    for i, url in enumerate(urls):
-        # IDM command-line arguments: /d <URL> /n (no questions) /q (add to queue) /s (start queue)
-        command = [idm_exec_path, '/d', url, '/n', '/q', '/s']
-        try:
-            # Using os.path.basename to log a cleaner version of the URL
-            log_callback(f"[{i+1}/{len(urls)}] Sending: {os.path.basename(url.split('?')[0])}")
-            subprocess.run(command, creationflags=subprocess.CREATE_NO_WINDOW) # Hide console window
-            time.sleep(0.5) # Brief pause to avoid overwhelming IDM
-            successfully_sent_count += 1
-            if count_progress_callback:
-                count_progress_callback(successfully_sent_count)
-        except FileNotFoundError:
-            log_callback(f"ERROR: IDM executable not found at '{idm_exec_path}'. Aborting batch.")
-            break # Stop processing this batch if IDM path is wrong
-        except Exception as e:
-            log_callback(f"ERROR sending {os.path.basename(url.split('?')[0])} to IDM: {e}")
-            
-    log_callback(f"Sent {successfully_sent_count}/{len(urls)} requests to IDM for this batch.")
-    return successfully_sent_count
+from concurrent.futures import ThreadPoolExecutor
+
+# Heavy modules (requests, selenium, psutil, sqlite3) are imported on first use
+# so the window appears quickly; see _preload_modules_in_background.
+from circleftp.api import DEFAULT_API_BASE_URL, close_session
+from circleftp.aria2 import ARIA2_DEFAULTS
+from circleftp.backends import BACKENDS, create_backend
+from circleftp.fetch_queue import DEFAULT_FETCH_WORKERS, parse_page_list
+from circleftp.icon_cache import load_resized_icon # Icon handling
+from circleftp.idm import DEFAULT_DISPATCH_WORKERS, IdmProcessWatcher
+from circleftp.log_sink import LogSink
+from circleftp.page_cache import DEFAULT_TTL_MINUTES
+from circleftp.pipeline import (dispatch_batch, fetch_links, make_driver_pool, make_page_cache, needs_browser,
+                                target_endpoints, unreachable_endpoints)
+from circleftp.progress import ProgressModel
+from circleftp.scheduler import AutoContinueScheduler, DirectoryWatcher
+from circleftp.session_journal import SessionJournal
+from circleftp.tracing import span, start_trace, stop_trace
+from circleftp.settings import (ASSETS_DIR, CONFIG_DIR, CONFIG_FILE, DEFAULT_DOWNLOAD_DIR, DEFAULT_IDM_DOWNLOAD_DIR,
+                                DEFAULT_IDM_PATH, DRIVER_DIR, ICON_CACHE_DIR, LOG_SPILL_FILE, SENT_HISTORY_FILE,
+                                SESSION_JOURNAL_FILE, TRACE_FILE)
+
+LOG_FLUSH_INTERVAL_MS = 50 # Queued log lines are written to the textbox at most 20 times per second
+PROGRESS_POLL_INTERVAL_MS = 100 # The progress bar is redrawn from the shared ProgressModel 10 times per second
+
+# Warmed up in a background thread once the window is visible
+PRELOAD_MODULES = ("requests", "psutil", "sqlite3", "circleftp.history", "circleftp.driver_pool", "circleftp.browser")
 
 # --- GUI Application Class ---
 class DownloaderApp(ctk.CTk):
@@ -238,12 +62,37 @@ class DownloaderApp(ctk.CTk):
         self.grid_columnconfigure(0, weight=1) # Main column expands
 
         # --- Internal State Variables ---
+        self.log_sink = LogSink(spill_path=LOG_SPILL_FILE) # Filled from any thread, drained by _flush_log
+        self.progress = ProgressModel() # Updated by worker threads, polled by _poll_progress
+        self._shown_progress = 0.0
         self.selected_browser_button = None # Tracks the currently selected browser button
         self.browser_button_default_color = ("#3B8ED0", "#1F6AA5") # Standard CTk button color
         self.all_extracted_urls = []
         self.current_url_index = 0
         self.initial_fetch_done = False
         self.selected_browser_type = "chrome" # Default browser
+        self.api_fetch_enabled = True # Try the JSON API before falling back to Selenium
+        self.api_base_url = DEFAULT_API_BASE_URL
+        self.page_cache_ttl_minutes = DEFAULT_TTL_MINUTES # Recently fetched pages are not fetched again
+        self.download_backend = "idm" # Name from circleftp.backends.BACKENDS, e.g. "idm" or "builtin" (the app's own downloader)
+        self.active_backend = None # DownloadBackend of the current run, see _get_backend
+        self.aria2_settings = dict(ARIA2_DEFAULTS) # aria2_* keys of config.json (RPC URL, secret, split, ...)
+        self.download_dir = DEFAULT_DOWNLOAD_DIR
+        self.idm_download_dir = DEFAULT_IDM_DOWNLOAD_DIR
+        self.auto_scheduler = None # Active AutoContinueScheduler while auto-continue is running
+        self.skip_sent_links = True # Skip links already sent to IDM in earlier runs
+        self.sent_history = None # Opened lazily by _get_sent_history
+        self.session_journal = SessionJournal(SESSION_JOURNAL_FILE) # Extracted links + dispatch progress, for resuming
+        self.resumable_session = None # Unfinished session found on launch
+        self.idm_process = IdmProcessWatcher() # Remembers IDM's PID so later checks skip the process scan
+        self.dispatch_workers = DEFAULT_DISPATCH_WORKERS # Concurrent IDM add-to-queue calls
+        self.fetch_workers = DEFAULT_FETCH_WORKERS # Content pages fetched in parallel
+        self.max_browsers = 2 # Upper bound on concurrently running browsers
+        self.page_load_strategy = "eager" # Selenium returns once the DOM is ready, not after every image/font
+        self.block_resources = True # Browsers skip images, fonts, CSS and analytics
+        # Browsers are booted lazily on first use and kept warm until the app closes
+        self.driver_pool = make_driver_pool(max_size=self.max_browsers, log_callback=self.log_message,
+                                            page_load_strategy=self.page_load_strategy, block_resources=self.block_resources)
 
         # --- Font Definitions ---
         default_font = ("", 14)
@@ -278,6 +127,10 @@ class DownloaderApp(ctk.CTk):
         self.paste_button = ctk.CTkButton(self.url_frame, text="", image=self.paste_icon, height=35 ,width=40, command=self.paste_from_clipboard)
         self.paste_button.grid(row=1, column=2, padx=(0, 10), pady=(5,10))
 
+        self.refresh_cache_var = ctk.BooleanVar(value=False)
+        self.refresh_cache_checkbox = ctk.CTkCheckBox(self.url_frame, text="Fetch again (ignore cached links)", font=ftp_url_font, variable=self.refresh_cache_var)
+        self.refresh_cache_checkbox.grid(row=2, column=0, columnspan=3, padx=10, pady=(0, 8), sticky="w")
+
 
 
         # Browser Selection Section
@@ -342,6 +195,10 @@ class DownloaderApp(ctk.CTk):
         self.batch_size_entry.bind("<FocusOut>", self._update_slider_from_batch_entry_event)
         self.batch_size_entry.bind("<Return>", self._update_slider_from_batch_entry_event)
 
+        self.auto_continue_var = ctk.BooleanVar(value=False)
+        self.auto_continue_checkbox = ctk.CTkCheckBox(self.batch_frame, text="Auto-continue: keep this many downloads running", font=default_font, variable=self.auto_continue_var)
+        self.auto_continue_checkbox.grid(row=1, column=0, columnspan=3, padx=10, pady=(0, 8), sticky="w")
+
 
 
         # Action Buttons Frame (Start/Continue, Abort)
@@ -357,13 +214,17 @@ class DownloaderApp(ctk.CTk):
         self.abort_button = ctk.CTkButton(self.action_buttons_frame, text="Abort", font=abort_button_font, command=self._abort_process, height=40, fg_color="firebrick", hover_color="#B22222")
         self.abort_button.grid_remove() # Initially hidden
 
+        self.resume_button = ctk.CTkButton(self.action_buttons_frame, text="Resume Last Session", font=default_font, command=self._resume_last_session, height=32)
+        self.resume_button.grid(row=1, column=0, columnspan=2, padx=(0,0), pady=(8,0), sticky="ew")
+        self.resume_button.grid_remove() # Shown by _offer_resume_session if there is one
+
 
 
         # Log Textbox
         self.log_textbox = ctk.CTkTextbox(self, width=500, height=150, font=logbox_font)
         self.log_textbox.grid(row=5, column=0, padx=20, pady=10, sticky="nsew")
-        self.log_textbox.insert("end", "Welcome to CircleFTP Batch Downloader!\n")
         self.log_textbox.configure(state="disabled")
+        self.log_message("Welcome to CircleFTP Batch Downloader!")
         self.grid_rowconfigure(5, weight=1) # Log textbox expands vertically
 
 
@@ -386,41 +247,124 @@ class DownloaderApp(ctk.CTk):
         self._load_config() # Load saved settings (this will set defaults if no config file)
         self.select_browser(self.selected_browser_type, initial_setup=True) # Now select after buttons are created and config loaded
         self.protocol("WM_DELETE_WINDOW", self.on_closing) # Save config on exit
+        self._offer_resume_session()
+        self.after(500, self._preload_modules_in_background) # After the first paint
+        self.after(LOG_FLUSH_INTERVAL_MS, self._flush_log)
+        self.after(PROGRESS_POLL_INTERVAL_MS, self._poll_progress)
 
 
 
     # --- App Methods ---
     def _abort_process(self):
         """Aborts the current batch download process."""
+        if self.auto_scheduler:
+            self.auto_scheduler.stop() # The auto-continue worker exits without dispatching more links
+        if self.active_backend:
+            self.active_backend.cancel() # A batch being sent stops handing over links
         self.log_message("\n--- Download Process Aborted by User ---")
         self._finalize_all_downloads() # Resets state and UI
 
+    def _offer_resume_session(self):
+        """Shows the 'Resume Last Session' button if the previous run ended before all links were sent."""
+        self.resumable_session = self.session_journal.load()
+        if not self.resumable_session:
+            return
+        session = self.resumable_session
+        self.log_message(f"Unfinished session found: {session['index']}/{len(session['links'])} links sent "
+                         f"from {session['source']}. Click 'Resume Last Session' to continue without fetching again.")
+        self.resume_button.grid()
+
+    def _resume_last_session(self):
+        """Restores the journaled link list and continues sending from where the last run stopped."""
+        session = self.resumable_session
+        if not session:
+            return
+        batch_size = self._validate_run_settings()
+        if batch_size is None:
+            return # The session stays offered until the settings are fixed
+        self.resume_button.grid_remove()
+        self.resumable_session = None
+        links = session["links"]
+        remaining = links[session["index"]:]
+        if self.skip_sent_links and self._get_sent_history():
+            remaining, already_sent = self.sent_history.filter_unsent(remaining) # Covers a batch cut short by a crash
+            if already_sent:
+                self.log_message(f"Skipping {len(already_sent)} links that were sent before the app closed.")
+        if not remaining:
+            self.log_message("Every link from the last session was already sent.")
+            self.session_journal.finish()
+            return
+
+        self.url_entry.delete(0, ctk.END)
+        self.url_entry.insert(0, session["source"] or "")
+        self.all_extracted_urls = remaining
+        self.current_url_index = 0
+        self.initial_fetch_done = True
+        self.progress.reset()
+        self.progress.complete("fetch", "extract")
+        try:
+            self.session_journal.start(session["source"], remaining, self.download_backend)
+        except OSError as e:
+            self.log_message(f"WARNING: Could not write session journal (resume will not be available): {e}")
+        self.log_message(f"\n--- Resuming last session: {len(remaining)} links left ---")
+        self._set_ui_state_processing(True)
+        self.abort_button.grid_remove()
+        self.start_button.grid_configure(columnspan=2, padx=(0,0))
+        start_trace() # Only once the settings are valid, so an early return leaves no trace running
+        threading.Thread(target=self._resume_session_thread, args=(batch_size,), daemon=True).start()
+
+    def _resume_session_thread(self, batch_size):
+        """Thread worker for a resumed session: gets the backend ready like a fresh start, then sends."""
+        backend = self._get_backend(max_parallel_files=batch_size if self.auto_continue_var.get() else None)
+        with span("prepare backend", backend=backend.name):
+            ready = backend.prepare() # Launches IDM / checks the aria2 RPC endpoint
+        if not self._report_backend_ready(backend, ready):
+            self.after(0, self._reset_ui_after_error, "Start Download")
+            self.after(0, self._offer_resume_session) # The journal is untouched; let the user retry
+            return
+        if self.auto_continue_var.get():
+            self._auto_continue_thread(batch_size)
+        else:
+            self._send_batch_thread(batch_size, is_first_batch=True)
+
     def _clear_url_entry(self):
         """Clears the URL entry field."""
         self.url_entry.delete(0, ctk.END)
         self.log_message("URL entry cleared.")
 
-    def is_idm_running(self):
-        """Checks if idman.exe process is currently running."""
-        for proc in psutil.process_iter(['name']):
-            if proc.info['name'].lower() == 'idman.exe':
-                return True
-        return False
-
-    def launch_idm_with_path(self, idm_exec_path):
-        """Launches IDM using the given path if it's not already running."""
-        if not self.is_idm_running():
-            try:
-                subprocess.Popen(idm_exec_path, creationflags=subprocess.DETACHED_PROCESS, close_fds=True)
-                time.sleep(1) # Give IDM a moment
-                return True
-            except FileNotFoundError:
-                self.log_message(f"ERROR launching IDM: File not found at {idm_exec_path}")
-                return False
-            except Exception as e:
-                self.log_message(f"ERROR launching IDM: {e}")
-                return False
-        return True
+    def _preload_modules_in_background(self):
+        """Imports the heavy fetch/dispatch modules off the UI thread so Start doesn't pay for them."""
+        def preload():
+            for module_name in PRELOAD_MODULES:
+                try:
+                    importlib.import_module(module_name)
+                except Exception:
+                    pass # Reported properly when the module is actually used
+        threading.Thread(target=preload, name="module-preload", daemon=True).start()
+
+    def _get_backend(self, max_parallel_files=None):
+        """Returns the download backend of the current run, creating it on first use."""
+        if self.active_backend is None:
+            self.active_backend = create_backend(
+                self.download_backend, self.log_message, idm_path=self.idm_path_entry.get(), download_dir=self.download_dir,
+                dispatch_workers=self.dispatch_workers, process_watcher=self.idm_process, max_parallel_files=max_parallel_files,
+                aria2_settings=self.aria2_settings)
+        return self.active_backend
+
+    def _report_backend_ready(self, backend, ready):
+        """Logs the outcome of backend.prepare() and returns it."""
+        if not ready:
+            self.log_message("ERROR: Could not launch or verify IDM." if backend.name == "idm"
+                             else f"ERROR: The '{backend.name}' download backend is not available.")
+        elif backend.name == "idm":
+            self.log_message("IDM is running or launched successfully.")
+        return ready
+
+    def _close_backend(self):
+        """Closes the current run's backend off the UI thread (the built-in engine waits for its transfers to stop)."""
+        backend, self.active_backend = self.active_backend, None
+        if backend:
+            threading.Thread(target=backend.close, name="backend-close", daemon=True).start()
 
     def _browse_idm_path(self):
         """Opens a file dialog to select the IDMan.exe path."""
@@ -438,7 +382,7 @@ class DownloaderApp(ctk.CTk):
     def _load_config(self):
         """Loads application settings from the config file."""
         os.makedirs(CONFIG_DIR, exist_ok=True)
-        default_idm_path = r"C:\Program Files (x86)\Internet Download Manager\IDMan.exe"
+        default_idm_path = DEFAULT_IDM_PATH
         default_browser = "chrome"
         default_batch_size = "5"
 
@@ -459,6 +403,27 @@ class DownloaderApp(ctk.CTk):
                 self.batch_size_entry.insert(0, batch_size)
                 
                 self.selected_browser_type = config.get("browser", default_browser)
+                self.api_fetch_enabled = bool(config.get("api_fetch", True))
+                self.api_base_url = config.get("api_base_url", DEFAULT_API_BASE_URL)
+                self.page_cache_ttl_minutes = max(0, int(config.get("page_cache_ttl_minutes", DEFAULT_TTL_MINUTES)))
+                self.download_backend = config.get("download_backend", "idm")
+                if self.download_backend not in BACKENDS:
+                    self.download_backend = "idm"
+                self.download_dir = config.get("download_dir", DEFAULT_DOWNLOAD_DIR)
+                self.aria2_settings.update((key, config[key]) for key in ARIA2_DEFAULTS if key in config)
+                self.idm_download_dir = config.get("idm_download_dir", DEFAULT_IDM_DOWNLOAD_DIR)
+                self.auto_continue_var.set(bool(config.get("auto_continue", False)))
+                self.skip_sent_links = bool(config.get("skip_sent_links", True))
+                self.fetch_workers = max(1, int(config.get("fetch_workers", DEFAULT_FETCH_WORKERS)))
+                self.dispatch_workers = max(1, int(config.get("dispatch_workers", DEFAULT_DISPATCH_WORKERS)))
+                self.max_browsers = max(1, int(config.get("max_browsers", self.max_browsers)))
+                self.driver_pool.max_size = self.max_browsers
+                self.page_load_strategy = config.get("page_load_strategy", self.page_load_strategy)
+                if self.page_load_strategy not in ("eager", "none", "normal"):
+                    self.page_load_strategy = "eager"
+                self.driver_pool.page_load_strategy = self.page_load_strategy
+                self.block_resources = bool(config.get("block_resources", True))
+                self.driver_pool.block_resources = self.block_resources
                 # self.select_browser(self.selected_browser_type) # Called after UI init
 
                 self.log_message("Configuration loaded.")
@@ -490,7 +455,21 @@ class DownloaderApp(ctk.CTk):
             "idm_path": self.idm_path_entry.get(),
             "last_url": self.url_entry.get(),
             "browser": self.selected_browser_type,
-            "batch_size": self.batch_size_entry.get()
+            "batch_size": self.batch_size_entry.get(),
+            "api_fetch": self.api_fetch_enabled,
+            "api_base_url": self.api_base_url,
+            "page_cache_ttl_minutes": self.page_cache_ttl_minutes,
+            "download_backend": self.download_backend,
+            "download_dir": self.download_dir,
+            **self.aria2_settings,
+            "idm_download_dir": self.idm_download_dir,
+            "auto_continue": bool(self.auto_continue_var.get()),
+            "skip_sent_links": self.skip_sent_links,
+            "fetch_workers": self.fetch_workers,
+            "dispatch_workers": self.dispatch_workers,
+            "max_browsers": self.max_browsers,
+            "page_load_strategy": self.page_load_strategy,
+            "block_resources": self.block_resources
         }
         try:
             with open(CONFIG_FILE, 'w') as f:
@@ -500,23 +479,45 @@ class DownloaderApp(ctk.CTk):
             self.log_message(f"ERROR saving configuration: {e}")
 
     def on_closing(self):
-        """Handles window close event: saves config and destroys window."""
+        """Handles window close event: saves config, stops any running downloads and destroys window."""
         self._save_config()
+        if self.auto_scheduler:
+            self.auto_scheduler.stop()
+        backend, self.active_backend = self.active_backend, None
+        if backend:
+            backend.cancel()
+            backend.close() # Waits here: the built-in engine's workers would otherwise keep the process alive
+        close_session()
+        self.driver_pool.shutdown()
+        if self.sent_history:
+            self.sent_history.close()
         self.destroy()
 
+    def _get_sent_history(self):
+        """Opens the sent-URL history on first use. Returns None if it cannot be opened."""
+        if self.sent_history is None:
+            try:
+                from circleftp.history import SentHistory
+                os.makedirs(CONFIG_DIR, exist_ok=True)
+                self.sent_history = SentHistory(SENT_HISTORY_FILE)
+            except Exception as e:
+                self.log_message(f"ERROR opening sent-link history: {e}")
+        return self.sent_history
+
     def clear_log(self):
         """Clears the log textbox."""
+        self._flush_log(reschedule=False) # Messages queued before the click are cleared too
         self.log_textbox.configure(state="normal")
         self.log_textbox.delete("1.0", "end")
         self.log_textbox.configure(state="disabled")
+        self.log_sink.clear()
         self.log_message("Log cleared.")
 
     def load_icon(self, icon_filename, size=(32, 32)):
-        """Loads an image icon from the assets folder."""
+        """Loads an image icon from the assets folder (pre-resized copies are cached)."""
         try:
             image_path = os.path.join(ASSETS_DIR, icon_filename)
-            image = Image.open(image_path)
-            image = image.resize(size, Image.Resampling.LANCZOS) # Updated resampling method
+            image = load_resized_icon(image_path, size, ICON_CACHE_DIR)
             return ctk.CTkImage(light_image=image, dark_image=image, size=size)
         except FileNotFoundError:
             self.log_message(f"ERROR: Icon '{icon_filename}' not found at '{image_path}'.")
@@ -559,20 +560,29 @@ class DownloaderApp(ctk.CTk):
 
 
     def log_message(self, message):
-        """Thread-safe logging to the GUI textbox."""
-        self.after(0, lambda: self._update_log_textbox(message))
+        """Thread-safe logging to the GUI textbox (queued; shown by _flush_log)."""
+        self.log_sink.write(message)
 
-    def _update_log_textbox(self, message):
-        """Internal method to update the log textbox (called by log_message)."""
-        if hasattr(self, 'log_textbox'): # Ensure log_textbox exists
+    def _flush_log(self, reschedule=True):
+        """Writes all queued log lines to the textbox in one batch, trimming the oldest lines."""
+        new_lines, lines_to_remove = self.log_sink.drain()
+        if new_lines and hasattr(self, 'log_textbox'): # Ensure log_textbox exists
             self.log_textbox.configure(state="normal")
-            self.log_textbox.insert("end", message + "\n")
+            if lines_to_remove:
+                self.log_textbox.delete("1.0", f"{lines_to_remove + 1}.0")
+            self.log_textbox.insert("end", "\n".join(new_lines) + "\n")
             self.log_textbox.see("end") # Scroll to the end
             self.log_textbox.configure(state="disabled")
+        if reschedule:
+            self.after(LOG_FLUSH_INTERVAL_MS, self._flush_log)
 
-    def _update_progress_bar(self, value):
-        """Thread-safe update of the progress bar."""
-        self.after(0, lambda: self.progress_bar.set(value))
+    def _poll_progress(self):
+        """Redraws the progress bar from the shared ProgressModel when it has changed."""
+        value = min(self.progress.overall(), 1.0)
+        if abs(value - self._shown_progress) >= 0.001:
+            self.progress_bar.set(value)
+            self._shown_progress = value
+        self.after(PROGRESS_POLL_INTERVAL_MS, self._poll_progress)
 
     def _set_ui_state_processing(self, is_processing):
         """Enables/disables UI elements based on processing state."""
@@ -580,7 +590,8 @@ class DownloaderApp(ctk.CTk):
             self.paste_button, self.chrome_button, self.firefox_button,
             self.edge_button, self.url_entry, self.batch_size_entry,
             self.clear_log_button, self.idm_browse_button, self.idm_path_entry,
-            self.batch_slider # Disable slider as well
+            self.batch_slider, # Disable slider as well
+            self.auto_continue_checkbox, self.refresh_cache_checkbox
         ]
         
         if is_processing:
@@ -593,47 +604,56 @@ class DownloaderApp(ctk.CTk):
                  if hasattr(control, 'configure'): control.configure(state="normal")
             # self.idm_path_entry.configure(state="disabled") # IDM path usually not editable during run
 
-    def handle_start_or_continue(self):
-        """Handles clicks on the 'Start Download' or 'Continue' button."""
-        url_or_path = self.url_entry.get().strip()
-        if not self.initial_fetch_done and not url_or_path:
-            self.log_message("Please enter a URL or local file path first!")
-            return
-
+    def _validate_run_settings(self):
+        """Checks the batch size and IDM path fields. Returns the batch size, or None after logging the problem."""
         try:
             batch_size_str = self.batch_size_entry.get()
             if not batch_size_str:
                 self.log_message("ERROR: Batch size cannot be empty.")
-                return
+                return None
             batch_size = int(batch_size_str)
             if batch_size <= 0:
                 self.log_message("ERROR: Batch size must be positive.")
-                return
+                return None
         except ValueError:
             self.log_message("ERROR: Invalid batch size. Please enter a number.")
-            return
-        
-        # IDM Path check (moved here for both Start and Continue)
+            return None
+
+        # IDM Path check (for Start, Continue and Resume)
         idm_path_from_ui = self.idm_path_entry.get()
-        if not idm_path_from_ui or not os.path.exists(idm_path_from_ui):
+        if self.download_backend == "idm" and (not idm_path_from_ui or not os.path.exists(idm_path_from_ui)):
             self.log_message(f"ERROR: Invalid IDM path: '{idm_path_from_ui}'. Please set it correctly.")
             self._set_ui_state_processing(False) # Re-enable UI to fix path
             self.start_button.configure(state="normal", text="Start Download" if not self.initial_fetch_done else "Continue")
+            return None
+        return batch_size
+
+    def handle_start_or_continue(self):
+        """Handles clicks on the 'Start Download' or 'Continue' button."""
+        url_or_path = self.url_entry.get().strip()
+        if not self.initial_fetch_done and not url_or_path:
+            self.log_message("Please enter a URL or local file path first!")
+            return
+        batch_size = self._validate_run_settings()
+        if batch_size is None:
             return
 
         self._set_ui_state_processing(True)
         self.abort_button.grid_remove() # Always hide abort when initiating a process step
         self.start_button.grid_configure(columnspan=2, padx=(0,0)) # Main button takes full width
 
+        self.resume_button.grid_remove() # A new or continued run replaces the unfinished session
         if not self.initial_fetch_done:
             self.log_message("\n--- Starting Download Process ---")
             self.current_url_index = 0
             self.all_extracted_urls = []
-            self._update_progress_bar(0)
+            self.progress.reset()
+            start_trace() # Per-phase timings, summarized when the run ends
             thread = threading.Thread(target=self._initial_fetch_and_first_batch_thread, args=(url_or_path, batch_size))
         else:
             self.log_message(f"\n--- Continuing with batch ({batch_size} links) ---")
-            thread = threading.Thread(target=self._send_batch_thread, args=(batch_size,))
+            target = self._auto_continue_thread if self.auto_continue_var.get() else self._send_batch_thread
+            thread = threading.Thread(target=target, args=(batch_size,))
         
         thread.daemon = True # Allows main program to exit even if thread is running
         thread.start()
@@ -641,38 +661,57 @@ class DownloaderApp(ctk.CTk):
     def _initial_fetch_and_first_batch_thread(self, url_or_path, batch_size):
         """Thread worker for initial fetch and first batch processing."""
         idm_path_from_ui = self.idm_path_entry.get() # Already validated in handle_start_or_continue
-
-        self.log_message(f"Performing IDM checks with path: {idm_path_from_ui}")
-        if not self.launch_idm_with_path(idm_path_from_ui):
-            self.log_message("ERROR: Could not launch or verify IDM.")
-            self.after(0, self._reset_ui_after_error, "Start Download")
-            return
-        self.log_message("IDM is running or launched successfully.")
-
-        is_web_url = url_or_path.startswith('http://') or url_or_path.startswith('https://')
-        if is_web_url:
-            self.log_message("Checking internet connection for web URL...")
-            if not is_connected_to_internet():
-                self.log_message("ERROR: No active internet connection.")
+        # The URL field may hold one page, several URLs, or a .txt list of pages
+        page_urls = parse_page_list(url_or_path) or [url_or_path]
+        page_cache = make_page_cache(self.page_cache_ttl_minutes)
+        refresh = self.refresh_cache_var.get()
+
+        # --- Pre-flight: IDM launch, browser boot and the reachability probe run side by side ---
+        # Only the probe gates the fetch; IDM only has to be ready before the first dispatch.
+        preflight = ThreadPoolExecutor(max_workers=2, thread_name_prefix="preflight")
+        if self.download_backend == "idm":
+            self.log_message(f"Performing IDM checks with path: {idm_path_from_ui}")
+        elif self.download_backend == "builtin":
+            self.log_message(f"Using built-in downloader; files go to: {self.download_dir}")
+        elif self.download_backend == "aria2":
+            self.log_message(f"Using aria2 at {self.aria2_settings['aria2_rpc_url']}")
+        else:
+            self.log_message(f"Using the '{self.download_backend}' download backend.")
+        # Auto-continue keeps batch_size downloads running, so the built-in engine gets that many file slots
+        backend = self._get_backend(max_parallel_files=batch_size if self.auto_continue_var.get() else None)
+        backend_ready = preflight.submit(backend.prepare)
+        if needs_browser(page_urls, self.api_fetch_enabled, None if refresh else page_cache):
+            preflight.submit(self.driver_pool.warm_up, self.selected_browser_type)
+        preflight.shutdown(wait=False)
+
+        endpoints = target_endpoints(page_urls, self.api_fetch_enabled, self.api_base_url)
+        if endpoints:
+            self.log_message(f"Checking connection to {', '.join(f'{host}:{port}' for host, port in endpoints)}...")
+            unreachable = unreachable_endpoints(endpoints)
+            if len(unreachable) == len(endpoints):
+                self.log_message("ERROR: CircleFTP server is not reachable. Check your connection (BDIX).")
                 self.after(0, self._reset_ui_after_error, "Start Download")
                 return
-            self.log_message("Internet connection verified.")
+            for host, port in unreachable:
+                self.log_message(f"WARNING: {host}:{port} is not reachable; pages on it will likely fail.")
+            self.log_message("Connection verified.")
         else:
-            self.log_message("Input is a local file path; skipping internet check.")
-        
-        def selenium_progress_update(p_val):
-            self.after(0, lambda: self._update_progress_bar(p_val * 0.40)) # Fetching is 0-40% of total
+            self.log_message("Input is a local file path; skipping connection check.")
 
-        html_content = get_full_html_content_selenium(url_or_path, self.selected_browser_type, self.log_message, selenium_progress_update)
-        if not html_content:
+        extracted_urls, failed_pages = fetch_links(
+            page_urls, self.log_message, lambda p_val: self.progress.set_fraction("fetch", p_val), fetch_workers=self.fetch_workers,
+            browser_type=self.selected_browser_type, api_fetch=self.api_fetch_enabled,
+            api_base_url=self.api_base_url, driver_pool=self.driver_pool, cache=page_cache, refresh=refresh)
+        if len(page_urls) == 1 and failed_pages:
             self.log_message("Failed to retrieve/load HTML. Cannot proceed.")
             self.after(0, self._reset_ui_after_error, "Start Download")
             return
-        self.after(0, lambda: self._update_progress_bar(0.40))
+        if len(page_urls) > 1:
+            for failed_page in failed_pages:
+                self.log_message(f"WARNING: No links fetched from {failed_page}")
 
-        self.log_message("Extracting links from HTML...")
-        self.all_extracted_urls = extract_download_links_from_html(html_content, self.log_message)
-        self.after(0, lambda: self._update_progress_bar(0.50)) # Extraction brings to 50%
+        self.all_extracted_urls = extracted_urls
+        self.progress.complete("fetch", "extract")
 
         if not self.all_extracted_urls:
             self.log_message("No download links were extracted.")
@@ -680,18 +719,99 @@ class DownloaderApp(ctk.CTk):
             return
 
         self.log_message(f"\nSuccessfully extracted {len(self.all_extracted_urls)} total URLs.")
+
+        if self.skip_sent_links and self._get_sent_history():
+            with span("filter sent links", links=len(self.all_extracted_urls)):
+                self.all_extracted_urls, already_sent = self.sent_history.filter_unsent(self.all_extracted_urls)
+            if already_sent:
+                self.log_message(f"Skipping {len(already_sent)} links already sent to IDM in earlier runs.")
+            if not self.all_extracted_urls:
+                self.log_message("Nothing new to download: every link was sent before.")
+                self.after(0, self._finalize_all_downloads)
+                return
         # Optional: Log all extracted URLs if needed, can be verbose
         # for i, dl_url in enumerate(self.all_extracted_urls):
         # self.log_message(f"  {i+1}. {os.path.basename(dl_url.split('?')[0])}")
 
+        with span("prepare backend", backend=backend.name):
+            ready = backend_ready.result() # Usually finished long before the fetch
+        if not self._report_backend_ready(backend, ready):
+            self.after(0, self._reset_ui_after_error, "Start Download")
+            return
+
         self.initial_fetch_done = True
         self.current_url_index = 0
-        self._send_batch_thread(batch_size, is_first_batch=True) # Proceed to send first batch
+        try:
+            self.session_journal.start(url_or_path, self.all_extracted_urls, self.download_backend)
+        except OSError as e:
+            self.log_message(f"WARNING: Could not write session journal (resume will not be available): {e}")
+        if self.auto_continue_var.get():
+            self._auto_continue_thread(batch_size)
+        else:
+            self._send_batch_thread(batch_size, is_first_batch=True) # Proceed to send first batch
 
-    def _send_batch_thread(self, batch_size, is_first_batch=False):
-        """Thread worker for sending a batch of URLs to IDM."""
-        idm_path_from_ui = self.idm_path_entry.get() # Already validated in handle_start_or_continue
+    def _auto_continue_thread(self, target_in_flight):
+        """Thread worker that keeps `target_in_flight` downloads running until every link is dispatched.
+
+        Finished downloads are detected through the built-in engine's callbacks,
+        or by watching the IDM download folder for completed files.
+        """
+        urls = self.all_extracted_urls[self.current_url_index:]
+        links_processed_before = self.current_url_index
+        total_links_overall = len(self.all_extracted_urls)
+        history = self._get_sent_history()
+        backend = self._get_backend(max_parallel_files=target_in_flight)
+        watcher = None
+
+        def record_sent(url):
+            if history:
+                try:
+                    history.mark_sent([url])
+                except Exception as e:
+                    self.log_message(f"ERROR updating sent-link history: {e}")
+
+        def progress(dispatched, total):
+            self.current_url_index = links_processed_before + dispatched
+            self.progress.set_count("dispatch", self.current_url_index, total_links_overall)
+            self._record_session_progress()
+
+        if backend.reports_completion: # The backend says when each download ends
+            scheduler = AutoContinueScheduler(urls, None, target_in_flight, self.log_message)
+
+            def on_download_done(url, ok):
+                if ok:
+                    record_sent(url)
+                scheduler.notify_completed(url)
+
+            scheduler.dispatch = lambda url: backend.submit(url, on_download_done)
+        else: # IDM: finished files are spotted in its download folder
+            if not os.path.isdir(self.idm_download_dir):
+                self.log_message(f"ERROR: IDM download folder not found: '{self.idm_download_dir}'. Set 'idm_download_dir' in config.json.")
+                self.after(0, self._reset_ui_after_error, "Start Download")
+                return
+            scheduler = AutoContinueScheduler(urls, backend.submit, target_in_flight, self.log_message,
+                                              sent_callback=record_sent)
+            watcher = DirectoryWatcher(self.idm_download_dir, lambda name: scheduler.notify_completed(file_name=name),
+                                       include_subfolders=True).start()
+            self.log_message(f"Watching '{self.idm_download_dir}' for finished IDM downloads.")
+
+        self.auto_scheduler = scheduler
+        self.log_message(f"Auto-continue: keeping {target_in_flight} downloads in flight for {len(urls)} links.")
+        self.after(0, self._show_abort_button) # Only Abort stays available while the queue drains on its own
+        try:
+            scheduler.run(wait_for_completion=backend.reports_completion, progress_callback=progress)
+        finally:
+            if watcher:
+                watcher.stop()
+            self.auto_scheduler = None
 
+        if scheduler.stopped:
+            return # Aborted: _abort_process already reset the UI
+        self.log_message(f"Auto-continue finished: {scheduler.dispatched}/{len(urls)} links dispatched.")
+        self.after(0, self._finalize_all_downloads)
+
+    def _send_batch_thread(self, batch_size, is_first_batch=False):
+        """Thread worker for sending a batch of URLs to the download backend (IDM by default)."""
         start_idx = self.current_url_index
         end_idx = min(start_idx + batch_size, len(self.all_extracted_urls))
         urls_to_send_this_batch = self.all_extracted_urls[start_idx:end_idx]
@@ -709,25 +829,34 @@ class DownloaderApp(ctk.CTk):
 
         def idm_item_processed_callback(items_done_in_current_idm_call):
             total_links_sent_for_idm_phase = links_processed_before_this_batch + items_done_in_current_idm_call
-            progress_for_idm_phase = (total_links_sent_for_idm_phase / total_links_overall) * 0.5 # Sending is 50-100%
-            overall_progress = 0.5 + progress_for_idm_phase
-            self.after(0, lambda: self._update_progress_bar(min(overall_progress, 1.0)))
-
-        initiate_idm_direct_downloads(urls_to_send_this_batch, idm_path_from_ui, self.log_message, idm_item_processed_callback)
+            self.progress.set_count("dispatch", total_links_sent_for_idm_phase, total_links_overall)
+
+        backend = self._get_backend()
+        if backend.name != "idm":
+            # The other backends block until the batch has downloaded or been handed over; keep it abortable
+            self.after(0, self._show_abort_button)
+        sent_urls = []
+        dispatch_batch(urls_to_send_this_batch, self.log_message, backend=backend,
+                       count_progress_callback=idm_item_processed_callback, url_sent_callback=sent_urls.append)
+        history = self._get_sent_history()
+        if history:
+            try:
+                history.mark_sent(sent_urls)
+            except Exception as e:
+                self.log_message(f"ERROR updating sent-link history: {e}")
+        if backend.cancelled:
+            return # Aborted mid-batch: _abort_process already reset the UI and ended the session
         self.current_url_index = end_idx
+        self._record_session_progress()
 
         # Final progress update after batch is sent
-        final_progress_for_idm_phase = (self.current_url_index / total_links_overall) * 0.5
-        final_overall_progress = 0.5 + final_progress_for_idm_phase
-        self.after(0, lambda: self._update_progress_bar(min(final_overall_progress, 1.0)))
+        self.progress.set_count("dispatch", self.current_url_index, total_links_overall)
 
         if self.current_url_index < total_links_overall:
             self.log_message(f"Batch of {len(urls_to_send_this_batch)} links sent. {total_links_overall - self.current_url_index} remaining.")
             # Setup UI for "Continue" state
             self.after(0, lambda: self.start_button.configure(text="Continue", state="normal"))
-            self.after(0, lambda: self.start_button.grid_configure(columnspan=1, padx=(0,5))) # Continue button takes 1st col
-            self.after(0, lambda: self.abort_button.grid(row=0, column=1, padx=(5, 0), pady=0, sticky="ew")) # Show Abort
-            self.after(0, lambda: self.abort_button.configure(state="normal"))
+            self.after(0, self._show_abort_button) # Continue button takes 1st col, Abort the 2nd
             
             # Re-enable only batch size and clear log for next step
             self.after(0, lambda: self.batch_size_entry.configure(state="normal"))
@@ -743,13 +872,43 @@ class DownloaderApp(ctk.CTk):
             self.after(0, lambda: self.idm_path_entry.configure(state="disabled"))
             self.after(0, lambda: self.idm_browse_button.configure(state="disabled"))
         else:
-            self.log_message("All download links have been sent to IDM.")
+            if self.download_backend == "builtin":
+                self.log_message("All files have been downloaded.")
+            else:
+                self.log_message(f"All download links have been sent to {'IDM' if self.download_backend == 'idm' else self.download_backend}.")
             self.after(0, self._finalize_all_downloads)
 
+    def _show_abort_button(self):
+        """Shows the Abort button next to the main button (UI thread)."""
+        self.start_button.grid_configure(columnspan=1, padx=(0,5))
+        self.abort_button.grid(row=0, column=1, padx=(5, 0), pady=0, sticky="ew")
+        self.abort_button.configure(state="normal")
+
+    def _record_session_progress(self):
+        """Checkpoints the dispatch position in the session journal."""
+        try:
+            self.session_journal.record_progress(self.current_url_index)
+        except OSError as e:
+            self.log_message(f"WARNING: Could not update session journal: {e}")
+
+    def _finish_trace(self):
+        """Logs the per-phase timing summary of the run that just ended and saves its trace."""
+        tracer = stop_trace()
+        if not tracer:
+            return
+        self.log_message(tracer.summary())
+        try:
+            tracer.export(TRACE_FILE)
+            self.log_message(f"Timing trace saved to {TRACE_FILE} (open it in chrome://tracing or ui.perfetto.dev).")
+        except OSError as e:
+            self.log_message(f"ERROR saving timing trace: {e}")
+
     def _reset_ui_after_error(self, button_text="Start Download"):
         """Resets UI after an error, allowing user to try again."""
         self.log_message("\n--- Process Failed or Interrupted ---")
-        self._update_progress_bar(0)
+        self._finish_trace()
+        self._close_backend()
+        self.progress.reset()
         self._set_ui_state_processing(False) # Re-enables most input controls
         self.start_button.configure(text=button_text, state="normal")
         self.start_button.grid_configure(columnspan=2, padx=(0,0)) # Start button takes full width
@@ -763,10 +922,12 @@ class DownloaderApp(ctk.CTk):
     def _finalize_all_downloads(self):
         """Finalizes the download process, resetting UI for a new operation."""
         self.log_message("\n--- All Batches Processed or Process Ended ---")
+        self._finish_trace()
+        self._close_backend()
         if self.all_extracted_urls and self.current_url_index >= len(self.all_extracted_urls):
-            self.after(0, lambda: self._update_progress_bar(1.0)) # Full progress if all completed
+            self.progress.complete() # Full progress if all completed
         else:
-            self.after(0, lambda: self._update_progress_bar(0.0)) # Reset if not fully completed or aborted
+            self.progress.reset() # Reset if not fully completed or aborted
 
         self._set_ui_state_processing(False) # Re-enables most input controls
         self.start_button.configure(text="Start Download", state="normal")
@@ -774,6 +935,7 @@ class DownloaderApp(ctk.CTk):
         self.abort_button.grid_remove() # Hide abort button
 
         # Reset processing state variables for a completely new run
+        self.session_journal.finish() # Completed or aborted: nothing to resume
         self.all_extracted_urls = []
         self.current_url_index = 0
         self.initial_fetch_done = False
@@ -0,0 +1 @@
+"""Benchmarks for the CircleFTP Batch Downloader."""
@@ -0,0 +1,132 @@
+"""Benchmark and check the JSON API fetch path against a local stand-in of the site's API.
+
+Checks that /posts/<id> answers are turned into the right links, that a
+404 falls back to the browser and that a body that is not JSON is
+rejected. With a PageCache it checks that a fresh entry is used without a
+request, that a stale one is revalidated with a 304 and that refresh
+fetches the post again. Then it times fetching many content pages through
+the API.
+
+Usage: python benchmarks/bench_api.py [--pages N] [--workers N] [--latency-ms MS]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from selenium.common.exceptions import WebDriverException
+
+from benchmarks.local_server import CatalogApiStub
+from circleftp.api import get_download_links_api
+from circleftp.page_cache import PageCache
+from circleftp.pipeline import fetch_links, fetch_page_links
+
+MISSING_POST = 999999
+BROKEN_POST = 10001
+
+
+def _page(post_id):
+    return f"http://new.circleftp.net/content/{post_id}"
+
+
+class _NoBrowserPool:
+    """Driver pool without a browser: records that the Selenium fallback was reached."""
+
+    def __init__(self):
+        self.acquired = []
+
+    def acquire(self, browser_type, timeout=None):
+        self.acquired.append(browser_type)
+        raise WebDriverException("no browser in this check")
+
+    def release(self, driver, discard=False):
+        pass
+
+
+def check_api_paths(stub):
+    """Raises SystemExit if extraction, the 404 fallback or malformed-body handling is wrong."""
+    log = lambda message: None
+    post = stub.posts[10000]
+    expected = [episode["link"] for season in post["content"] for episode in season["episodes"]]
+    links = get_download_links_api(_page(10000), log, base_url=stub.api_url)
+    if links != expected:
+        raise SystemExit(f"API links for post 10000: {links}, expected {expected}")
+
+    if get_download_links_api(_page(MISSING_POST), log, base_url=stub.api_url) is not None:
+        raise SystemExit("A 404 from the API must return None so the caller can fall back")
+    pool = _NoBrowserPool()
+    fetch_page_links(_page(MISSING_POST), log, api_base_url=stub.api_url, driver_pool=pool)
+    if pool.acquired != ["chrome"]:
+        raise SystemExit("A 404 from the API did not fall back to the browser")
+
+    if get_download_links_api(_page(BROKEN_POST), log, base_url=stub.api_url) is not None:
+        raise SystemExit("A body that is not JSON must return None")
+
+
+def check_cache_paths(stub, post_id=10002):
+    """Raises SystemExit if the page cache's TTL hit, 304 revalidation or forced refresh is wrong."""
+    log = lambda message: None
+    url = _page(post_id)
+    expected = get_download_links_api(url, log, base_url=stub.api_url)
+
+    def fetch(cache, refresh=False):
+        before = (stub.post_requests.get(post_id, 0), stub.not_modified)
+        links = fetch_page_links(url, log, api_base_url=stub.api_url, cache=cache, refresh=refresh)
+        if links != expected:
+            raise SystemExit(f"Cached fetch of post {post_id} returned {links}")
+        return stub.post_requests.get(post_id, 0) - before[0], stub.not_modified - before[1]
+
+    with tempfile.TemporaryDirectory() as directory:
+        fresh_cache = PageCache(directory, ttl=3600)
+        if fetch(fresh_cache) != (1, 0):
+            raise SystemExit("First fetch should be one full request")
+        if fetch(fresh_cache) != (0, 0):
+            raise SystemExit("A fresh cache entry must be used without a request")
+        if fetch(PageCache(directory, ttl=0)) != (1, 1):
+            raise SystemExit("A stale cache entry must be revalidated with a 304")
+        if fetch(fresh_cache, refresh=True) != (1, 0):
+            raise SystemExit("refresh must fetch the post again without If-None-Match")
+        if fetch(fresh_cache) != (0, 0):
+            raise SystemExit("The refreshed entry must be cached again")
+
+
+def run_case(pages, workers, latency_ms):
+    """Fetches `pages` content pages through the API. Returns seconds taken."""
+    with CatalogApiStub(categories=1, posts_per_category=pages, latency=latency_ms / 1000,
+                        broken_posts=[BROKEN_POST]) as stub:
+        check_api_paths(stub)
+        check_cache_paths(stub)
+        page_urls = [_page(post_id) for post_id in stub.posts if post_id != BROKEN_POST]
+        start = time.perf_counter()
+        links, failed = fetch_links(page_urls, lambda message: None, fetch_workers=workers, api_base_url=stub.api_url)
+        elapsed = time.perf_counter() - start
+        if failed or len(links) != 3 * len(page_urls):
+            raise SystemExit(f"API fetch of {len(page_urls)} pages: {len(links)} links, failed pages {failed}")
+    return elapsed
+
+
+def collect(pages=50, workers=8, latency_ms=10):
+    """Returns {metric name: milliseconds} for the benchmark suite."""
+    return {f"api/{pages} pages/{workers} workers": run_case(pages, workers, latency_ms) * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=8, help="content pages fetched in parallel")
+    parser.add_argument("--latency-ms", type=float, default=10, help="time the stub API takes per request")
+    args = parser.parse_args()
+
+    elapsed = run_case(args.pages, args.workers, args.latency_ms)
+    print("API checks passed: link extraction, 404 -> browser fallback, malformed body rejected, "
+          "cache TTL hit / 304 revalidation / refresh")
+    print(f"{args.pages} pages via the API, {args.workers} at a time ({args.latency_ms:g} ms per request): "
+          f"{elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
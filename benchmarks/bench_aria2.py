@@ -0,0 +1,91 @@
+"""Benchmark handing a batch to aria2 over JSON-RPC, against a local stand-in server.
+
+Compares one aria2.addUri request per link (on a new connection, and on one
+kept-alive connection) with the backend's single system.multicall, then
+polls the stub until every download has finished. --latency-ms imitates an
+aria2 daemon on another machine.
+
+Usage: python benchmarks/bench_aria2.py [--links N] [--latency-ms MS]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.local_server import Aria2RpcStub
+from circleftp.aria2 import Aria2Client
+from circleftp.backends import Aria2Backend
+from circleftp.pipeline import dispatch_batch
+
+
+def _urls(link_count):
+    return [f"http://ftp.example.net/show/S01E{i:04d}.mkv" for i in range(link_count)]
+
+
+def run_per_link(link_count, latency_ms=0, reuse_connection=True):
+    """One addUri request per link. Returns seconds taken."""
+    with Aria2RpcStub(latency=latency_ms / 1000) as stub:
+        client = Aria2Client(stub.rpc_url)
+        start = time.perf_counter()
+        for url in _urls(link_count):
+            client.call("aria2.addUri", [url])
+            if not reuse_connection:
+                client.close()
+        elapsed = time.perf_counter() - start
+        client.close()
+        if len(stub.downloads) != link_count:
+            raise SystemExit(f"Stub saw {len(stub.downloads)} downloads for {link_count} links")
+    return elapsed
+
+
+def run_multicall(link_count, latency_ms=0, download_time=0.2):
+    """The aria2 backend: one multicall for the batch, then polling until done.
+
+    Returns (seconds to hand over the batch, seconds until all finished).
+    """
+    with Aria2RpcStub(latency=latency_ms / 1000, download_time=download_time) as stub:
+        backend = Aria2Backend(rpc_url=stub.rpc_url, split=8, connections=4, poll_interval=0.05)
+        backend.prepare() # As in the app's pre-flight: opens the connection before the batch
+        start = time.perf_counter()
+        sent = dispatch_batch(_urls(link_count), lambda message: None, backend=backend)
+        handed_over = time.perf_counter() - start
+        status = backend.wait(interval=0.02)
+        finished = time.perf_counter() - start
+        backend.close()
+        options = next(iter(stub.downloads.values()))["options"]
+        if (sent != link_count or status["completed"] != link_count or stub.connection_count != 1
+                or options.get("split") != "8" or options.get("max-connection-per-server") != "4"):
+            raise SystemExit(f"aria2 backend: sent={sent}, status={status}, connections={stub.connection_count}, "
+                             f"options={options}")
+    return handed_over, finished
+
+
+def collect(link_count=100, latency_ms=2):
+    """Returns {metric name: milliseconds} for the benchmark suite."""
+    handed_over, _ = run_multicall(link_count, latency_ms)
+    return {
+        f"aria2/{link_count} links/addUri per link": run_per_link(link_count, latency_ms) * 1000,
+        f"aria2/{link_count} links/multicall": handed_over * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--links", type=int, default=200, help="links per batch")
+    parser.add_argument("--latency-ms", type=float, default=2, help="round-trip time the stub adds to every request")
+    args = parser.parse_args()
+
+    print(f"{args.links} links to a stand-in aria2 RPC server ({args.latency_ms:g} ms per request)")
+    for label, reuse in (("addUri per link, new connection", False), ("addUri per link, kept alive", True)):
+        elapsed = run_per_link(args.links, args.latency_ms, reuse_connection=reuse)
+        print(f"  {label:<34} {elapsed * 1000:8.1f} ms ({args.links / elapsed:8.0f} links/s)")
+    handed_over, finished = run_multicall(args.links, args.latency_ms)
+    print(f"  {'system.multicall (aria2 backend)':<34} {handed_over * 1000:8.1f} ms ({args.links / handed_over:8.0f} links/s)")
+    print(f"  all downloads reported finished after {finished * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
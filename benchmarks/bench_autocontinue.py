@@ -0,0 +1,160 @@
+"""Benchmark auto-continue against a stand-in IDM that "downloads" into a watched folder.
+
+Each dispatched link turns into a file in a temporary folder after
+--download-ms, which the DirectoryWatcher reports to the scheduler. Unrelated
+files (screenshots, browser downloads) keep appearing in the same folder
+meanwhile. The run checks that they never free a slot, so no more than
+--in-flight downloads run at once, and reports how long the queue took
+against the ideal (links / in-flight) x download time.
+
+Usage: python benchmarks/bench_autocontinue.py [--links N] [--in-flight N] [--download-ms MS]
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from circleftp.scheduler import AutoContinueScheduler, DirectoryWatcher, url_file_name
+
+POLL_INTERVAL = 0.02
+DEBOUNCE = 0.05
+
+
+def _urls(link_count):
+    return [f"http://ftp.example.net/show/S01E{i:03d}.mkv" for i in range(1, link_count + 1)]
+
+
+def _write(directory, name):
+    with open(os.path.join(directory, name), "wb") as f:
+        f.write(b"x" * 1024)
+
+
+def _wait_for(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+    return condition()
+
+
+def check_unrelated_files(in_flight=2):
+    """Unrelated files must not dispatch anything; a renamed copy of a link's file must."""
+    with tempfile.TemporaryDirectory() as directory:
+        dispatched = []
+        scheduler = AutoContinueScheduler(_urls(in_flight + 2), lambda url: dispatched.append(url) or True, in_flight,
+                                          lambda message: None)
+        watcher = DirectoryWatcher(directory, lambda name: scheduler.notify_completed(file_name=name),
+                                   poll_interval=POLL_INTERVAL, debounce=DEBOUNCE).start()
+        worker = threading.Thread(target=scheduler.run)
+        worker.start()
+        try:
+            _wait_for(lambda: len(dispatched) == in_flight, 5)
+            for name in ("Screenshot 2024-05-01.png", "invoice.pdf", "setup.exe"):
+                _write(directory, name)
+            time.sleep(10 * (POLL_INTERVAL + DEBOUNCE))
+            if len(dispatched) != in_flight:
+                raise SystemExit(f"Unrelated files dispatched {len(dispatched) - in_flight} extra links")
+            stem, ext = os.path.splitext(url_file_name(dispatched[0]))
+            _write(directory, f"{stem} (1){ext}") # IDM's name for a duplicate
+            if not _wait_for(lambda: len(dispatched) == in_flight + 1, 5):
+                raise SystemExit("A finished download did not free its slot")
+        finally:
+            scheduler.stop()
+            worker.join()
+            watcher.stop()
+
+
+def check_similar_names():
+    """A file whose name only starts with a link's file name (S01E10 vs S01E1) must not finish that link."""
+    dispatched = []
+    urls = ["http://ftp.example.net/show/S01E1.mkv", "http://ftp.example.net/show/S01E2.mkv"]
+    scheduler = AutoContinueScheduler(urls, lambda url: dispatched.append(url) or True, 1, lambda message: None)
+    worker = threading.Thread(target=scheduler.run)
+    worker.start()
+    try:
+        _wait_for(lambda: len(dispatched) == 1, 5)
+        for name in ("S01E10.mkv", "S01E1_final.mkv", "S01E1 (1).srt"):
+            scheduler.notify_completed(file_name=name)
+        time.sleep(10 * POLL_INTERVAL)
+        if len(dispatched) != 1:
+            raise SystemExit("A file that only starts with a link's file name freed its slot")
+        scheduler.notify_completed(file_name="S01E1_1.mkv") # Duplicate name with a "_1" suffix
+        if not _wait_for(lambda: len(dispatched) == 2, 5):
+            raise SystemExit("A duplicate-suffixed copy of a link's file did not free its slot")
+    finally:
+        scheduler.stop()
+        worker.join()
+
+
+def run_case(link_count, in_flight, download_time, noise_interval=0.05):
+    """Runs a whole queue. Returns (seconds, most downloads seen running at once)."""
+    with tempfile.TemporaryDirectory() as directory:
+        lock = threading.Lock()
+        running = [0, 0] # Now, most at once
+        timers = []
+
+        def finish(url):
+            with lock:
+                running[0] -= 1
+            _write(directory, url_file_name(url))
+
+        def dispatch(url):
+            with lock:
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            timer = threading.Timer(download_time, finish, (url,))
+            timers.append(timer)
+            timer.start()
+            return True
+
+        stop_noise = threading.Event()
+
+        def noise():
+            count = 0
+            while not stop_noise.wait(noise_interval):
+                count += 1
+                _write(directory, f"Screenshot {count}.png")
+
+        scheduler = AutoContinueScheduler(_urls(link_count), dispatch, in_flight, lambda message: None)
+        watcher = DirectoryWatcher(directory, lambda name: scheduler.notify_completed(file_name=name),
+                                   poll_interval=POLL_INTERVAL, debounce=DEBOUNCE).start()
+        noise_thread = threading.Thread(target=noise, daemon=True)
+        noise_thread.start()
+        start = time.perf_counter()
+        dispatched = scheduler.run(wait_for_completion=True)
+        elapsed = time.perf_counter() - start
+        stop_noise.set()
+        noise_thread.join()
+        watcher.stop()
+        for timer in timers:
+            timer.join()
+        if dispatched != link_count:
+            raise SystemExit(f"Dispatched {dispatched}/{link_count} links")
+        if running[1] > in_flight:
+            raise SystemExit(f"{running[1]} downloads ran at once with an in-flight limit of {in_flight}")
+    return elapsed, running[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--links", type=int, default=20)
+    parser.add_argument("--in-flight", type=int, default=4, help="downloads kept running")
+    parser.add_argument("--download-ms", type=float, default=200, help="time each stand-in download takes")
+    args = parser.parse_args()
+
+    check_unrelated_files()
+    check_similar_names()
+    print("Unrelated files in the watched folder: no extra dispatches; S01E10 does not finish S01E1")
+    elapsed, most = run_case(args.links, args.in_flight, args.download_ms / 1000)
+    ideal = math.ceil(args.links / args.in_flight) * args.download_ms / 1000
+    print(f"{args.links} links, {args.in_flight} in flight, {args.download_ms:g} ms each: {elapsed:.2f}s "
+          f"(ideal {ideal:.2f}s; at most {most} running at once)")
+
+
+if __name__ == "__main__":
+    main()
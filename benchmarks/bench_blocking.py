@@ -0,0 +1,108 @@
+"""Measure what resource blocking saves when Selenium loads a content page.
+
+Serves a stand-in for a CircleFTP page (HTMLs/chernobyl.htm with its poster,
+logo, stylesheets and web fonts) from a local throttled server and loads it
+with and without the blocking profile. Reports bytes served, requests and
+time until the download links are read.
+
+Usage: python benchmarks/bench_blocking.py [--browser chrome] [--runs N] [--kbps N]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.local_server import ThrottledFileServer
+
+PAGE_NAME = "chernobyl.htm"
+ASSETS_NAME = "chernobyl_files"
+FONT_BYTES = 48 * 1024 # Size of each stand-in web font file
+
+
+def build_site():
+    """Returns {path: bytes} for the stand-in page and its assets.
+
+    The React bundle is dropped (the saved page already holds the rendered
+    links) and Google Fonts URLs are pointed at local stand-in font files.
+    """
+    pages_dir = os.path.join(ROOT_DIR, "HTMLs")
+    with open(os.path.join(pages_dir, PAGE_NAME), "r", encoding="utf-8", errors="replace") as f:
+        html = f.read()
+    html = re.sub(r"<script[^>]*\bsrc=[^>]*></script>", "", html)
+    files = {"/" + PAGE_NAME: html.encode("utf-8")}
+
+    font_names = {}
+    def local_font(match):
+        name = font_names.setdefault(match.group(1), f"/fonts/{len(font_names)}.woff2")
+        return f"url({name})"
+
+    assets_dir = os.path.join(pages_dir, ASSETS_NAME)
+    for name in os.listdir(assets_dir):
+        if name.endswith(".js"):
+            continue
+        with open(os.path.join(assets_dir, name), "rb") as f:
+            body = f.read()
+        if name.endswith(".css"):
+            body = re.sub(r"url\((https?://[^)]+)\)", local_font, body.decode("utf-8")).encode("utf-8")
+        files[f"/{ASSETS_NAME}/{name}"] = body
+    for path in font_names.values():
+        files[path] = os.urandom(FONT_BYTES)
+    return files
+
+
+def load_once(browser, files, bytes_per_second, block_resources):
+    from circleftp.browser import create_webdriver, wait_for_download_links
+
+    driver = create_webdriver(browser, block_resources=block_resources)
+    try:
+        with ThrottledFileServer(files, bytes_per_second=bytes_per_second) as server:
+            start = time.perf_counter()
+            driver.get(f"{server.base_url}/{PAGE_NAME}")
+            links = wait_for_download_links(driver, timeout=30)
+            elapsed = time.perf_counter() - start
+            time.sleep(0.5) # Let late font/image requests show up in the counters
+            return {"seconds": elapsed, "bytes": server.bytes_sent, "requests": server.request_count,
+                    "links": len(links or [])}
+    finally:
+        driver.quit()
+
+
+def run(browser, runs, bytes_per_second):
+    files = build_site()
+    results = {}
+    for block_resources in (False, True):
+        samples = [load_once(browser, files, bytes_per_second, block_resources) for _ in range(runs)]
+        results["blocked" if block_resources else "full"] = {
+            "seconds": min(sample["seconds"] for sample in samples),
+            "bytes": min(sample["bytes"] for sample in samples),
+            "requests": min(sample["requests"] for sample in samples),
+            "links": samples[0]["links"],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--browser", choices=("chrome", "firefox", "edge"), default="chrome")
+    parser.add_argument("--runs", type=int, default=3, help="page loads per mode (a new browser each time; best is reported)")
+    parser.add_argument("--kbps", type=int, default=2048, help="per-connection speed of the local server")
+    args = parser.parse_args()
+
+    results = run(args.browser, max(1, args.runs), args.kbps * 1024)
+    full, blocked = results["full"], results["blocked"]
+    if full["links"] != blocked["links"]:
+        raise SystemExit(f"Blocking changed the extracted links: {full['links']} vs {blocked['links']}")
+    print(f"{'mode':<10}{'requests':>10}{'KB served':>12}{'seconds':>10}{'links':>8}")
+    for mode, row in results.items():
+        print(f"{mode:<10}{row['requests']:>10}{row['bytes'] / 1024:>12.1f}{row['seconds']:>10.2f}{row['links']:>8}")
+    saved_kb = (full["bytes"] - blocked["bytes"]) / 1024
+    print(f"Blocking saved {saved_kb:.1f} KB ({saved_kb * 1024 / max(full['bytes'], 1):.0%}) "
+          f"and {full['seconds'] - blocked['seconds']:.2f}s per page.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark the catalog crawler against a local stand-in of the site's JSON API.
+
+Crawls every category listing and post with 1, 4 and 8 workers (no rate
+limit) and checks that connections are reused, that no more than `workers`
+requests run at once and that a re-crawl only gets 304 answers. A last run
+checks that --rate holds the request rate.
+
+Usage: python benchmarks/bench_catalog.py [--categories N] [--posts N] [--latency-ms MS] [--workers 1 4 8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.local_server import CatalogApiStub
+from circleftp.catalog import CatalogCrawler, CatalogStore
+
+DEFAULT_WORKERS = (1, 4, 8)
+
+
+def run_case(categories, posts, workers, latency_ms=10, rate=0):
+    """Crawls a fresh catalog. Returns (seconds, requests made)."""
+    with CatalogApiStub(categories=categories, posts_per_category=posts, latency=latency_ms / 1000) as stub, \
+            tempfile.TemporaryDirectory() as directory:
+        store = CatalogStore(os.path.join(directory, "catalog.sqlite3"))
+        crawler = CatalogCrawler(store, lambda message: None, base_url=stub.api_url, workers=workers, rate=rate)
+        start = time.perf_counter()
+        complete = crawler.crawl()
+        elapsed = time.perf_counter() - start
+        counts = store.counts()
+        recrawl = CatalogCrawler(store, lambda message: None, base_url=stub.api_url, workers=workers, rate=0)
+        recrawl.crawl(restart=True)
+        store.close()
+        if not complete or counts["fetched"] != categories * posts:
+            raise SystemExit(f"Crawl with {workers} workers stored {counts}")
+        if stub.max_in_flight > workers or stub.connection_count > 2 * workers:
+            raise SystemExit(f"{workers} workers: {stub.max_in_flight} requests at once over {stub.connection_count} connections")
+        if any(count != 2 for count in stub.post_requests.values()):
+            raise SystemExit("Every post should be fetched once per crawl")
+    return elapsed, crawler.request_count
+
+
+def collect(categories=4, posts=50, workers=DEFAULT_WORKERS, latency_ms=10):
+    """Returns {metric name: milliseconds} for the benchmark suite."""
+    return {f"catalog/{categories * posts} posts/{w} workers": run_case(categories, posts, w, latency_ms)[0] * 1000
+            for w in workers}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--categories", type=int, default=4)
+    parser.add_argument("--posts", type=int, default=50, help="posts per category")
+    parser.add_argument("--latency-ms", type=float, default=10, help="time the stub API takes per request")
+    parser.add_argument("--workers", type=int, nargs="+", default=list(DEFAULT_WORKERS))
+    parser.add_argument("--rate", type=float, default=50, help="request rate for the rate-limit check")
+    args = parser.parse_args()
+
+    print(f"Crawling {args.categories} categories x {args.posts} posts ({args.latency_ms:g} ms per request)")
+    for workers in args.workers:
+        elapsed, requests = run_case(args.categories, args.posts, workers, args.latency_ms)
+        print(f"  {workers:>2} workers: {elapsed:6.2f}s ({requests / elapsed:6.1f} requests/s)")
+    elapsed, requests = run_case(args.categories, args.posts, max(args.workers), args.latency_ms, rate=args.rate)
+    steady = (requests - args.rate) / elapsed # The bucket starts full: one second's worth of requests go out at once
+    print(f"  rate limit {args.rate:g}/s: {requests} requests in {elapsed:.2f}s ({steady:.1f}/s after the initial burst)")
+
+
+if __name__ == "__main__":
+    main()
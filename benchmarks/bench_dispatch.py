@@ -0,0 +1,109 @@
+"""Benchmark sending a batch to IDM, using a fake IDM executable.
+
+The fake is a small Python script that appends its arguments to a log file
+and optionally sleeps to imitate IDM's hand-off time, so this measures our
+own dispatch overhead (process spawns, thread pool, the final '/s') on any OS.
+The in-memory "fake" backend is timed through the same dispatch_batch call
+as a floor: what is left once no process is spawned per link.
+
+Usage: python benchmarks/bench_dispatch.py [--links N] [--workers 1 4 8] [--delay-ms MS]
+"""
+import argparse
+import os
+import stat
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from circleftp.backends import FakeBackend, IdmBackend
+from circleftp.pipeline import dispatch_batch
+
+DEFAULT_WORKERS = (1, 4, 8)
+
+
+FAKE_IDM_SCRIPT = """
+import sys, time
+time.sleep({delay})
+with open({calls_log!r}, "a") as f:
+    f.write(" ".join(sys.argv[1:]) + "\\n")
+"""
+
+
+def make_fake_idm(directory, delay_ms=0):
+    """Writes a stand-in for IDMan.exe that records each call. Returns (exe_path, calls_log_path)."""
+    calls_log = os.path.join(directory, "idm_calls.log")
+    script_path = os.path.join(directory, "fake_idm.py")
+    with open(script_path, "w") as f:
+        f.write(FAKE_IDM_SCRIPT.format(delay=delay_ms / 1000, calls_log=calls_log))
+    if os.name == "nt":
+        exe_path = os.path.join(directory, "IDMan.bat")
+        with open(exe_path, "w") as f:
+            f.write(f'@"{sys.executable}" "{script_path}" %*\n')
+    else:
+        exe_path = os.path.join(directory, "IDMan")
+        with open(exe_path, "w") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script_path}" "$@"\n')
+        os.chmod(exe_path, os.stat(exe_path).st_mode | stat.S_IXUSR)
+    return exe_path, calls_log
+
+
+def _urls(link_count):
+    return [f"http://ftp.example.net/show/S01E{i:04d}.mkv" for i in range(link_count)]
+
+
+def run_case(link_count, workers, delay_ms=0):
+    """Dispatches link_count links with `workers` threads. Returns seconds taken."""
+    urls = _urls(link_count)
+    with tempfile.TemporaryDirectory() as directory:
+        exe_path, calls_log = make_fake_idm(directory, delay_ms)
+        backend = IdmBackend(exe_path, dispatch_workers=workers)
+        start = time.perf_counter()
+        sent = dispatch_batch(urls, lambda message: None, backend=backend)
+        elapsed = time.perf_counter() - start
+        with open(calls_log, "r") as f:
+            calls = f.read().splitlines()
+    if sent != link_count or len(calls) != link_count + 1 or calls[-1].strip() != "/s":
+        raise SystemExit(f"Fake IDM saw {len(calls)} calls for {link_count} links (sent={sent})")
+    return elapsed
+
+
+def run_fake_backend_case(link_count, delay_ms=0):
+    """Dispatches link_count links to the in-memory FakeBackend. Returns seconds taken."""
+    urls = _urls(link_count)
+    backend = FakeBackend(delay=delay_ms / 1000)
+    start = time.perf_counter()
+    sent = dispatch_batch(urls, lambda message: None, backend=backend)
+    elapsed = time.perf_counter() - start
+    status = backend.status()
+    if sent != link_count or status["submitted"] != link_count or backend.submitted_urls != urls:
+        raise SystemExit(f"Fake backend accepted {sent}/{link_count} links ({status})")
+    return elapsed
+
+
+def collect(link_count=40, workers=DEFAULT_WORKERS, delay_ms=0):
+    """Returns {metric name: milliseconds} for the benchmark suite."""
+    metrics = {f"dispatch/{link_count} links/{w} workers": run_case(link_count, w, delay_ms) * 1000 for w in workers}
+    metrics[f"dispatch/{link_count} links/fake backend"] = run_fake_backend_case(link_count, delay_ms) * 1000
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--links", type=int, default=100, help="links per batch")
+    parser.add_argument("--workers", type=int, nargs="+", default=list(DEFAULT_WORKERS), help="thread counts to compare")
+    parser.add_argument("--delay-ms", type=int, default=0, help="time the fake IDM takes per call")
+    args = parser.parse_args()
+
+    print(f"{args.links} links to a fake IDM ({args.delay_ms} ms per call)")
+    for workers in args.workers:
+        elapsed = run_case(args.links, workers, args.delay_ms)
+        print(f"  {workers:>2} workers: {elapsed:6.2f}s ({args.links / elapsed:7.1f} links/s)")
+    elapsed = run_fake_backend_case(args.links, args.delay_ms)
+    print(f"  fake backend: {elapsed:6.4f}s ({args.links / max(elapsed, 1e-9):9.0f} links/s)")
+
+
+if __name__ == "__main__":
+    main()
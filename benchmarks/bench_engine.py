@@ -0,0 +1,121 @@
+"""Benchmark the built-in download engine against a local throttled HTTP server.
+
+After the throughput cases, a resume check downloads through a server that
+drops every connection after --cut-kb KB, kills the downloading process
+partway and starts it again. The second run must produce the exact file,
+remove its journal and fetch only the bytes the journal reported missing.
+
+Usage: python benchmarks/bench_engine.py [--size-mb N] [--files N] [--kbps N] [--cut-kb N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.local_server import ThrottledFileServer
+from circleftp.engine import DownloadEngine
+from circleftp.segment_journal import JOURNAL_SUFFIX, SegmentJournal
+
+# Downloads argv[1] into argv[2] in a process of its own, so it can be killed like a crashed app
+_DOWNLOAD_PROCESS = """import sys
+sys.path.insert(0, sys.argv[3])
+from circleftp.engine import DownloadEngine
+DownloadEngine(sys.argv[2], segments_per_file=4).download(sys.argv[1])
+"""
+
+
+def run_case(server, urls, segments, parallel_files):
+    with tempfile.TemporaryDirectory() as target:
+        engine = DownloadEngine(target, segments_per_file=segments, max_parallel_files=parallel_files,
+                                max_connections=16, per_host_connections=16)
+        start = time.perf_counter()
+        done = engine.download_many(urls, log_callback=lambda message: None)
+        elapsed = time.perf_counter() - start
+        engine.close()
+        for url in urls:
+            name = url.rsplit("/", 1)[-1]
+            with open(os.path.join(target, name), "rb") as f:
+                if f.read() != server.files["/" + name]:
+                    raise SystemExit(f"Corrupt download: {name}")
+    return done, elapsed
+
+
+def _wait_until_idle(server, interval=0.2):
+    """Waits until the server stops sending (handlers of a killed client run into its closed socket)."""
+    while True:
+        before = server.bytes_sent
+        time.sleep(interval)
+        if server.bytes_sent == before:
+            return
+
+
+def run_resume_case(size, bytes_per_second, cut_after, kill_fraction=0.4, timeout=60):
+    """Interrupted download and restart. Returns (bytes left after the kill, bytes served on restart, seconds)."""
+    body = os.urandom(size)
+    with ThrottledFileServer({"/resume.bin": body}, bytes_per_second=bytes_per_second, cut_after=cut_after) as server, \
+            tempfile.TemporaryDirectory() as target:
+        url = server.base_url + "/resume.bin"
+        path = os.path.join(target, "resume.bin")
+        process = subprocess.Popen([sys.executable, "-c", _DOWNLOAD_PROCESS, url, target, ROOT_DIR])
+        deadline = time.monotonic() + timeout
+        while server.bytes_sent < size * kill_fraction and process.poll() is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        process.kill()
+        process.wait()
+        _wait_until_idle(server)
+
+        journal = SegmentJournal.load(path, url)
+        if journal is None or not 0 < journal.remaining_bytes() < size:
+            raise SystemExit(f"Resume check: no partial journal after the kill ({server.bytes_sent} bytes sent)")
+        remaining = journal.remaining_bytes()
+        with server.lock:
+            server.bytes_sent = 0
+        engine = DownloadEngine(target, segments_per_file=4)
+        start = time.perf_counter()
+        engine.download(url)
+        elapsed = time.perf_counter() - start
+        engine.close()
+        served = server.bytes_sent - 1 # The probe request reads one byte
+
+        with open(path, "rb") as f:
+            if f.read() != body:
+                raise SystemExit("Resume check: resumed file differs from the source")
+        leftovers = [name for name in os.listdir(target) if JOURNAL_SUFFIX in name]
+        if leftovers:
+            raise SystemExit(f"Resume check: journal left behind: {leftovers}")
+        if served != remaining:
+            raise SystemExit(f"Resume check: restart fetched {served} bytes, the journal reported {remaining} missing")
+    return remaining, served, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=4, help="size of each test file")
+    parser.add_argument("--files", type=int, default=3, help="number of files per batch")
+    parser.add_argument("--kbps", type=int, default=2048, help="per-connection speed cap in KB/s")
+    parser.add_argument("--cut-kb", type=int, default=384, help="resume check: drop every connection after this many KB")
+    args = parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    files = {f"/file{i}.bin": os.urandom(size) for i in range(args.files)}
+    with ThrottledFileServer(files, bytes_per_second=args.kbps * 1024) as server:
+        urls = [server.base_url + path for path in files]
+        total_mb = size * len(files) / (1024 * 1024)
+        print(f"{len(files)} files x {args.size_mb} MB, {args.kbps} KB/s per connection")
+        for label, segments, parallel in [("1 segment, sequential", 1, 1), ("1 segment, parallel files", 1, len(files)),
+                                          ("4 segments, parallel files", 4, len(files)), ("8 segments, parallel files", 8, len(files))]:
+            done, elapsed = run_case(server, urls, segments, parallel)
+            print(f"  {label:<30} {done}/{len(files)} files in {elapsed:6.2f}s ({total_mb / elapsed:6.2f} MB/s)")
+
+    remaining, served, elapsed = run_resume_case(size, args.kbps * 1024, args.cut_kb * 1024)
+    print(f"Resume after a kill (connections dropped every {args.cut_kb} KB): {served} of {size} bytes fetched again "
+          f"in {elapsed:.2f}s, matching the {remaining} bytes the journal reported missing")
+
+
+if __name__ == "__main__":
+    main()
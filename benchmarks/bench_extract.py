@@ -0,0 +1,80 @@
+"""Benchmark the link extraction engines on saved and synthetic pages.
+
+Usage: python benchmarks/bench_extract.py [--repeat N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from circleftp.extract import ENGINES, LINK_CLASS, SECTION_CLASS, find_download_links
+
+SYNTHETIC_SIZES = [10, 1_000, 10_000, 100_000]
+
+
+def make_synthetic_page(link_count):
+    """Builds a page shaped like a CircleFTP content page with link_count download anchors."""
+    head = "<html><head>" + "<script>var x = '<section>';</script>" * 20 + "</head><body><div id='root'>"
+    rows = "".join(
+        f'<div class="d-flex"><span>Episode {i}</span>'
+        f'<a href="http://ftp.example.net/show/S01E{i:05d}.mkv" class="{LINK_CLASS}" role="button">Download</a></div>'
+        for i in range(link_count)
+    )
+    return f'{head}<section class="{SECTION_CLASS}">{rows}</section><footer>' + "<p>x</p>" * 1000 + "</footer></div></body></html>"
+
+
+def saved_page_paths():
+    """Returns the saved content pages in HTMLs/ as (name, path) pairs."""
+    pages_dir = os.path.join(ROOT_DIR, "HTMLs")
+    names = sorted(n for n in os.listdir(pages_dir) if n.endswith((".htm", ".html"))) if os.path.isdir(pages_dir) else []
+    return [(name, os.path.join(pages_dir, name)) for name in names]
+
+
+def load_pages(synthetic_sizes=SYNTHETIC_SIZES):
+    pages = []
+    for name, path in saved_page_paths():
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            pages.append((name, f.read()))
+    for size in synthetic_sizes:
+        pages.append((f"synthetic-{size}", make_synthetic_page(size)))
+    return pages
+
+
+def run(repeat, synthetic_sizes=SYNTHETIC_SIZES):
+    results = []
+    for name, html in load_pages(synthetic_sizes):
+        expected = find_download_links(html, engine="bs4")
+        row = {"page": name, "bytes": len(html), "links": len(expected or [])}
+        for engine in ENGINES:
+            links = find_download_links(html, engine=engine)
+            if links != expected:
+                raise SystemExit(f"Engine '{engine}' disagrees with bs4 on {name}")
+            number = 1 if len(html) > 1_000_000 else 20
+            best = min(timeit.repeat(lambda: find_download_links(html, engine=engine), number=number, repeat=repeat)) / number
+            row[engine] = best
+        results.append(row)
+    return results
+
+
+def collect(repeat=3, synthetic_sizes=SYNTHETIC_SIZES):
+    """Returns {metric name: milliseconds} for the benchmark suite."""
+    return {f"extract/{engine}/{row['page']}": row[engine] * 1000
+            for row in run(repeat, synthetic_sizes) for engine in ENGINES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="timing repetitions per page (best is reported)")
+    args = parser.parse_args()
+
+    print(f"{'page':<28}{'bytes':>11}{'links':>8}" + "".join(f"{e + ' ms':>12}" for e in ENGINES) + f"{'speedup':>10}")
+    for row in run(args.repeat):
+        timings = "".join(f"{row[e] * 1000:>12.2f}" for e in ENGINES)
+        print(f"{row['page']:<28}{row['bytes']:>11}{row['links']:>8}{timings}{row['bs4'] / row['stream']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
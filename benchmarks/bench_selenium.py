@@ -0,0 +1,105 @@
+"""Benchmark the Selenium fetch path on local file:// pages.
+
+Compares reading the links from the DOM (get_download_links_selenium) with
+serializing page_source and parsing it (get_full_html_content_selenium +
+extraction), using one warm browser for all loads. Skipped if the browser
+or its driver is not available.
+
+Usage: python benchmarks/bench_selenium.py [--browser chrome] [--runs N]
+"""
+import argparse
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.bench_extract import make_synthetic_page, saved_page_paths
+from circleftp.extract import extract_download_links_from_html, find_download_links
+
+SYNTHETIC_SIZES = [100, 10_000]
+
+
+def _quiet(message):
+    pass
+
+
+def page_files(directory, synthetic_sizes=SYNTHETIC_SIZES):
+    """Returns (name, file:// URI) for the saved pages plus synthetic pages written to directory.
+
+    Saved pages without a download section are left out; the DOM wait would
+    only measure its timeout on them.
+    """
+    pages = []
+    for name, path in saved_page_paths():
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            if find_download_links(f.read()) is not None:
+                pages.append((name, pathlib.Path(path).as_uri()))
+    for size in synthetic_sizes:
+        path = os.path.join(directory, f"synthetic-{size}.html")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(make_synthetic_page(size))
+        pages.append((f"synthetic-{size}", pathlib.Path(path).as_uri()))
+    return pages
+
+
+def run(browser, runs, synthetic_sizes=SYNTHETIC_SIZES):
+    """Returns a list of {page, links, dom, page_source} rows (best seconds), or raises if no browser."""
+    from circleftp.browser import get_download_links_selenium, get_full_html_content_selenium
+    from circleftp.pipeline import make_driver_pool
+
+    pool = make_driver_pool(log_callback=_quiet)
+    try:
+        pool.release(pool.acquire(browser)) # Boot the browser outside the timings
+        rows = []
+        with tempfile.TemporaryDirectory() as directory:
+            for name, uri in page_files(directory, synthetic_sizes):
+                row = {"page": name, "dom": float("inf"), "page_source": float("inf")}
+                for _ in range(runs):
+                    start = time.perf_counter()
+                    links = get_download_links_selenium(uri, browser, _quiet, driver_pool=pool)
+                    row["dom"] = min(row["dom"], time.perf_counter() - start)
+
+                    start = time.perf_counter()
+                    html = get_full_html_content_selenium(uri, browser, _quiet, driver_pool=pool)
+                    parsed = extract_download_links_from_html(html, _quiet) if html else None
+                    row["page_source"] = min(row["page_source"], time.perf_counter() - start)
+                if (links or []) != (parsed or []): # e.g. a saved page's own scripts re-rendered it
+                    print(f"WARNING: DOM and page_source disagree on {name}: {len(links or [])} vs "
+                          f"{len(parsed or [])} links", file=sys.stderr)
+                row["links"] = len(links or [])
+                rows.append(row)
+        return rows
+    finally:
+        pool.shutdown()
+
+
+def collect(browser="chrome", runs=2, synthetic_sizes=SYNTHETIC_SIZES):
+    """Returns {metric name: milliseconds} for the benchmark suite."""
+    metrics = {}
+    for row in run(browser, runs, synthetic_sizes):
+        metrics[f"selenium/{browser}/dom/{row['page']}"] = row["dom"] * 1000
+        metrics[f"selenium/{browser}/page_source/{row['page']}"] = row["page_source"] * 1000
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--browser", choices=("chrome", "firefox", "edge"), default="chrome")
+    parser.add_argument("--runs", type=int, default=3, help="loads per page and method (best is reported)")
+    args = parser.parse_args()
+
+    try:
+        rows = run(args.browser, max(1, args.runs))
+    except Exception as e:
+        raise SystemExit(f"Skipped: could not start {args.browser}: {str(e).splitlines()[0]}")
+    print(f"{'page':<28}{'links':>8}{'dom ms':>10}{'page_source ms':>16}")
+    for row in rows:
+        print(f"{row['page']:<28}{row['links']:>8}{row['dom'] * 1000:>10.1f}{row['page_source'] * 1000:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Measure start-up cost: module import time and time to the first painted window.
+
+Each measurement runs in a fresh interpreter. The window measurement needs a
+display and is skipped without one.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--budget-ms MS]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each probe prints a JSON dict of timings (seconds) on its last line
+IMPORT_PROBE = """
+import json, time
+start = time.perf_counter()
+import {module}
+print(json.dumps({{"import": time.perf_counter() - start}}))
+"""
+
+WINDOW_PROBE = """
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+try:
+    window = app.DownloaderApp()
+except Exception as e: # No display available
+    print(json.dumps({"skipped": str(e).splitlines()[0]}))
+    raise SystemExit(0)
+while not window.winfo_ismapped():
+    window.update()
+window.update()
+painted = time.perf_counter()
+window.destroy()
+print(json.dumps({"import": imported - start, "first_paint": painted - start}))
+"""
+
+# Modules that must not be imported before the window is shown / by the CLI
+HEAVY_MODULES = ("selenium", "requests", "psutil", "sqlite3", "bs4")
+
+
+def run_probe(code, home_dir):
+    env = dict(os.environ, HOME=home_dir, USERPROFILE=home_dir) # Keep the user's config untouched
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "probe failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def heavy_modules_loaded(module, home_dir):
+    code = f"import sys, json; import {module}; print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT_DIR, env=dict(os.environ, HOME=home_dir),
+                            capture_output=True, text=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]) if result.returncode == 0 else ["<import failed>"]
+
+
+def measure(runs):
+    """Returns {metric name: median milliseconds} plus any skipped metrics."""
+    results = {}
+    with tempfile.TemporaryDirectory() as home_dir:
+        for label, module in (("import app (GUI)", "app"), ("import circleftp.cli", "circleftp.cli")):
+            timings = [run_probe(IMPORT_PROBE.format(module=module), home_dir)["import"] for _ in range(runs)]
+            results[label] = statistics.median(timings) * 1000
+            results[f"{label} heavy modules"] = heavy_modules_loaded(module, home_dir)
+
+        paints = []
+        for _ in range(runs):
+            probe = run_probe(WINDOW_PROBE, home_dir)
+            if "skipped" in probe:
+                results["first paint"] = f"skipped ({probe['skipped']})"
+                break
+            paints.append(probe["first_paint"])
+        if paints:
+            results["first paint"] = statistics.median(paints) * 1000
+    return results
+
+
+def collect(runs=3):
+    """Returns {metric name: milliseconds} for the benchmark suite (skipped measurements are left out)."""
+    return {f"startup/{label}": value for label, value in measure(runs).items() if isinstance(value, float)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement (median is reported)")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="fail (exit code 1) if importing app takes longer than this")
+    args = parser.parse_args()
+
+    results = measure(args.runs)
+    for label, value in results.items():
+        shown = f"{value:8.1f} ms" if isinstance(value, float) else value
+        print(f"{label:<36} {shown}")
+
+    over_budget = args.budget_ms is not None and results["import app (GUI)"] > args.budget_ms
+    if over_budget:
+        print(f"FAIL: import app exceeds the {args.budget_ms:.0f} ms budget")
+    heavy = results["import app (GUI) heavy modules"] + results["import circleftp.cli heavy modules"]
+    if heavy:
+        print(f"FAIL: heavy modules imported at start-up: {', '.join(heavy)}")
+    sys.exit(1 if over_budget or heavy else 0)
+
+
+if __name__ == "__main__":
+    main()
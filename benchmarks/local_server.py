@@ -0,0 +1,364 @@
+"""Local stand-in HTTP servers used by the benchmarks."""
+import itertools
+import json
+import mimetypes
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+class _FileHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        body = server.files.get(self.path.split("?")[0])
+        if body is None:
+            self.send_error(404)
+            return
+        with server.lock:
+            server.request_count += 1
+        start, end = 0, len(body) - 1
+        range_header = self.headers.get("Range")
+        match = _RANGE_PATTERN.fullmatch(range_header or "") if server.supports_ranges else None
+        if match:
+            if match.group(1):
+                start = int(match.group(1))
+                end = int(match.group(2)) if match.group(2) else end
+            else: # Suffix range: last N bytes
+                start = max(0, len(body) - int(match.group(2)))
+            end = min(end, len(body) - 1)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(body)}")
+        else:
+            self.send_response(200)
+        if server.supports_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Type", mimetypes.guess_type(self.path.split("?")[0])[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", server.etag)
+        self.end_headers()
+        try:
+            self._send_throttled(body, start, end)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True # Client went away (cancelled or segment finished)
+
+    def _send_throttled(self, body, start, end):
+        server = self.server
+        chunk = 16 * 1024
+        sent = 0
+        position = start
+        while position <= end:
+            piece = body[position:min(position + chunk, end + 1)]
+            cut = server.cut_after is not None and sent + len(piece) > server.cut_after
+            if cut:
+                piece = piece[:server.cut_after - sent]
+            self.wfile.write(piece)
+            with server.lock:
+                server.bytes_sent += len(piece)
+            if cut:
+                self.close_connection = True
+                return # Drop the connection mid-transfer
+            sent += len(piece)
+            position += len(piece)
+            if server.bytes_per_second:
+                time.sleep(len(piece) / server.bytes_per_second)
+
+
+class ThrottledFileServer(ThreadingHTTPServer):
+    """Serves in-memory files with Range support, a per-connection speed cap
+    and (optionally) connections that drop after `cut_after` bytes.
+
+    bytes_sent counts the body bytes written, including those of dropped
+    connections, so a benchmark can check how much a resume re-fetched.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, files, bytes_per_second=None, supports_ranges=True, cut_after=None, etag='"v1"'):
+        super().__init__(("127.0.0.1", 0), _FileHandler)
+        self.files = files
+        self.bytes_per_second = bytes_per_second
+        self.supports_ranges = supports_ranges
+        self.cut_after = cut_after
+        self.etag = etag
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.bytes_sent = 0
+        self._thread = None
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError): # A killed client resets its kept-alive sockets
+            super().handle_error(request, client_address)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _Aria2RpcHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True # Headers and body go out as separate writes on a kept-alive connection
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connection_count += 1 # One per TCP connection; keep-alive reuses the handler
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        server.request_count += 1
+        if server.latency:
+            time.sleep(server.latency)
+        try:
+            reply = {"result": server.dispatch(request["method"], request.get("params", []))}
+        except _RpcFault as fault:
+            reply = {"error": {"code": fault.code, "message": str(fault)}}
+        body = json.dumps(dict(reply, jsonrpc="2.0", id=request.get("id"))).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json-rpc")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _RpcFault(Exception):
+    def __init__(self, message, code=1):
+        super().__init__(message)
+        self.code = code
+
+
+class Aria2RpcStub(ThreadingHTTPServer):
+    """Stand-in for `aria2c --enable-rpc`: the JSON-RPC calls the aria2 backend uses.
+
+    Added downloads "run" for `download_time` seconds, reporting a growing
+    completedLength of `file_size` bytes, then move to the stopped list.
+    URLs containing "fail" end in status "error". Every request waits
+    `latency` seconds, to imitate a round trip to another machine.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, secret=None, download_time=0.2, file_size=10 * 1024 * 1024, latency=0.0):
+        super().__init__(("127.0.0.1", 0), _Aria2RpcHandler)
+        self.secret = secret
+        self.download_time = download_time
+        self.file_size = file_size
+        self.latency = latency
+        self.downloads = {} # gid -> {"uri", "options", "added"}
+        self.request_count = 0
+        self.connection_count = 0
+        self.method_counts = {}
+        self._gids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def rpc_url(self):
+        return f"http://127.0.0.1:{self.server_port}/jsonrpc"
+
+    def dispatch(self, method, params):
+        self.method_counts[method] = self.method_counts.get(method, 0) + 1
+        if method == "system.multicall":
+            results = []
+            for call in params[0]:
+                try:
+                    results.append([self.dispatch(call["methodName"], call.get("params", []))])
+                except _RpcFault as fault:
+                    results.append({"faultCode": fault.code, "faultString": str(fault)})
+            return results
+        if self.secret is not None:
+            if not params or params[0] != f"token:{self.secret}":
+                raise _RpcFault("Unauthorized")
+            params = params[1:]
+        handler = getattr(self, "_" + method.replace(".", "_"), None)
+        if handler is None:
+            raise _RpcFault(f"No such method: {method}")
+        return handler(*params)
+
+    def _status(self, gid, keys=None):
+        download = self.downloads[gid]
+        fraction = min(1.0, (time.monotonic() - download["added"]) / self.download_time) if self.download_time else 1.0
+        if fraction < 1.0:
+            state = "active"
+        else:
+            state = "error" if "fail" in download["uri"] else "complete"
+        item = {"gid": gid, "status": state, "totalLength": str(self.file_size),
+                "completedLength": str(int(self.file_size * fraction)),
+                "downloadSpeed": str(int(self.file_size / self.download_time)) if state == "active" else "0",
+                "errorMessage": "stub failure" if state == "error" else ""}
+        return {key: item[key] for key in keys if key in item} if keys else item
+
+    def _aria2_getVersion(self):
+        return {"version": "1.37.0-stub", "enabledFeatures": []}
+
+    def _aria2_addUri(self, uris, options=None, position=None):
+        with self._lock:
+            gid = f"{next(self._gids):016x}"
+            self.downloads[gid] = {"uri": uris[0], "options": options or {}, "added": time.monotonic()}
+        return gid
+
+    def _aria2_tellStatus(self, gid, keys=None):
+        if gid not in self.downloads:
+            raise _RpcFault(f"GID {gid} is not found")
+        return self._status(gid, keys)
+
+    def _aria2_tellActive(self, keys=None):
+        return [item for item in (self._status(gid, keys) for gid in list(self.downloads)) if item["status"] == "active"]
+
+    def _aria2_tellWaiting(self, offset, num, keys=None):
+        return [] # Everything starts at once
+
+    def _aria2_tellStopped(self, offset, num, keys=None):
+        stopped = [item for item in (self._status(gid, keys) for gid in list(self.downloads)) if item["status"] != "active"]
+        if offset < 0:
+            stopped.reverse()
+            offset = -offset - 1
+        return stopped[offset:offset + num]
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _CatalogApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connection_count += 1
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if server.latency:
+                time.sleep(server.latency)
+            status, body, etag = server.answer(self.path, self.headers.get("If-None-Match"))
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+        payload = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class CatalogApiStub(ThreadingHTTPServer):
+    """Stand-in for the site's JSON API (categories, index links, category listings, posts).
+
+    `categories` categories hold `posts_per_category` posts each; every post
+    has `links_per_post` episode links and an ETag, so repeat crawls get 304s.
+    Posts listed in `broken_posts` answer with a body that is not JSON.
+    Every request waits `latency` seconds. request_count, connection_count
+    and max_in_flight show how the crawler behaved.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, categories=5, posts_per_category=50, links_per_post=3, latency=0.0, broken_posts=()):
+        super().__init__(("127.0.0.1", 0), _CatalogApiHandler)
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.connection_count = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.post_requests = {} # post id -> times requested
+        self.not_modified = 0 # 304 answers to conditional post requests
+        self.broken_posts = set(broken_posts)
+        self.categories = [{"id": c, "name": f"Category {c}"} for c in range(1, categories + 1)]
+        self.posts = {}
+        for category in self.categories:
+            for n in range(posts_per_category):
+                post_id = category["id"] * 10000 + n
+                self.posts[post_id] = {
+                    "id": post_id, "title": f"Show {post_id}", "categories": [category],
+                    "content": [{"seasonName": "Season 1", "episodes": [
+                        {"title": f"E{e}", "link": f"http://ftp.example.net/{post_id}/E{e:02d}.mkv"}
+                        for e in range(1, links_per_post + 1)]}]}
+        first_post = next(iter(self.posts))
+        self.index_links = [{"name": "Featured", "link": f"http://new.circleftp.net/content/{first_post}", "children": [
+            {"name": "English Movies", "link": "http://ftp.example.net/English%20Movies/"}]}]
+        self._thread = None
+
+    @property
+    def api_url(self):
+        return f"http://127.0.0.1:{self.server_port}/api"
+
+    def answer(self, path, if_none_match=None):
+        """Returns (status, JSON body, ETag) for a request path."""
+        parts = urlsplit(path)
+        route = parts.path[len("/api"):] if parts.path.startswith("/api") else parts.path
+        if route == "/categories":
+            return 200, self.categories, None
+        if route == "/index-links":
+            return 200, {"indexLinks": self.index_links}, None
+        if route == "/posts":
+            query = dict(parse_qsl(parts.query))
+            category = int(query.get("categoryExact", 0))
+            page, limit = int(query.get("page", 1)), int(query.get("limit", 24))
+            matching = [{"id": p["id"], "title": p["title"]} for p in self.posts.values()
+                        if p["categories"][0]["id"] == category]
+            total_pages = max(1, -(-len(matching) // limit))
+            return 200, {"posts": matching[(page - 1) * limit:page * limit], "totalPages": total_pages}, None
+        match = re.fullmatch(r"/posts/(\d+)", route)
+        if match and int(match.group(1)) in self.posts:
+            post_id = int(match.group(1))
+            with self.lock:
+                self.post_requests[post_id] = self.post_requests.get(post_id, 0) + 1
+            if post_id in self.broken_posts:
+                return 200, b"<html>Bad Gateway</html>", None
+            etag = f'"post-{post_id}-v1"'
+            if if_none_match == etag:
+                with self.lock:
+                    self.not_modified += 1
+                return 304, None, etag
+            return 200, self.posts[post_id], etag
+        return 404, {"message": "Not found"}, None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,173 @@
+"""Run the benchmark suite and keep a JSON history to catch regressions.
+
+Runs link extraction (saved pages and 10-100k link pages), the Selenium path
+on file:// pages, the JSON API fetch path, IDM dispatch against a fake IDM,
+aria2 dispatch against a stand-in RPC server, the catalog crawler against a
+stand-in API and start-up imports. Each run is appended to the history file
+and compared with the median of the last few runs of the same machine. A
+benchmark whose built-in correctness check fails (SystemExit) is reported
+as FAILED; one that cannot run here (an exception, e.g. no browser) as
+skipped.
+
+Usage: python benchmarks/run_suite.py [--only extract dispatch ...] [--history FILE] [--check]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+DEFAULT_HISTORY_FILE = os.path.join(ROOT_DIR, "benchmarks", "history.json")
+BASELINE_RUNS = 5          # Previous runs whose median is the baseline
+DEFAULT_THRESHOLD = 0.25   # Slower than baseline by more than this fraction = regression
+NOISE_FLOOR_MS = 1.0       # Ignore differences smaller than this
+
+
+def _extract():
+    from benchmarks import bench_extract
+    return bench_extract.collect(repeat=1)
+
+
+def _selenium(browser):
+    from benchmarks import bench_selenium
+    return bench_selenium.collect(browser=browser)
+
+
+def _api():
+    from benchmarks import bench_api
+    return bench_api.collect()
+
+
+def _dispatch():
+    from benchmarks import bench_dispatch
+    return bench_dispatch.collect()
+
+
+def _aria2():
+    from benchmarks import bench_aria2
+    return bench_aria2.collect()
+
+
+def _catalog():
+    from benchmarks import bench_catalog
+    return bench_catalog.collect()
+
+
+def _startup():
+    from benchmarks import bench_startup
+    return bench_startup.collect()
+
+
+def run_benchmarks(names, browser, log):
+    """Runs the named benchmarks. Returns (metrics, skipped, failed) with metrics in milliseconds."""
+    benchmarks = {"extract": _extract, "selenium": lambda: _selenium(browser), "api": _api, "dispatch": _dispatch,
+                  "aria2": _aria2, "catalog": _catalog, "startup": _startup}
+    metrics, skipped, failed = {}, {}, {}
+    for name in names:
+        log(f"Running {name}...")
+        start = time.perf_counter()
+        try:
+            metrics.update(benchmarks[name]())
+        except SystemExit as e: # A benchmark's own correctness check failed
+            failed[name] = str(e.code)
+            log(f"  FAILED: {failed[name]}")
+            continue
+        except Exception as e: # A missing browser/driver must not sink the other benchmarks
+            skipped[name] = str(e).splitlines()[0] if str(e) else type(e).__name__
+            log(f"  skipped: {skipped[name]}")
+            continue
+        log(f"  done in {time.perf_counter() - start:.1f}s")
+    return metrics, skipped, failed
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def load_history(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            history = json.load(f)
+        return history if isinstance(history, list) else []
+    except (OSError, ValueError):
+        return []
+
+
+def save_history(path, history):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp_path, path)
+
+
+def compare(metrics, history, machine, threshold=DEFAULT_THRESHOLD):
+    """Returns [(metric, baseline_ms, current_ms, change)] for every metric with a baseline."""
+    rows = []
+    previous = [entry for entry in history if entry.get("machine") == machine]
+    for metric, current in sorted(metrics.items()):
+        values = [entry["metrics"][metric] for entry in previous if metric in entry.get("metrics", {})][-BASELINE_RUNS:]
+        if not values:
+            continue
+        baseline = statistics.median(values)
+        change = (current - baseline) / baseline if baseline else 0.0
+        rows.append((metric, baseline, current, change))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--only", nargs="+", choices=("extract", "selenium", "api", "dispatch", "aria2", "catalog", "startup"),
+                        default=["extract", "selenium", "api", "dispatch", "aria2", "catalog", "startup"],
+                        help="benchmarks to run")
+    parser.add_argument("--browser", choices=("chrome", "firefox", "edge"), default="chrome")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_FILE, help="JSON file the results are appended to")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="fractional slowdown against the baseline that counts as a regression")
+    parser.add_argument("--no-save", action="store_true", help="compare only; do not append this run")
+    parser.add_argument("--check", action="store_true", help="exit with code 1 if anything regressed or a check failed")
+    args = parser.parse_args()
+
+    log = lambda message: print(message, file=sys.stderr, flush=True)
+    metrics, skipped, failed = run_benchmarks(args.only, args.browser, log)
+    machine = f"{platform.node()} {platform.system()} {platform.machine()} py{platform.python_version()}"
+    history = load_history(args.history)
+
+    regressions = []
+    rows = compare(metrics, history, machine, args.threshold)
+    compared = {row[0] for row in rows}
+    print(f"{'metric':<60}{'baseline ms':>13}{'now ms':>11}{'change':>9}")
+    for metric, baseline, current, change in rows:
+        regressed = change > args.threshold and current - baseline > NOISE_FLOOR_MS
+        if regressed:
+            regressions.append(metric)
+        print(f"{metric:<60}{baseline:>13.2f}{current:>11.2f}{change:>+8.0%}" + ("  REGRESSION" if regressed else ""))
+    for metric in sorted(set(metrics) - compared):
+        print(f"{metric:<60}{'-':>13}{metrics[metric]:>11.2f}{'new':>9}")
+    for name, reason in skipped.items():
+        print(f"{name}: skipped ({reason})")
+    for name, reason in failed.items():
+        print(f"{name}: FAILED ({reason})")
+
+    if not args.no_save:
+        history.append({"time": datetime.datetime.now().isoformat(timespec="seconds"), "commit": _git_commit(),
+                        "machine": machine, "metrics": metrics, "skipped": skipped, "failed": failed})
+        save_history(args.history, history)
+        log(f"Results appended to {args.history}")
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}.")
+    sys.exit(1 if args.check and (regressions or failed) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Core helpers for the CircleFTP Batch Downloader (no GUI dependencies)."""
@@ -0,0 +1,5 @@
+import sys
+
+from circleftp.cli import main
+
+sys.exit(main())
@@ -0,0 +1,142 @@
+"""Direct JSON API access to the CircleFTP backend (no browser required).
+
+`requests` is imported on first use so importing this module stays cheap.
+"""
+import re
+import threading
+
+from circleftp.tracing import span
+
+# Base URL the site's own React bundle uses (see HTMLs/*_files/main.*.js)
+DEFAULT_API_BASE_URL = "http://new.circleftp.net:5000/api"
+
+CONTENT_ID_PATTERN = re.compile(r"/content/(\d+)")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Returns the shared, connection-pooled HTTP session."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=2)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"Accept": "application/json"})
+            _session = session
+        return _session
+
+
+def close_session():
+    """Closes the shared HTTP session (called on application exit)."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def parse_content_id(url):
+    """Returns the numeric content ID from a '/content/<id>' page URL, or None."""
+    match = CONTENT_ID_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+
+def fetch_post(content_id, base_url=DEFAULT_API_BASE_URL, session=None, timeout=10, etag=None, last_modified=None):
+    """Fetches a post, conditionally if validators are given. Raises on HTTP/network errors.
+
+    Returns (post, body_text, validators); post is None if the server
+    answered 304 Not Modified. validators holds the response's 'etag' and
+    'last_modified' headers.
+    """
+    session = session or get_session()
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    response = session.get(f"{base_url.rstrip('/')}/posts/{content_id}", timeout=timeout, headers=headers)
+    validators = {"etag": response.headers.get("ETag") or etag,
+                  "last_modified": response.headers.get("Last-Modified") or last_modified}
+    if response.status_code == 304:
+        return None, None, validators
+    response.raise_for_status()
+    return response.json(), response.text, validators
+
+
+def extract_links_from_post(post):
+    """Builds the ordered, de-duplicated download link list from a post's JSON."""
+    content = post.get("content") if isinstance(post, dict) else None
+    links = []
+
+    if isinstance(content, str): # Single video/file: content is the link itself
+        links.append(content)
+    elif isinstance(content, list):
+        for item in content:
+            if not isinstance(item, dict):
+                continue
+            if isinstance(item.get("episodes"), list): # Series: list of seasons
+                for episode in item["episodes"]:
+                    if isinstance(episode, dict) and episode.get("link"):
+                        links.append(episode["link"])
+            elif item.get("link"): # Multi-file/multi-video: list of {title, link}
+                links.append(item["link"])
+
+    return list(dict.fromkeys(link.strip() for link in links if isinstance(link, str) and link.strip()))
+
+
+def get_download_links_api(url, log_callback, progress_callback=None, base_url=None, session=None, cache=None):
+    """Fetches download links for a content page via the JSON API.
+
+    Returns a list of URLs, or None if the API path is unavailable so the
+    caller can fall back to Selenium. With a PageCache, a stale entry is
+    revalidated with a conditional request and fresh results are stored.
+    """
+    import requests
+
+    content_id = parse_content_id(url)
+    if not content_id:
+        log_callback("URL has no '/content/<id>' part; API fetch not applicable.")
+        return None
+
+    base_url = base_url or DEFAULT_API_BASE_URL
+    cached = cache.get(url) if cache else None
+    validators = {"etag": cached.get("etag"), "last_modified": cached.get("last_modified")} if cached else {}
+    log_callback(f"Fetching content {content_id} via API: {base_url}")
+    if progress_callback: progress_callback(0.1)
+    try:
+        with span("api request", content_id=content_id):
+            post, body, validators = fetch_post(content_id, base_url=base_url, session=session, **validators)
+    except requests.RequestException as e:
+        log_callback(f"API fetch failed: {e}")
+        if progress_callback: progress_callback(0)
+        return None
+    except ValueError as e: # Invalid JSON
+        log_callback(f"API returned invalid JSON: {e}")
+        if progress_callback: progress_callback(0)
+        return None
+
+    if post is None: # 304: the cached links are still current
+        log_callback(f"API reports content {content_id} unchanged; using {len(cached['links'])} cached links.")
+        cache.touch(url, cached)
+        if progress_callback: progress_callback(1.0)
+        return cached["links"]
+
+    if progress_callback: progress_callback(0.8)
+    links = extract_links_from_post(post)
+    if not links:
+        log_callback("API response contained no download links.")
+        if progress_callback: progress_callback(0)
+        return None
+
+    if cache:
+        cache.put(url, links, body=body, source="api", **validators)
+    title = post.get("title") if isinstance(post, dict) else None
+    log_callback(f"API returned {len(links)} download links" + (f" for '{title}'." if title else "."))
+    if progress_callback: progress_callback(1.0)
+    return links
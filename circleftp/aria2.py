@@ -0,0 +1,129 @@
+"""aria2 JSON-RPC integration (aria2c --enable-rpc).
+
+All calls go over one persistent HTTP connection. A batch of links is added
+with a single `system.multicall` request instead of one call per link.
+`requests` is imported on first use.
+"""
+import itertools
+import threading
+
+DEFAULT_RPC_URL = "http://localhost:6800/jsonrpc"
+DEFAULT_SPLIT = 4          # Connections per download (aria2's "split")
+DEFAULT_CONNECTIONS = 4    # aria2's "max-connection-per-server"
+MULTICALL_CHUNK = 500      # Links per system.multicall; stays well under aria2's --rpc-max-request-size
+STOPPED_PAGE = 1000        # Newest stopped downloads read per poll (aria2 keeps 1000 by default)
+STATUS_KEYS = ["gid", "status", "totalLength", "completedLength", "downloadSpeed", "errorMessage"]
+FINISHED_STATES = ("complete", "error", "removed")
+
+# config.json keys of the aria2 backend and their defaults
+ARIA2_DEFAULTS = {
+    "aria2_rpc_url": DEFAULT_RPC_URL,
+    "aria2_secret": "",            # aria2c --rpc-secret
+    "aria2_split": DEFAULT_SPLIT,
+    "aria2_connections": DEFAULT_CONNECTIONS,
+    "aria2_dir": "",               # Download folder on the aria2 side; empty = aria2's own --dir
+}
+
+
+class Aria2Error(Exception):
+    """An RPC fault reported by aria2, or a failed request (code None)."""
+
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+def _fault(fault):
+    # JSON-RPC faults carry code/message; multicall entries use XML-RPC's faultCode/faultString
+    return Aria2Error(fault.get("message", fault.get("faultString", "unknown error")),
+                      fault.get("code", fault.get("faultCode")))
+
+
+class Aria2Client:
+    """Minimal aria2 JSON-RPC client. Calls are serialized over one keep-alive connection."""
+
+    def __init__(self, rpc_url=DEFAULT_RPC_URL, secret=None, timeout=10, session=None):
+        self.rpc_url = rpc_url
+        self.secret = secret
+        self.timeout = timeout
+        self._session = session
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+        return self._session
+
+    def _with_token(self, params):
+        return ([f"token:{self.secret}"] if self.secret else []) + list(params)
+
+    def _post(self, method, params):
+        payload = {"jsonrpc": "2.0", "id": str(next(self._ids)), "method": method, "params": params}
+        with self._lock:
+            try:
+                response = self._get_session().post(self.rpc_url, json=payload, timeout=self.timeout)
+                reply = response.json()
+            except Exception as e: # requests.RequestException, or a non-JSON answer
+                raise Aria2Error(f"RPC request to {self.rpc_url} failed: {e}") from e
+        if reply.get("error"):
+            raise _fault(reply["error"])
+        return reply.get("result")
+
+    def call(self, method, *params):
+        """Calls one aria2 method (the secret token is added). Raises Aria2Error."""
+        return self._post(method, self._with_token(params))
+
+    def multicall(self, calls):
+        """Runs [(method, params), ...] in one system.multicall round trip.
+
+        Returns one entry per call: its result, or an Aria2Error instance if
+        that call failed. Raises Aria2Error if the request as a whole fails.
+        """
+        if not calls:
+            return []
+        entries = [{"methodName": method, "params": self._with_token(params)} for method, params in calls]
+        results = self._post("system.multicall", [entries])
+        return [item[0] if isinstance(item, list) and item else _fault(item if isinstance(item, dict) else {})
+                for item in results]
+
+    def add_uris(self, urls, options=None):
+        """Adds each URL as its own download. Returns a GID or an Aria2Error per URL."""
+        results = []
+        for start in range(0, len(urls), MULTICALL_CHUNK):
+            chunk = urls[start:start + MULTICALL_CHUNK]
+            results.extend(self.multicall([("aria2.addUri", [[url], dict(options or {})]) for url in chunk]))
+        return results
+
+    def tell_statuses(self, gids=()):
+        """Returns {gid: status dict} for active, waiting and recently stopped downloads.
+
+        One round trip (tellActive + tellWaiting + tellStopped); GIDs from
+        `gids` that none of them list are looked up with tellStatus.
+        """
+        active, waiting, stopped = self.multicall([
+            ("aria2.tellActive", [STATUS_KEYS]),
+            ("aria2.tellWaiting", [0, STOPPED_PAGE, STATUS_KEYS]),
+            ("aria2.tellStopped", [-1, STOPPED_PAGE, STATUS_KEYS]), # Newest first
+        ])
+        statuses = {}
+        for listing in (stopped, waiting, active):
+            if isinstance(listing, Aria2Error):
+                raise listing
+            statuses.update((item["gid"], item) for item in listing)
+        missing = [gid for gid in gids if gid not in statuses]
+        for gid, item in zip(missing, self.multicall([("aria2.tellStatus", [gid, STATUS_KEYS]) for gid in missing])):
+            # aria2 forgets old results (--max-download-result); an unknown GID counts as failed
+            statuses[gid] = item if isinstance(item, dict) else {"gid": gid, "status": "error", "errorMessage": str(item)}
+        return statuses
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
@@ -0,0 +1,411 @@
+"""Download backends: the step that hands extracted links to a downloader.
+
+Every backend implements the same small protocol:
+
+* prepare()          -- get ready before the first batch (e.g. launch IDM); returns True/False
+* submit_batch(urls) -- hands a batch over; returns the number accepted
+* submit(url, done)  -- hands over one link; backends with reports_completion call done(url, ok)
+                        when the download actually ends (used by auto-continue)
+* status()           -- counts of submitted / completed / failed links
+* wait()             -- blocks until submitted downloads have finished (backends with reports_completion)
+* cancel(), close()
+
+The GUI, the CLI and the benchmarks only talk to this protocol, so a new
+downloader is one class plus an entry in create_backend().
+"""
+import threading
+import time
+
+from circleftp.aria2 import ARIA2_DEFAULTS, FINISHED_STATES, Aria2Client, Aria2Error
+from circleftp.idm import (DEFAULT_DISPATCH_WORKERS, DEFAULT_LAUNCH_TIMEOUT, IdmProcessWatcher,
+                           initiate_idm_direct_downloads)
+
+from circleftp.tracing import span
+
+BACKENDS = ("idm", "builtin", "aria2", "fake")
+
+
+class DownloadBackend:
+    """Base class with the shared status bookkeeping; subclasses implement submit_batch."""
+
+    name = None
+    reports_completion = False # True if submit()'s done callback fires when a download finishes
+
+    def __init__(self, log_callback=None):
+        self.log_callback = log_callback or (lambda message: None)
+        self._lock = threading.Lock()
+        self._counts = {"submitted": 0, "completed": 0, "failed": 0}
+        self._cancelled = threading.Event()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._counts[key] += amount
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def prepare(self):
+        """Gets the backend ready for the first batch. Returns False (after logging why) if it cannot run."""
+        return True
+
+    def submit_batch(self, urls, count_progress_callback=None, url_sent_callback=None):
+        """Hands urls to the downloader. Returns how many were accepted.
+
+        count_progress_callback(n) reports the running total, url_sent_callback(url)
+        fires once per accepted link.
+        """
+        raise NotImplementedError
+
+    def submit(self, url, done_callback=None):
+        """Hands over a single link; returns True if it was accepted.
+
+        done_callback(url, ok) is only called by backends with reports_completion.
+        """
+        return self.submit_batch([url]) == 1
+
+    def status(self):
+        """Returns {"backend", "submitted", "completed", "failed", "active", "cancelled"}.
+
+        completed/failed/active are None for backends that cannot see downloads finish (IDM).
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        if not self.reports_completion:
+            counts.update(completed=None, failed=None, active=None)
+        else:
+            counts["active"] = max(0, counts["submitted"] - counts["completed"] - counts["failed"])
+        return dict(counts, backend=self.name, cancelled=self.cancelled)
+
+    def wait(self, report_callback=None, interval=1.0):
+        """Blocks until no submitted download is active and returns status().
+
+        report_callback(status) is called every `interval` seconds meanwhile.
+        Returns at once for backends without reports_completion, or once cancelled.
+        """
+        while self.reports_completion and not self.cancelled:
+            status = self.status()
+            if not status["active"]:
+                return status
+            if report_callback: report_callback(status)
+            time.sleep(interval)
+        return self.status()
+
+    def cancel(self):
+        """Stops handing over links; links already submitted are left to the downloader."""
+        self._cancelled.set()
+
+    def close(self):
+        pass
+
+
+class IdmBackend(DownloadBackend):
+    """Queues links in Internet Download Manager through its command line."""
+
+    name = "idm"
+
+    def __init__(self, idm_path, log_callback=None, dispatch_workers=DEFAULT_DISPATCH_WORKERS,
+                 process_watcher=None, launch_timeout=DEFAULT_LAUNCH_TIMEOUT):
+        super().__init__(log_callback)
+        self.idm_path = idm_path
+        self.dispatch_workers = dispatch_workers
+        self.process_watcher = process_watcher or IdmProcessWatcher()
+        self.launch_timeout = launch_timeout
+
+    def prepare(self):
+        """Launches IDM unless it is running, and waits until its process is up."""
+        try:
+            if self.process_watcher.launch(self.idm_path, timeout=self.launch_timeout):
+                return True
+            self.log_callback(f"ERROR: IDM did not start within {self.launch_timeout:g} seconds.")
+        except FileNotFoundError:
+            self.log_callback(f"ERROR launching IDM: File not found at {self.idm_path}")
+        except Exception as e:
+            self.log_callback(f"ERROR launching IDM: {e}")
+        return False
+
+    def submit_batch(self, urls, count_progress_callback=None, url_sent_callback=None):
+        def sent(url):
+            self._count("submitted")
+            if url_sent_callback: url_sent_callback(url)
+
+        return initiate_idm_direct_downloads(urls, self.idm_path, self.log_callback, count_progress_callback, sent,
+                                             max_workers=self.dispatch_workers, cancel_event=self._cancelled)
+
+
+class BuiltinBackend(DownloadBackend):
+    """Downloads with the app's own multi-connection engine (circleftp.engine).
+
+    submit_batch() returns once the files are downloaded; submit() starts a
+    download in the background and reports when it ends. The engine (and
+    requests) is only created on first use.
+    """
+
+    name = "builtin"
+    reports_completion = True
+
+    def __init__(self, download_dir, log_callback=None, max_parallel_files=None):
+        super().__init__(log_callback)
+        self.download_dir = download_dir
+        self.max_parallel_files = max_parallel_files
+        self._engine = None
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            from circleftp.engine import DEFAULT_MAX_PARALLEL_FILES, DownloadEngine
+            self._engine = DownloadEngine(self.download_dir, log_callback=self.log_callback,
+                                          max_parallel_files=self.max_parallel_files or DEFAULT_MAX_PARALLEL_FILES)
+        return self._engine
+
+    def submit_batch(self, urls, count_progress_callback=None, url_sent_callback=None):
+        from circleftp.engine import initiate_builtin_downloads
+        if self.cancelled:
+            return 0
+
+        def done(url):
+            self._count("completed")
+            if url_sent_callback: url_sent_callback(url)
+
+        self._count("submitted", len(urls))
+        completed = initiate_builtin_downloads(urls, self.download_dir, self.log_callback, count_progress_callback,
+                                               done, engine=self.engine)
+        self._count("failed", len(urls) - completed)
+        return completed
+
+    def submit(self, url, done_callback=None):
+        if self.cancelled:
+            return False
+
+        def finished(url, path):
+            self._count("completed" if path else "failed")
+            if done_callback: done_callback(url, path is not None)
+
+        self._count("submitted")
+        return self.engine.submit(url, finished) is not None
+
+    def cancel(self):
+        super().cancel()
+        if self._engine:
+            self._engine.cancel()
+
+    def close(self):
+        if self._engine:
+            self._engine.close()
+
+
+class Aria2Backend(DownloadBackend):
+    """Hands links to an aria2c daemon over JSON-RPC.
+
+    A batch is one system.multicall of aria2.addUri calls (each with the
+    configured split / max-connection-per-server) instead of one process per
+    link. A background poller asks for tellActive/tellWaiting/tellStopped in
+    one round trip every `poll_interval` seconds; it reports finished
+    downloads and keeps byte counts and speed for status().
+    """
+
+    name = "aria2"
+    reports_completion = True
+
+    def __init__(self, log_callback=None, rpc_url=ARIA2_DEFAULTS["aria2_rpc_url"], secret=None,
+                 split=ARIA2_DEFAULTS["aria2_split"], connections=ARIA2_DEFAULTS["aria2_connections"],
+                 download_dir=None, poll_interval=1.0, client=None):
+        super().__init__(log_callback)
+        self.client = client or Aria2Client(rpc_url, secret)
+        self.options = {"split": str(max(1, split)), "max-connection-per-server": str(max(1, connections))}
+        if download_dir:
+            self.options["dir"] = download_dir
+        self.poll_interval = poll_interval
+        self._tracked = {} # gid -> (url, done_callback)
+        self._transfer = {"bytes_done": 0, "bytes_total": 0, "speed": 0}
+        self._poller = None
+        self._stop_polling = threading.Event()
+
+    def prepare(self):
+        """Checks that the aria2 RPC interface answers (and the secret is right)."""
+        try:
+            version = self.client.call("aria2.getVersion")
+        except Aria2Error as e:
+            self.log_callback(f"ERROR: aria2 RPC is not reachable at {self.client.rpc_url}: {e}")
+            return False
+        self.log_callback(f"Connected to aria2 {version.get('version', '')} at {self.client.rpc_url}.")
+        return True
+
+    def _add(self, urls, done_callback=None):
+        """Adds urls in one multicall; returns the accepted ones. Failures are logged and counted."""
+        self._count("submitted", len(urls))
+        try:
+            with span("aria2 multicall", links=len(urls)):
+                results = self.client.add_uris(urls, self.options)
+        except Aria2Error as e:
+            self.log_callback(f"ERROR sending links to aria2: {e}")
+            self._count("failed", len(urls))
+            return []
+        accepted = []
+        for url, result in zip(urls, results):
+            if isinstance(result, Aria2Error):
+                self.log_callback(f"ERROR: aria2 rejected {url}: {result}")
+                self._count("failed")
+                continue
+            with self._lock:
+                self._tracked[result] = (url, done_callback)
+            accepted.append(url)
+        if accepted:
+            self._start_poller()
+        return accepted
+
+    def submit_batch(self, urls, count_progress_callback=None, url_sent_callback=None):
+        if not urls or self.cancelled:
+            if count_progress_callback: count_progress_callback(0)
+            return 0
+        accepted = self._add(urls)
+        for url in accepted:
+            if url_sent_callback: url_sent_callback(url)
+        if count_progress_callback: count_progress_callback(len(accepted))
+        self.log_callback(f"Sent {len(accepted)}/{len(urls)} links to aria2 in one request.")
+        return len(accepted)
+
+    def submit(self, url, done_callback=None):
+        return not self.cancelled and bool(self._add([url], done_callback))
+
+    def _start_poller(self):
+        with self._lock:
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll_loop, name="aria2-poll", daemon=True)
+                self._poller.start()
+
+    def _poll_loop(self):
+        while not self._stop_polling.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Aria2Error as e:
+                self.log_callback(f"WARNING: aria2 status poll failed: {e}")
+
+    def poll(self):
+        """Reads the status of every tracked download once and reports the finished ones."""
+        with self._lock:
+            gids = list(self._tracked)
+        if not gids:
+            return
+        statuses = self.client.tell_statuses(gids)
+        finished = []
+        transfer = {"bytes_done": 0, "bytes_total": 0, "speed": 0}
+        with self._lock:
+            for gid in gids:
+                item = statuses.get(gid, {})
+                if item.get("status") in FINISHED_STATES:
+                    finished.append((gid, item, self._tracked.pop(gid)))
+                    self._counts["completed" if item["status"] == "complete" else "failed"] += 1
+                    continue
+                transfer["bytes_done"] += int(item.get("completedLength") or 0)
+                transfer["bytes_total"] += int(item.get("totalLength") or 0)
+                transfer["speed"] += int(item.get("downloadSpeed") or 0)
+            self._transfer = transfer
+        for gid, item, (url, done_callback) in finished:
+            ok = item["status"] == "complete"
+            if not ok:
+                self.log_callback(f"ERROR: aria2 download {item['status']}: {url} {item.get('errorMessage') or ''}".rstrip())
+            if done_callback: done_callback(url, ok)
+
+    def status(self):
+        """Adds the live byte counts of unfinished downloads (bytes_done, bytes_total, speed in bytes/s)."""
+        status = super().status()
+        with self._lock:
+            status.update(self._transfer)
+        return status
+
+    def close(self):
+        self._stop_polling.set()
+        if self._poller:
+            self._poller.join(timeout=self.client.timeout)
+        self.client.close()
+
+
+class FakeBackend(DownloadBackend):
+    """In-memory stand-in that accepts every link, for benchmarks and runs without a downloader.
+
+    `delay` (seconds) imitates the downloader's hand-off time per link;
+    `download_time` is how long each download "runs" before submit()'s done
+    callback fires. Links in `fail_urls` are rejected. Accepted links are
+    kept in `submitted_urls`.
+    """
+
+    name = "fake"
+    reports_completion = True
+
+    def __init__(self, log_callback=None, delay=0.0, download_time=0.0, fail_urls=()):
+        super().__init__(log_callback)
+        self.delay = delay
+        self.download_time = download_time
+        self.fail_urls = set(fail_urls)
+        self.submitted_urls = []
+        self._timers = []
+
+    def _accept(self, url):
+        if self.delay:
+            time.sleep(self.delay)
+        self._count("submitted")
+        if url in self.fail_urls:
+            self._count("failed")
+            return False
+        with self._lock:
+            self.submitted_urls.append(url)
+        return True
+
+    def submit_batch(self, urls, count_progress_callback=None, url_sent_callback=None):
+        accepted = 0
+        for url in urls:
+            if self.cancelled:
+                break
+            if not self._accept(url):
+                continue
+            accepted += 1
+            self._count("completed")
+            if url_sent_callback: url_sent_callback(url)
+            if count_progress_callback: count_progress_callback(accepted)
+        self.log_callback(f"Fake backend accepted {accepted}/{len(urls)} links.")
+        return accepted
+
+    def submit(self, url, done_callback=None):
+        if self.cancelled or not self._accept(url):
+            return False
+
+        def finish():
+            self._count("completed")
+            if done_callback: done_callback(url, True)
+
+        if self.download_time > 0:
+            timer = threading.Timer(self.download_time, finish)
+            timer.daemon = True
+            with self._lock:
+                self._timers.append(timer)
+            timer.start()
+        else:
+            finish()
+        return True
+
+    def close(self):
+        with self._lock:
+            timers, self._timers = self._timers, []
+        for timer in timers:
+            timer.cancel()
+
+
+def create_backend(name, log_callback=None, idm_path=None, download_dir=None, dispatch_workers=DEFAULT_DISPATCH_WORKERS,
+                   process_watcher=None, max_parallel_files=None, aria2_settings=None):
+    """Creates the backend called `name` (one of BACKENDS); options a backend does not use are ignored.
+
+    aria2_settings holds the aria2_* config.json keys (see ARIA2_DEFAULTS).
+    """
+    if name == "idm":
+        return IdmBackend(idm_path, log_callback, dispatch_workers=dispatch_workers, process_watcher=process_watcher)
+    if name == "builtin":
+        return BuiltinBackend(download_dir, log_callback, max_parallel_files=max_parallel_files)
+    if name == "aria2":
+        settings = dict(ARIA2_DEFAULTS, **(aria2_settings or {}))
+        return Aria2Backend(log_callback, rpc_url=settings["aria2_rpc_url"], secret=settings["aria2_secret"] or None,
+                            split=int(settings["aria2_split"]), connections=int(settings["aria2_connections"]),
+                            download_dir=settings["aria2_dir"] or None)
+    if name == "fake":
+        return FakeBackend(log_callback)
+    raise ValueError(f"Unknown download backend: {name}")
@@ -0,0 +1,332 @@
+"""Selenium-based page fetching (fallback when the JSON API is unavailable)."""
+import os
+import pathlib  # For platform-independent file path handling
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.firefox.service import Service as FirefoxService
+from selenium.webdriver.edge.service import Service as EdgeService
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from circleftp.extract import LINK_CLASS, SECTION_CLASS
+from circleftp.settings import CHROMEDRIVER_PATH, EDGEDRIVER_PATH, GECKODRIVER_PATH
+from circleftp.tracing import span
+
+SUPPORTED_BROWSERS = ("chrome", "firefox", "edge")
+
+# "normal" waits for every image/font, "eager" only for the DOM, "none" for nothing;
+# the download links are awaited by WAIT_FOR_LINKS_JS either way.
+PAGE_LOAD_STRATEGIES = ("eager", "none", "normal")
+DEFAULT_PAGE_LOAD_STRATEGY = "eager"
+
+# Requests that never matter for link extraction: posters, web fonts, stylesheets, analytics.
+# Scripts are not blocked; the page needs them to render the download section.
+BLOCKED_URL_PATTERNS = (
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.css",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*connect.facebook.net*",
+)
+FIREFOX_BLOCKING_PREFS = {
+    "permissions.default.image": 2,          # No images
+    "gfx.downloadable_fonts.enabled": False, # No web fonts
+    "browser.display.use_document_fonts": 0,
+    "privacy.trackingprotection.enabled": True, # Drops known analytics/ad hosts
+}
+
+SECTION_SELECTOR = "section." + ".".join(SECTION_CLASS.split())
+LINK_SELECTOR = "a." + ".".join(LINK_CLASS.split()) + "[href]"
+STALE_MARKER = "__circleftpStalePage" # Set on the previous document before navigating away
+SETTLE_MS = 150      # Quiet period without link changes in the download section before links are read
+MAX_SETTLE_MS = 2000 # Upper bound on that wait once the section exists, however often its links change
+
+# Async script: resolves with {links: [...]} once the download section exists
+# and its links have not changed for settleMs (at most maxSettleMs after it
+# appeared; [] if it has no anchors), {links: null} on timeout (no section),
+# or {stale: true} while the browser still shows the previous document.
+# Until the section exists only its appearance is checked, so spinners,
+# carousels or ads elsewhere on the page never delay the result.
+WAIT_FOR_LINKS_JS = """
+const [sectionSelector, linkSelector, timeoutMs, settleMs, maxSettleMs, staleMarker, done] = arguments;
+if (window[staleMarker]) { done({stale: true}); return; }
+let observer = null, settleTimer = null, settleCap = null, finished = false;
+const readLinks = section => Array.from(section.querySelectorAll(linkSelector), a => a.getAttribute('href')).filter(Boolean);
+const finish = section => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    clearTimeout(settleTimer);
+    clearTimeout(settleCap);
+    clearTimeout(deadline);
+    // Re-query: a re-render may have replaced the observed section
+    done({links: section ? readLinks(document.querySelector(sectionSelector) || section) : null});
+};
+const settle = section => {
+    let lastLinks = readLinks(section).join('\\n');
+    const restart = () => { clearTimeout(settleTimer); settleTimer = setTimeout(() => finish(section), settleMs); };
+    observer = new MutationObserver(() => {
+        const links = readLinks(section).join('\\n');
+        if (links !== lastLinks) { lastLinks = links; restart(); }
+    });
+    observer.observe(section, {childList: true, subtree: true});
+    settleCap = setTimeout(() => finish(section), maxSettleMs);
+    restart();
+};
+const findSection = () => {
+    const section = finished ? null : document.querySelector(sectionSelector);
+    if (!section) return false;
+    if (observer) observer.disconnect();
+    settle(section);
+    return true;
+};
+const deadline = setTimeout(() => finish(null), timeoutMs);
+if (!findSection()) {
+    observer = new MutationObserver(findSection);
+    observer.observe(document.documentElement || document, {childList: true, subtree: true});
+}
+"""
+
+
+def create_webdriver(browser_type, page_load_strategy=None, block_resources=True):
+    """Creates a headless WebDriver for the given browser type.
+
+    With block_resources, images, fonts, stylesheets and analytics are not
+    downloaded with Chrome/Edge (CDP Network.setBlockedURLs). Firefox has no
+    pref for stylesheets, so its prefs only skip images, fonts and tracker hosts.
+    """
+    browser_type = browser_type.lower()
+    # WebDriver setup (service, options) based on browser_type
+    if browser_type == 'chrome':
+        service = ChromeService(executable_path=CHROMEDRIVER_PATH)
+        options = webdriver.ChromeOptions()
+    elif browser_type == 'firefox':
+        service = FirefoxService(executable_path=GECKODRIVER_PATH)
+        options = webdriver.FirefoxOptions()
+        options.add_argument("-headless") # Firefox needs this specific argument for headless
+        if block_resources:
+            for name, value in FIREFOX_BLOCKING_PREFS.items():
+                options.set_preference(name, value)
+    elif browser_type == 'edge':
+        service = EdgeService(executable_path=EDGEDRIVER_PATH)
+        options = webdriver.EdgeOptions()
+    else:
+        raise ValueError(f"Unsupported browser: {browser_type}")
+
+    options.page_load_strategy = page_load_strategy or DEFAULT_PAGE_LOAD_STRATEGY
+
+    # Common headless options for Chrome and Edge
+    if browser_type != 'firefox':
+        options.add_argument("--headless")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--log-level=3")
+        options.add_argument("--disable-logging")
+        if block_resources:
+            options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+
+    # Initialize WebDriver
+    if browser_type == 'firefox':
+        return webdriver.Firefox(service=service, options=options)
+    if browser_type == 'chrome':
+        driver = webdriver.Chrome(service=service, options=options)
+    else:
+        driver = webdriver.Edge(service=service, options=options)
+    if block_resources:
+        block_urls_cdp(driver) # Chromium has no pref for fonts/CSS; DevTools can block any URL
+    return driver
+
+
+def block_urls_cdp(driver, patterns=BLOCKED_URL_PATTERNS):
+    """Makes a Chromium-based driver refuse requests matching patterns for the rest of its life."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+    except WebDriverException:
+        driver.quit()
+        raise
+
+
+def _to_loadable_url(url, log_callback):
+    """Returns (url_to_load, is_local_file) for a web URL, file:/// URI or local path."""
+    if not (url.startswith('http://') or url.startswith('https://') or url.startswith('file:///')):
+        if os.path.exists(url):
+            try:
+                return pathlib.Path(url).as_uri(), True
+            except Exception as e:
+                log_callback(f"Error converting local path to URI: {e}. Trying original path.")
+            return url, True
+        return url, False
+    return url, url.startswith('file:///')
+
+
+def wait_for_download_links(driver, timeout=20, poll_interval=0.05):
+    """Runs WAIT_FOR_LINKS_JS in the current page and returns the hrefs, or None if no section rendered.
+
+    Must be called right after driver.get(); with the "none" page load
+    strategy it retries until the new document has replaced the old one.
+    """
+    driver.set_script_timeout(timeout + 5)
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining_ms = max(int((deadline - time.monotonic()) * 1000), 0)
+        result = driver.execute_async_script(WAIT_FOR_LINKS_JS, SECTION_SELECTOR, LINK_SELECTOR, remaining_ms,
+                                             SETTLE_MS, MAX_SETTLE_MS, STALE_MARKER) or {}
+        if not result.get("stale"):
+            return result.get("links")
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(poll_interval)
+
+
+def get_download_links_selenium(url, browser_type, log_callback, progress_callback=None, driver_pool=None, timeout=20):
+    """Loads a page with Selenium and reads the download hrefs straight from the DOM.
+
+    Instead of waiting for the whole page (images, fonts) and serializing
+    page_source, the links are returned by an in-page MutationObserver as
+    soon as the download section has rendered. Returns a list of URLs, or
+    None on failure.
+    """
+    url_to_load, is_local_file = _to_loadable_url(url, log_callback)
+    log_callback(f"Loading local HTML: {url_to_load}" if is_local_file else f"Fetching web URL via {browser_type}: {url_to_load}")
+
+    if browser_type.lower() not in SUPPORTED_BROWSERS:
+        log_callback(f"ERROR: Unsupported browser: {browser_type}.")
+        return None
+
+    if progress_callback: progress_callback(0.05)
+    driver = None
+    driver_failed = False
+    try:
+        driver = driver_pool.acquire(browser_type) if driver_pool else create_webdriver(browser_type)
+        try:
+            driver.execute_script(f"window.{STALE_MARKER} = true;") # Lets the wait tell old and new documents apart
+        except WebDriverException:
+            pass # Fresh driver on about:blank / data: page
+        with span("driver.get", url=url_to_load):
+            driver.get(url_to_load)
+        if progress_callback: progress_callback(0.3)
+
+        # Saved pages are static, so a missing section will not appear later
+        with span("wait for links"):
+            links = wait_for_download_links(driver, timeout=5 if is_local_file else timeout)
+        if links is None:
+            log_callback(f"ERROR: Timeout waiting for download section on {url_to_load}.")
+            if is_local_file: log_callback("For local files, section might be missing or JS-dependent.")
+            if progress_callback: progress_callback(0)
+            return None
+
+        links = list(dict.fromkeys(links))
+        if not links:
+            log_callback("WARNING: No download links (<a> tags with 'btn-success') found in section.")
+        else:
+            log_callback(f"Found {len(links)} potential download links.")
+        if progress_callback: progress_callback(1.0)
+        return links
+
+    except FileNotFoundError as e:
+        log_callback(f"ERROR: WebDriver for {browser_type} not found at '{e.filename}'. Check 'drivers' folder.")
+        if progress_callback: progress_callback(0)
+        return None
+    except TimeoutException:
+        log_callback(f"ERROR: Timeout waiting for download section on {url_to_load}.")
+        if progress_callback: progress_callback(0)
+        return None
+    except WebDriverException as e:
+        driver_failed = True
+        log_callback(f"ERROR: Selenium WebDriver failed for {browser_type} with {url_to_load}: {e}")
+        if "net::ERR_FILE_NOT_FOUND" in str(e).lower():
+            log_callback(f"Hint: Local file path '{url}' might be incorrect.")
+        if progress_callback: progress_callback(0)
+        return None
+    except Exception as e:
+        driver_failed = True
+        log_callback(f"Unexpected error during Selenium fetching for {url_to_load}: {e}")
+        if progress_callback: progress_callback(0)
+        return None
+    finally:
+        if driver:
+            if driver_pool:
+                driver_pool.release(driver, discard=driver_failed) # Keep it warm for the next fetch
+            else:
+                driver.quit()
+
+
+def get_full_html_content_selenium(url, browser_type, log_callback, progress_callback=None, driver_pool=None):
+    """Fetches HTML from a URL or local file using Selenium.
+
+    If a WebDriverPool is given, a warm driver is borrowed from it and returned
+    afterwards instead of starting and quitting a browser for this call.
+    """
+    url_to_load, is_local_file = _to_loadable_url(url, log_callback)
+    if is_local_file:
+        log_callback(f"Loading local HTML: {url_to_load}")
+    else:
+        log_callback(f"Fetching web URL via {browser_type}: {url_to_load}")
+
+    if browser_type.lower() not in SUPPORTED_BROWSERS:
+        log_callback(f"ERROR: Unsupported browser: {browser_type}.")
+        return None
+
+    if progress_callback: progress_callback(0.05)
+    driver = None
+    driver_failed = False
+    try:
+        if driver_pool:
+            driver = driver_pool.acquire(browser_type)
+        else:
+            driver = create_webdriver(browser_type)
+
+        with span("driver.get", url=url_to_load):
+            driver.get(url_to_load)
+        if progress_callback: progress_callback(0.15)
+
+        # Wait for the main download section to ensure page is fully loaded,
+        # but skip this for local files as content is assumed static.
+        if not is_local_file:
+            wait = WebDriverWait(driver, 20) # 20-second timeout
+            with span("WebDriverWait"):
+                wait.until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "section.bg-light.mt-2.rounded.p-2.w-75.mx-auto"))
+                )
+            log_callback("Main download section loaded.")
+        else:
+            log_callback("Local file loaded; skipping dynamic element wait.")
+
+        if progress_callback: progress_callback(0.8)
+        with span("page_source"):
+            full_html = driver.page_source
+        log_callback("Successfully fetched/loaded full HTML.")
+        if progress_callback: progress_callback(1.0)
+        return full_html
+
+    except FileNotFoundError as e:
+        log_callback(f"ERROR: WebDriver for {browser_type} not found at '{e.filename}'. Check 'drivers' folder.")
+        if progress_callback: progress_callback(0)
+        return None
+    except TimeoutException:
+        # The driver itself is fine; only the page didn't render in time
+        log_callback(f"ERROR: Timeout waiting for download section on {url_to_load}.")
+        if is_local_file: log_callback("For local files, section might be missing or JS-dependent.")
+        if progress_callback: progress_callback(0)
+        return None
+    except WebDriverException as e:
+        driver_failed = True
+        log_callback(f"ERROR: Selenium WebDriver failed for {browser_type} with {url_to_load}: {e}")
+        if "net::ERR_FILE_NOT_FOUND" in str(e).lower():
+            log_callback(f"Hint: Local file path '{url}' might be incorrect.")
+        if progress_callback: progress_callback(0)
+        return None
+    except Exception as e:
+        driver_failed = True
+        log_callback(f"Unexpected error during Selenium fetching for {url_to_load}: {e}")
+        if progress_callback: progress_callback(0)
+        return None
+    finally:
+        if driver:
+            if driver_pool:
+                driver_pool.release(driver, discard=driver_failed) # Keep it warm for the next fetch
+            else:
+                driver.quit() # Ensure browser closes
@@ -0,0 +1,431 @@
+"""Local catalog of the site's content (IDs, titles, download links), built by crawling the JSON API.
+
+The crawl reads the same endpoints as the site's own SPA bundle:
+
+* `/categories`   -- every category
+* `/index-links`  -- the "Direct Link" menu; entries pointing at /content/<id> are added as posts
+* LISTING_PATH    -- the posts of one category, page by page
+* `/posts/<id>`   -- title and links of each post (see circleftp.api)
+
+Requests share one pooled session, run `workers` at a time and pass a
+token-bucket rate limit. Progress is checkpointed in SQLite after every
+listing page and every post, so an interrupted crawl resumes where it
+stopped. `requests` and `sqlite3` are imported on first use.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from circleftp.api import DEFAULT_API_BASE_URL, extract_links_from_post, fetch_post, parse_content_id
+from circleftp.tracing import span
+
+DEFAULT_CRAWL_WORKERS = 4
+DEFAULT_CRAWL_RATE = 5.0 # Requests per second, shared by all workers
+DEFAULT_PAGE_SIZE = 24
+# Per-category post listing. It is not in the saved bundle's main chunk, so it can be overridden
+# (`catalog crawl --listing-path`, config key `catalog_listing_path`)
+LISTING_PATH = "/posts?categoryExact={category}&page={page}&order=desc&limit={limit}"
+MAX_LISTING_PAGES = 10000 # Safety stop for a listing that never runs dry
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `burst` saved up."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = max(1.0, burst if burst is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, stop_event=None):
+        """Blocks until a token is available. Returns False if stop_event was set while waiting."""
+        if not self.rate or self.rate <= 0:
+            return True # Unlimited
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return False
+            else:
+                time.sleep(wait)
+
+
+def content_url(content_id, api_base_url=DEFAULT_API_BASE_URL):
+    """The site's page URL for a content ID (the API host without its port)."""
+    parts = urlsplit(api_base_url)
+    return f"{parts.scheme or 'http'}://{parts.hostname}/content/{content_id}"
+
+
+def _items(data, *keys):
+    """Returns the list in an API answer that is either a bare list or wrapped under one of keys."""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for key in keys:
+            if isinstance(data.get(key), list):
+                return data[key]
+    return []
+
+
+def _item_id(item):
+    value = item.get("id", item.get("_id")) if isinstance(item, dict) else None
+    return str(value) if value is not None else None
+
+
+class CatalogStore:
+    """SQLite-backed catalog and crawl checkpoint, safe to use from worker threads.
+
+    A crawl has an id (meta 'crawl_id'). Categories remember the next listing
+    page and whether they are done for the current crawl; posts remember the
+    crawl that last fetched them, so everything older is still pending.
+    """
+
+    def __init__(self, db_path):
+        import sqlite3 # Keeps sqlite3 out of the CLI's start-up imports
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL") # WAL keeps committed checkpoints across app crashes
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS categories ("
+                " id TEXT PRIMARY KEY, name TEXT, next_page INTEGER NOT NULL DEFAULT 1, done INTEGER NOT NULL DEFAULT 0"
+                ") WITHOUT ROWID"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS index_links (link TEXT PRIMARY KEY, name TEXT, parent TEXT) WITHOUT ROWID"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                " id TEXT PRIMARY KEY, title TEXT, category_id TEXT, links TEXT,"
+                " etag TEXT, last_modified TEXT, fetched_at REAL, crawl_id INTEGER NOT NULL DEFAULT 0"
+                ") WITHOUT ROWID"
+            )
+
+    # --- Crawl checkpoint ---
+    def get_meta(self, key, default=None):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+
+    def begin_crawl(self, restart=False):
+        """Returns (crawl_id, resumed). Continues an unfinished crawl unless restart is set."""
+        crawl_id = int(self.get_meta("crawl_id", 0))
+        if crawl_id and self.get_meta("crawl_finished") == "0" and not restart:
+            return crawl_id, True
+        crawl_id += 1
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE categories SET next_page = 1, done = 0")
+            self._conn.execute("DELETE FROM meta WHERE key IN ('categories_listed', 'index_listed')")
+            self._conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                                   [("crawl_id", str(crawl_id)), ("crawl_finished", "0")])
+        return crawl_id, False
+
+    def finish_crawl(self):
+        self.set_meta("crawl_finished", "1")
+        self.set_meta("crawl_finished_at", time.time())
+
+    # --- Categories and index links ---
+    def save_categories(self, categories):
+        """Upserts [(id, name)], keeping each category's listing progress."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO categories (id, name) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET name = excluded.name",
+                categories)
+
+    def categories(self, pending_only=False):
+        """Returns [(id, name, next_page)]."""
+        query = "SELECT id, name, next_page FROM categories" + (" WHERE done = 0" if pending_only else "")
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY name").fetchall()
+
+    def checkpoint_category(self, category_id, next_page, done=False):
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE categories SET next_page = ?, done = ? WHERE id = ?",
+                               (next_page, int(done), category_id))
+
+    def save_index_links(self, rows):
+        """Replaces the stored menu links with [(link, name, parent name)]."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM index_links")
+            self._conn.executemany("INSERT OR REPLACE INTO index_links (link, name, parent) VALUES (?, ?, ?)", rows)
+
+    def index_links(self):
+        with self._lock:
+            return self._conn.execute("SELECT link, name, parent FROM index_links ORDER BY parent, name").fetchall()
+
+    # --- Posts ---
+    def add_posts(self, posts):
+        """Records discovered posts [(id, title, category_id)]; known posts keep their links. Returns how many were new."""
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO posts (id, title, category_id) VALUES (?, ?, ?)", posts)
+            added = self._conn.total_changes - before
+            # Fill in titles/categories learned later (e.g. a menu link first, its category listing second)
+            self._conn.executemany(
+                "UPDATE posts SET title = COALESCE(title, ?), category_id = COALESCE(category_id, ?) WHERE id = ?",
+                [(title, category_id, post_id) for post_id, title, category_id in posts])
+        return added
+
+    def pending_posts(self, crawl_id, category_ids=None):
+        """Returns [(id, etag, last_modified)] of posts not fetched in crawl crawl_id."""
+        query = "SELECT id, etag, last_modified FROM posts WHERE crawl_id < ?"
+        params = [crawl_id]
+        if category_ids:
+            query += f" AND category_id IN ({', '.join('?' * len(category_ids))})"
+            params.extend(category_ids)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY id", params).fetchall()
+
+    def save_post(self, post_id, crawl_id, title=None, links=None, etag=None, last_modified=None):
+        """Stores a fetched post; with links=None (304 Not Modified) only marks it as current."""
+        with self._lock, self._conn:
+            if links is None:
+                self._conn.execute("UPDATE posts SET crawl_id = ?, fetched_at = ? WHERE id = ?",
+                                   (crawl_id, time.time(), post_id))
+            else:
+                self._conn.execute(
+                    "UPDATE posts SET title = COALESCE(?, title), links = ?, etag = ?, last_modified = ?,"
+                    " fetched_at = ?, crawl_id = ? WHERE id = ?",
+                    (title, json.dumps(links), etag, last_modified, time.time(), crawl_id, post_id))
+
+    def posts(self, search=None):
+        """Yields {"id", "title", "category", "links"} for every fetched post (title containing search, if given)."""
+        query = ("SELECT posts.id, posts.title, categories.name, posts.links FROM posts"
+                 " LEFT JOIN categories ON categories.id = posts.category_id WHERE posts.links IS NOT NULL")
+        params = []
+        if search:
+            query += " AND posts.title LIKE ?"
+            params.append(f"%{search}%")
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY posts.title", params).fetchall()
+        for post_id, title, category, links in rows:
+            yield {"id": post_id, "title": title, "category": category, "links": json.loads(links)}
+
+    def counts(self):
+        """Returns {"categories", "posts", "fetched"}."""
+        with self._lock:
+            categories = self._conn.execute("SELECT COUNT(*) FROM categories").fetchone()[0]
+            posts, fetched = self._conn.execute("SELECT COUNT(*), COUNT(links) FROM posts").fetchone()
+        return {"categories": categories, "posts": posts, "fetched": fetched}
+
+    def export_jsonl(self, path, search=None):
+        """Writes one JSON object per post to path. Returns the number written."""
+        count = 0
+        with open(path, "w", encoding="utf-8") as f:
+            for post in self.posts(search):
+                f.write(json.dumps(post, ensure_ascii=False) + "\n")
+                count += 1
+        return count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CatalogCrawler:
+    """Fills a CatalogStore from the JSON API with bounded concurrency and a shared rate limit."""
+
+    def __init__(self, store, log_callback, base_url=DEFAULT_API_BASE_URL, workers=DEFAULT_CRAWL_WORKERS,
+                 rate=DEFAULT_CRAWL_RATE, page_size=DEFAULT_PAGE_SIZE, listing_path=LISTING_PATH, session=None, timeout=15):
+        self.store = store
+        self.log_callback = log_callback
+        self.base_url = (base_url or DEFAULT_API_BASE_URL).rstrip("/")
+        self.workers = max(1, workers)
+        self.bucket = TokenBucket(rate)
+        self.page_size = page_size
+        self.listing_path = listing_path
+        self.timeout = timeout
+        self._session = session
+        self._stop = threading.Event()
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+    def stop(self):
+        """Stops after the requests in flight; the checkpoint lets the next crawl resume."""
+        self._stop.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    def _get_session(self):
+        """Returns the shared session; crawl() creates it before any worker thread starts."""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.workers, max_retries=2) # One host, one connection per worker
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"Accept": "application/json"})
+            self._session = session
+        return self._session
+
+    def _wait_turn(self):
+        """Takes a rate-limit token; False once the crawl is stopped."""
+        if not self.bucket.acquire(self._stop):
+            return False
+        with self._count_lock:
+            self.request_count += 1
+        return not self._stop.is_set()
+
+    def _get_json(self, path):
+        response = self._get_session().get(self.base_url + path, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def crawl(self, category_ids=None, restart=False, progress_callback=None):
+        """Crawls categories, menu links, listings and posts. Returns True if the crawl completed.
+
+        category_ids limits listing and post fetching to those categories.
+        An unfinished earlier crawl is resumed unless restart is set.
+        """
+        crawl_id, resumed = self.store.begin_crawl(restart=restart)
+        self._get_session() # Created here, single-threaded, so the workers never race to create it
+        self.log_callback(f"{'Resuming' if resumed else 'Starting'} catalog crawl #{crawl_id} "
+                          f"({self.workers} workers, {self.bucket.rate:g} requests/s).")
+        try:
+            with span("catalog crawl", crawl_id=crawl_id):
+                if not self._list_categories() or not self._list_index_links():
+                    return False
+                categories = [row for row in self.store.categories(pending_only=True)
+                              if not category_ids or row[0] in category_ids]
+                with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="catalog") as pool:
+                    list(pool.map(lambda row: self._list_category(*row), categories))
+                    if self.stopped:
+                        return False
+                    pending = self.store.pending_posts(crawl_id, category_ids)
+                    self.log_callback(f"Fetching {len(pending)} posts...")
+                    done = [0]
+                    done_lock = threading.Lock()
+
+                    def fetch(row):
+                        self._fetch_post(crawl_id, *row)
+                        with done_lock:
+                            done[0] += 1
+                            if progress_callback: progress_callback(done[0] / len(pending))
+
+                    list(pool.map(fetch, pending))
+        finally:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+        if self.stopped:
+            self.log_callback("Catalog crawl stopped; run it again to resume.")
+            return False
+        if self.store.pending_posts(crawl_id, category_ids) or any(
+                not category_ids or row[0] in category_ids for row in self.store.categories(pending_only=True)):
+            self.log_callback("Catalog crawl finished with pages left to fetch; run it again to retry them.")
+            return False
+        if category_ids:
+            self.log_callback(f"Crawled {len(category_ids)} selected categories ({self.request_count} requests).")
+            return True # The crawl as a whole stays open until every category is done
+        self.store.finish_crawl()
+        counts = self.store.counts()
+        self.log_callback(f"Catalog crawl complete: {counts['fetched']} posts in {counts['categories']} categories "
+                          f"({self.request_count} requests).")
+        return True
+
+    def _list_categories(self):
+        if self.store.get_meta("categories_listed"):
+            return True
+        if not self._wait_turn():
+            return False
+        try:
+            data = self._get_json("/categories")
+        except Exception as e:
+            self.log_callback(f"ERROR: Could not read the category list: {e}")
+            return False
+        categories = [(_item_id(item), item.get("name") or item.get("title")) for item in _items(data, "categories", "data")]
+        categories = [(category_id, name) for category_id, name in categories if category_id]
+        self.store.save_categories(categories)
+        self.store.set_meta("categories_listed", 1)
+        self.log_callback(f"Found {len(categories)} categories.")
+        return True
+
+    def _list_index_links(self):
+        if self.store.get_meta("index_listed"):
+            return True
+        if not self._wait_turn():
+            return False
+        try:
+            data = self._get_json("/index-links")
+        except Exception as e:
+            self.log_callback(f"WARNING: Could not read the index links: {e}")
+            return True # The menu only adds shortcuts; the category listings still cover the catalog
+        rows, posts = [], []
+        for entry in _items(data, "indexLinks"):
+            if not isinstance(entry, dict):
+                continue
+            for child in [entry] + [c for c in entry.get("children") or [] if isinstance(c, dict)]:
+                link = (child.get("link") or "").strip()
+                if not link:
+                    continue
+                parent = None if child is entry else entry.get("name")
+                rows.append((link, child.get("name"), parent))
+                content_id = parse_content_id(link)
+                if content_id:
+                    posts.append((content_id, child.get("name") or None, None))
+        self.store.save_index_links(rows)
+        added = self.store.add_posts(posts)
+        self.store.set_meta("index_listed", 1)
+        self.log_callback(f"Read {len(rows)} index links ({added} new posts).")
+        return True
+
+    def _list_category(self, category_id, name, next_page):
+        """Pages through one category's listing, checkpointing after every page."""
+        page = next_page
+        while page <= MAX_LISTING_PAGES:
+            if not self._wait_turn():
+                return
+            path = self.listing_path.format(category=category_id, page=page, limit=self.page_size)
+            try:
+                with span("catalog listing", category=category_id, page=page):
+                    data = self._get_json(path)
+            except Exception as e:
+                self.log_callback(f"ERROR listing '{name}' page {page}: {e}")
+                return # Not marked done: the next crawl retries from this page
+            items = _items(data, "posts", "data", "items", "results")
+            posts = [(_item_id(item), item.get("title") or item.get("name"), category_id) for item in items]
+            added = self.store.add_posts([post for post in posts if post[0]])
+            total_pages = data.get("totalPages", data.get("pages")) if isinstance(data, dict) else None
+            last_page = not items or len(items) < self.page_size or (isinstance(total_pages, int) and page >= total_pages)
+            self.store.checkpoint_category(category_id, page + 1, done=last_page)
+            if added:
+                self.log_callback(f"'{name}' page {page}: {added} new posts.")
+            if last_page:
+                return
+            page += 1
+
+    def _fetch_post(self, crawl_id, post_id, etag, last_modified):
+        if not self._wait_turn():
+            return
+        try:
+            post, _, validators = fetch_post(post_id, base_url=self.base_url, session=self._get_session(),
+                                             timeout=self.timeout, etag=etag, last_modified=last_modified)
+        except Exception as e:
+            self.log_callback(f"ERROR fetching post {post_id}: {e}")
+            return # Stays pending for the next crawl
+        if post is None: # 304: links unchanged since the last crawl
+            self.store.save_post(post_id, crawl_id)
+            return
+        title = post.get("title") if isinstance(post, dict) else None
+        self.store.save_post(post_id, crawl_id, title=title, links=extract_links_from_post(post), **validators)
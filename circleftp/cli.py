@@ -0,0 +1,295 @@
+"""Headless command-line entry point: python -m circleftp fetch URL [--batch N]
+
+Also `python -m circleftp catalog crawl|search|export` for the local content catalog
+and `python -m circleftp history forget URL` to send a link again.
+
+Never imports the GUI stack (customtkinter, PIL). Selenium is only loaded if
+a page has to fall back to the browser.
+"""
+import argparse
+import os
+import sys
+import threading
+
+from circleftp.aria2 import ARIA2_DEFAULTS
+from circleftp.api import DEFAULT_API_BASE_URL
+from circleftp.backends import BACKENDS, create_backend
+from circleftp.catalog import DEFAULT_CRAWL_RATE, DEFAULT_CRAWL_WORKERS, LISTING_PATH
+from circleftp.fetch_queue import DEFAULT_FETCH_WORKERS, parse_page_list
+from circleftp.idm import DEFAULT_DISPATCH_WORKERS
+from circleftp.page_cache import DEFAULT_TTL_MINUTES
+from circleftp.pipeline import dispatch_batch, fetch_links, make_driver_pool, make_page_cache
+from circleftp.progress import ProgressModel, start_reporter
+from circleftp.tracing import start_trace, stop_trace
+from circleftp.settings import (CATALOG_FILE, CONFIG_DIR, DEFAULT_DOWNLOAD_DIR, DEFAULT_IDM_PATH, SENT_HISTORY_FILE,
+                                load_config)
+
+
+def _log(message):
+    print(message.lstrip("\n"), file=sys.stderr, flush=True)
+
+
+def _build_parser(config):
+    parser = argparse.ArgumentParser(prog="python -m circleftp", description="CircleFTP Batch Downloader (headless).")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch = commands.add_parser("fetch", help="fetch content pages and dispatch their download links")
+    fetch.add_argument("pages", nargs="+", metavar="URL",
+                       help="content page URL, saved HTML file, or .txt file listing pages")
+    fetch.add_argument("--batch", type=int, default=None, metavar="N",
+                       help="dispatch at most N new links this run (the rest are picked up next run)")
+    fetch.add_argument("--list", action="store_true", help="print the links instead of dispatching them")
+    fetch.add_argument("--export-ef2", metavar="FILE", help="write the links to an IDM .ef2 import file instead of dispatching")
+    fetch.add_argument("--backend", choices=BACKENDS, default=config.get("download_backend", "idm"),
+                       help="downloader to hand the links to ('fake' only records them, for testing)")
+    fetch.add_argument("--idm-path", default=config.get("idm_path", DEFAULT_IDM_PATH))
+    fetch.add_argument("--download-dir", default=config.get("download_dir", DEFAULT_DOWNLOAD_DIR),
+                       help="target folder for the built-in downloader")
+    fetch.add_argument("--aria2-url", default=config.get("aria2_rpc_url", ARIA2_DEFAULTS["aria2_rpc_url"]),
+                       help="aria2 JSON-RPC endpoint (the secret is read from aria2_secret in config.json)")
+    fetch.add_argument("--aria2-split", type=int, default=config.get("aria2_split", ARIA2_DEFAULTS["aria2_split"]),
+                       metavar="N", help="connections per aria2 download")
+    fetch.add_argument("--aria2-connections", type=int, metavar="N",
+                       default=config.get("aria2_connections", ARIA2_DEFAULTS["aria2_connections"]),
+                       help="aria2 max-connection-per-server")
+    fetch.add_argument("--wait", action="store_true",
+                       help="wait until the downloads finish (aria2, builtin) instead of exiting once they are handed over")
+    fetch.set_defaults(aria2_secret=config.get("aria2_secret", ARIA2_DEFAULTS["aria2_secret"]), # Kept off the command line
+                       aria2_dir=config.get("aria2_dir", ARIA2_DEFAULTS["aria2_dir"]))
+    fetch.add_argument("--browser", choices=("chrome", "firefox", "edge"), default=config.get("browser", "chrome"),
+                       help="browser for the Selenium fallback")
+    fetch.add_argument("--page-load", choices=("eager", "none", "normal"), default=config.get("page_load_strategy", "eager"),
+                       help="Selenium page load strategy (links are read as soon as they render in any mode)")
+    fetch.add_argument("--no-block", action="store_true", default=not config.get("block_resources", True),
+                       help="let the browser load images, fonts and CSS")
+    fetch.add_argument("--no-api", action="store_true", help="skip the JSON API and always use the browser")
+    fetch.add_argument("--api-url", default=config.get("api_base_url"), help="JSON API base URL")
+    fetch.add_argument("--workers", type=int, default=config.get("fetch_workers", DEFAULT_FETCH_WORKERS),
+                       help="content pages fetched in parallel")
+    fetch.add_argument("--refresh", action="store_true", help="fetch pages again even if their links are cached")
+    fetch.add_argument("--cache-ttl", type=int, default=config.get("page_cache_ttl_minutes", DEFAULT_TTL_MINUTES),
+                       metavar="MINUTES", help="reuse links fetched within this many minutes (0 = always fetch)")
+    fetch.add_argument("--resend", action="store_true", help="also dispatch links that were sent in earlier runs")
+    fetch.add_argument("--trace", metavar="FILE", help="write per-phase timings as Chrome trace-event JSON")
+    fetch.add_argument("--progress", type=float, default=0, metavar="SECONDS",
+                       help="print a progress line to stderr every SECONDS (0 = off)")
+
+    catalog = commands.add_parser("catalog", help="crawl the site into a local catalog and search it")
+    catalog.add_argument("--catalog-file", default=CATALOG_FILE, metavar="FILE", help="catalog database")
+    actions = catalog.add_subparsers(dest="action", required=True)
+    crawl = actions.add_parser("crawl", help="crawl categories and posts (an interrupted crawl resumes)")
+    crawl.add_argument("--api-url", default=config.get("api_base_url"), help="JSON API base URL")
+    crawl.add_argument("--workers", type=int, default=config.get("crawl_workers", DEFAULT_CRAWL_WORKERS),
+                       help="requests in flight at once")
+    crawl.add_argument("--rate", type=float, default=config.get("crawl_rate", DEFAULT_CRAWL_RATE),
+                       help="requests per second, for all workers together (0 = unlimited)")
+    crawl.add_argument("--listing-path", default=config.get("catalog_listing_path", LISTING_PATH), metavar="PATH",
+                       help="API path of a category's post listing, with {category}, {page} and {limit} placeholders")
+    crawl.add_argument("--category", nargs="+", metavar="ID", help="only crawl these category IDs")
+    crawl.add_argument("--restart", action="store_true", help="start a new crawl instead of resuming an unfinished one")
+    search = actions.add_parser("search", help="list catalog entries whose title contains TEXT")
+    search.add_argument("text", nargs="?", default="", metavar="TEXT")
+    search.add_argument("--links", action="store_true", help="print the download links instead of the content pages")
+    search.add_argument("--api-url", default=config.get("api_base_url"), help="JSON API base URL (for page URLs)")
+    export = actions.add_parser("export", help="write the catalog as JSON lines")
+    export.add_argument("file", metavar="FILE")
+    export.add_argument("--search", metavar="TEXT", help="only posts whose title contains TEXT")
+
+    history = commands.add_parser("history", help="manage the links sent in earlier runs")
+    history_actions = history.add_subparsers(dest="action", required=True)
+    forget = history_actions.add_parser("forget", help="remove links from the history so the next run sends them again")
+    forget.add_argument("links", nargs="+", metavar="LINK", help="download link, or .txt file listing one link per line")
+    return parser
+
+
+def run_history(args):
+    from circleftp.history import SentHistory
+    links = []
+    for entry in args.links:
+        if os.path.isfile(entry):
+            with open(entry, "r", encoding="utf-8", errors="replace") as f:
+                links.extend(line.strip() for line in f if line.strip())
+        else:
+            links.append(entry)
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    history = SentHistory(SENT_HISTORY_FILE)
+    try:
+        removed = history.forget(links)
+    finally:
+        history.close()
+    _log(f"Removed {removed} of {len(links)} links from the sent-link history.")
+    return 0 if removed else 1
+
+
+def run_catalog(args):
+    from circleftp.catalog import CatalogCrawler, CatalogStore, content_url
+    os.makedirs(os.path.dirname(args.catalog_file) or ".", exist_ok=True)
+    store = CatalogStore(args.catalog_file)
+    try:
+        if args.action == "search":
+            found = 0
+            for post in store.posts(args.text):
+                found += 1
+                if args.links:
+                    for link in post["links"]:
+                        print(link)
+                else:
+                    print(f"{content_url(post['id'], args.api_url or DEFAULT_API_BASE_URL)}\t{post['title']}"
+                          f"\t{len(post['links'])} links")
+            _log(f"{found} matching posts.")
+            return 0 if found else 1
+        if args.action == "export":
+            count = store.export_jsonl(args.file, args.search)
+            _log(f"Wrote {count} posts to {args.file}")
+            return 0
+
+        crawler = CatalogCrawler(store, _log, base_url=args.api_url, workers=args.workers, rate=args.rate,
+                                 listing_path=args.listing_path)
+        result = {}
+        worker = threading.Thread(target=lambda: result.update(done=crawler.crawl(args.category, restart=args.restart)),
+                                  name="catalog-crawl")
+        worker.start()
+        try:
+            while worker.is_alive():
+                worker.join(0.5)
+        except KeyboardInterrupt:
+            _log("Stopping the crawl after the requests in flight...")
+            crawler.stop()
+            worker.join()
+        return 0 if result.get("done") else 1
+    finally:
+        store.close()
+
+
+def run_fetch(args):
+    progress = ProgressModel()
+    stop_reporter = None
+    if args.progress > 0:
+        stop_reporter = start_reporter(progress, lambda model: _log(f"Progress: {model.describe()}"), args.progress)
+    start_trace()
+    try:
+        return _run_fetch(args, progress)
+    finally:
+        if stop_reporter:
+            stop_reporter.set()
+        tracer = stop_trace()
+        _log(tracer.summary())
+        if args.trace:
+            tracer.export(args.trace)
+            _log(f"Timing trace written to {args.trace}")
+
+
+def _run_fetch(args, progress):
+    page_urls = []
+    for entry in args.pages:
+        page_urls.extend(parse_page_list(entry) or [entry])
+    page_urls = list(dict.fromkeys(page_urls))
+
+    driver_pool = make_driver_pool(log_callback=_log, page_load_strategy=args.page_load,
+                                   block_resources=not args.no_block)
+    try:
+        links, failed_pages = fetch_links(
+            page_urls, _log, lambda fraction: progress.set_fraction("fetch", fraction), fetch_workers=max(1, args.workers), browser_type=args.browser,
+            api_fetch=not args.no_api, api_base_url=args.api_url, driver_pool=driver_pool,
+            cache=make_page_cache(args.cache_ttl), refresh=args.refresh)
+    finally:
+        driver_pool.shutdown()
+    for failed_page in failed_pages:
+        _log(f"WARNING: No links fetched from {failed_page}")
+    if not links:
+        _log("No download links were extracted.")
+        return 1
+    progress.complete("fetch", "extract")
+    _log(f"Extracted {len(links)} links from {len(page_urls) - len(failed_pages)}/{len(page_urls)} pages.")
+
+    # History is needed to skip already-sent links and to record new dispatches
+    history = None
+    if not args.resend or not (args.list or args.export_ef2):
+        from circleftp.history import SentHistory
+        os.makedirs(CONFIG_DIR, exist_ok=True)
+        history = SentHistory(SENT_HISTORY_FILE)
+    try:
+        if history and not args.resend:
+            links, already_sent = history.filter_unsent(links)
+            if already_sent:
+                _log(f"Skipping {len(already_sent)} links already sent in earlier runs.")
+        if args.batch is not None:
+            links = links[:max(0, args.batch)]
+        if not links:
+            _log("Nothing new to dispatch.")
+            return 0
+
+        if args.list:
+            for link in links:
+                print(link)
+            return 0
+        if args.export_ef2:
+            from circleftp.idm import write_idm_export_file
+            write_idm_export_file(links, args.export_ef2)
+            _log(f"Wrote {len(links)} links to {args.export_ef2}")
+            return 0
+
+        if args.backend == "idm" and not os.path.exists(args.idm_path):
+            _log(f"ERROR: Invalid IDM path: '{args.idm_path}'. Use --idm-path or --backend builtin.")
+            return 2
+        backend = create_backend(args.backend, _log, idm_path=args.idm_path, download_dir=args.download_dir,
+                                 dispatch_workers=DEFAULT_DISPATCH_WORKERS, aria2_settings=_aria2_settings(args))
+        try:
+            # IDM is started by its first /d call; other backends check they can be reached
+            if args.backend != "idm" and not backend.prepare():
+                return 2
+            sent_urls = []
+            sent = dispatch_batch(links, _log, backend=backend,
+                                  count_progress_callback=lambda done: progress.set_count("dispatch", done, len(links)),
+                                  url_sent_callback=sent_urls.append)
+            if args.backend != "fake": # Test runs must not hide the links from real ones
+                history.mark_sent(sent_urls)
+            _log(f"Progress: {progress.describe()}")
+            if args.wait and sent:
+                status = backend.wait(lambda status: _log(f"Downloading: {_describe_status(status)}"),
+                                      interval=args.progress or 2.0)
+                _log(f"Finished: {_describe_status(status)}")
+                if status["failed"]:
+                    return 1
+        finally:
+            backend.close()
+        return 0 if sent == len(links) else 1
+    finally:
+        if history:
+            history.close()
+
+
+def _aria2_settings(args):
+    return {"aria2_rpc_url": args.aria2_url, "aria2_secret": args.aria2_secret, "aria2_split": args.aria2_split,
+            "aria2_connections": args.aria2_connections, "aria2_dir": args.aria2_dir}
+
+
+def _describe_status(status):
+    """e.g. '3 active, 5/8 done, 1 failed, 1200/4000 MB at 11.5 MB/s' (bytes of the unfinished downloads)"""
+    text = f"{status['active']} active, {status['completed']}/{status['submitted']} done"
+    if status["failed"]:
+        text += f", {status['failed']} failed"
+    if status.get("bytes_total"):
+        text += (f", {status['bytes_done'] / 1e6:.0f}/{status['bytes_total'] / 1e6:.0f} MB"
+                 f" at {status['speed'] / 1e6:.1f} MB/s")
+    return text
+
+
+def main(argv=None):
+    try:
+        config = load_config()
+    except ValueError:
+        _log("WARNING: Config file corrupted. Using defaults.")
+        config = {}
+    args = _build_parser(config).parse_args(argv)
+    if args.command == "fetch":
+        return run_fetch(args)
+    if args.command == "catalog":
+        return run_catalog(args)
+    if args.command == "history":
+        return run_history(args)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+"""Session-wide pool of warm Selenium WebDrivers."""
+import threading
+from contextlib import contextmanager
+
+from circleftp.tracing import span
+
+
+def _driver_memory_mb(driver):
+    """Returns the resident memory (MB) of a driver's service process and its browser children."""
+    import psutil
+    try:
+        service_process = driver.service.process
+        root = psutil.Process(service_process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return 0.0
+    total = 0
+    for proc in processes:
+        try:
+            total += proc.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+def _is_driver_healthy(driver):
+    """Cheap liveness check: the session must still answer a trivial command."""
+    try:
+        driver.current_window_handle
+        return True
+    except Exception:
+        return False
+
+
+def _quit_driver(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class WebDriverPool:
+    """Keeps WebDrivers alive between fetches so only the first one pays browser start-up.
+
+    Drivers are created lazily by `driver_factory(browser_type)`, checked for
+    health before reuse, and recycled after `max_pages` page loads or once the
+    browser grows beyond `max_memory_mb`.
+    """
+
+    def __init__(self, driver_factory, max_size=1, max_pages=25, max_memory_mb=1024, log_callback=None):
+        self.driver_factory = driver_factory
+        self.max_size = max(1, max_size)
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.log_callback = log_callback or (lambda message: None)
+
+        self._condition = threading.Condition()
+        self._idle = {}        # browser_type -> [driver, ...]
+        self._live = {}        # browser_type -> number of drivers created and not yet quit
+        self._pages = {}       # id(driver) -> pages served
+        self._browser_of = {}  # id(driver) -> browser_type
+        self._closed = False
+
+    def acquire(self, browser_type, timeout=None):
+        """Returns a ready driver for browser_type, booting one only if none is idle."""
+        browser_type = browser_type.lower()
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise RuntimeError("WebDriver pool has been shut down.")
+                idle = self._idle.setdefault(browser_type, [])
+                while idle:
+                    driver = idle.pop()
+                    if _is_driver_healthy(driver):
+                        return driver
+                    self.log_callback(f"Discarding unresponsive {browser_type} driver.")
+                    self._forget(driver)
+                    _quit_driver(driver)
+                if self._live.get(browser_type, 0) < self.max_size:
+                    self._live[browser_type] = self._live.get(browser_type, 0) + 1
+                    break
+                if not self._condition.wait(timeout):
+                    raise TimeoutError(f"No {browser_type} driver became available.")
+
+        # Boot outside the lock so other browsers/fetches are not blocked
+        self.log_callback(f"Starting {browser_type} WebDriver (kept warm for this session)...")
+        try:
+            with span("driver boot", browser=browser_type):
+                driver = self.driver_factory(browser_type)
+        except BaseException:
+            with self._condition:
+                self._live[browser_type] -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._pages[id(driver)] = 0
+            self._browser_of[id(driver)] = browser_type
+        return driver
+
+    def warm_up(self, browser_type):
+        """Boots one driver for browser_type ahead of the first fetch, unless one exists already.
+
+        Returns True if a driver is (or was already) available. Errors are
+        logged, not raised: the fetch that needs the driver reports them.
+        """
+        browser_type = browser_type.lower()
+        with self._condition:
+            if self._closed:
+                return False
+            if self._live.get(browser_type, 0):
+                return True
+        try:
+            driver = self.acquire(browser_type)
+        except Exception as e:
+            self.log_callback(f"Could not pre-start {browser_type} WebDriver: {e}")
+            return False
+        with self._condition:
+            if not self._closed:
+                self._idle[browser_type].append(driver) # Parked without counting as a served page
+                self._condition.notify()
+                return True
+            self._forget(driver)
+        _quit_driver(driver)
+        return False
+
+    def release(self, driver, discard=False):
+        """Returns a driver to the pool, or quits it if broken, worn out or too large."""
+        with self._condition:
+            key = id(driver)
+            browser_type = self._browser_of.get(key)
+            if browser_type is None: # Not ours (or already forgotten)
+                _quit_driver(driver)
+                return
+            self._pages[key] += 1
+            reason = None
+            if discard:
+                reason = "error during use"
+            elif self._closed:
+                reason = "pool shut down"
+            elif self.max_pages and self._pages[key] >= self.max_pages:
+                reason = f"served {self._pages[key]} pages"
+            if reason is None:
+                self._idle[browser_type].append(driver)
+                self._condition.notify()
+
+        if reason is None and self.max_memory_mb:
+            memory_mb = _driver_memory_mb(driver)
+            if memory_mb > self.max_memory_mb:
+                with self._condition:
+                    if driver in self._idle[browser_type]:
+                        self._idle[browser_type].remove(driver)
+                        reason = f"using {memory_mb:.0f} MB"
+        if reason is not None:
+            self.log_callback(f"Recycling {browser_type} driver ({reason}).")
+            with self._condition:
+                self._forget(driver)
+            _quit_driver(driver)
+
+    @contextmanager
+    def driver(self, browser_type, timeout=None):
+        """Context manager: acquire a driver and release it (discarding it on errors)."""
+        driver = self.acquire(browser_type, timeout=timeout)
+        failed = False
+        try:
+            yield driver
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.release(driver, discard=failed)
+
+    def shutdown(self):
+        """Quits all idle drivers and refuses further acquisitions."""
+        with self._condition:
+            self._closed = True
+            drivers = [d for idle in self._idle.values() for d in idle]
+            for driver in drivers:
+                self._forget(driver)
+            self._idle.clear()
+            self._condition.notify_all()
+        for driver in drivers:
+            _quit_driver(driver)
+
+    def _forget(self, driver):
+        """Drops bookkeeping for a driver. Caller must hold the lock."""
+        key = id(driver)
+        browser_type = self._browser_of.pop(key, None)
+        self._pages.pop(key, None)
+        if browser_type is not None:
+            self._live[browser_type] -= 1
+            self._condition.notify()
@@ -0,0 +1,334 @@
+"""Built-in multi-connection HTTP download engine (alternative to IDM)."""
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from urllib.parse import unquote, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from circleftp.segment_journal import SegmentJournal, journal_path_for
+
+DEFAULT_MAX_CONNECTIONS = 8       # Global limit on concurrent HTTP connections
+DEFAULT_PER_HOST_CONNECTIONS = 4  # Limit per server host
+DEFAULT_SEGMENTS_PER_FILE = 4
+DEFAULT_MAX_PARALLEL_FILES = 3
+MIN_SEGMENT_SIZE = 1024 * 1024    # Don't split files into segments smaller than 1 MB
+CHUNK_SIZE = 256 * 1024
+SEGMENT_RETRIES = 5               # Reconnect attempts per segment after a dropped connection
+RETRY_BACKOFF = 0.5               # Seconds, doubled after each failed attempt
+MAX_NAME_SUFFIX = 999             # "name (999).ext" is the last candidate for a colliding file name
+
+_FILENAME_PATTERN = re.compile(r"filename\*?=(?:UTF-8'')?\"?([^\";]+)\"?", re.IGNORECASE)
+
+
+def filename_from_response(url, response=None):
+    """Picks a file name from Content-Disposition or, failing that, the URL path."""
+    if response is not None:
+        match = _FILENAME_PATTERN.search(response.headers.get("Content-Disposition", ""))
+        if match:
+            return os.path.basename(unquote(match.group(1)).strip())
+    name = os.path.basename(unquote(urlsplit(url).path))
+    return name or "download"
+
+
+def unique_names(name):
+    """Yields name, then 'stem (1).ext', 'stem (2).ext', ... like browsers do for duplicates."""
+    stem, ext = os.path.splitext(name)
+    yield name
+    for n in range(1, MAX_NAME_SUFFIX + 1):
+        yield f"{stem} ({n}){ext}"
+
+
+def plan_segments(total_size, segments, min_segment_size=MIN_SEGMENT_SIZE):
+    """Splits [0, total_size) into up to `segments` inclusive byte ranges."""
+    if total_size <= 0:
+        return []
+    count = max(1, min(segments, total_size // max(1, min_segment_size)))
+    step = total_size // count
+    ranges = []
+    for i in range(count):
+        start = i * step
+        end = total_size - 1 if i == count - 1 else start + step - 1
+        ranges.append((start, end))
+    return ranges
+
+
+class DownloadEngine:
+    """Downloads files with several HTTP Range connections each.
+
+    Connections are bounded globally (`max_connections`) and per host
+    (`per_host_connections`). Segments are written straight into a
+    preallocated target file, so no temporary part files are merged.
+
+    Progress is recorded in a sidecar SegmentJournal. Dropped connections are
+    retried from the last written byte, and after a crash or restart only the
+    missing ranges are requested again, provided the server's ETag /
+    Last-Modified / Content-Length still match.
+
+    Links whose file names collide (S01E01.mkv of two shows) get their own
+    targets, 'S01E01 (1).mkv' and so on, instead of overwriting each other.
+    """
+
+    def __init__(self, download_dir, log_callback=None, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 per_host_connections=DEFAULT_PER_HOST_CONNECTIONS, segments_per_file=DEFAULT_SEGMENTS_PER_FILE,
+                 max_parallel_files=DEFAULT_MAX_PARALLEL_FILES, session=None, timeout=30):
+        self.download_dir = download_dir
+        self.log_callback = log_callback or (lambda message: None)
+        self.segments_per_file = max(1, segments_per_file)
+        self.max_parallel_files = max(1, max_parallel_files)
+        self.per_host_connections = max(1, per_host_connections)
+        self.timeout = timeout
+
+        self._session = session or self._make_session(max_connections)
+        self._global_slots = threading.BoundedSemaphore(max(1, max_connections))
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+        self._segment_pool = ThreadPoolExecutor(max_workers=max(1, max_connections), thread_name_prefix="segment")
+        self._file_pool = None # Created by submit() on first use
+        self._cancelled = threading.Event()
+        self._targets = {} # Target path -> URL being downloaded into it
+        self._targets_lock = threading.Lock()
+
+    @staticmethod
+    def _make_session(max_connections):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max(1, max_connections))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _host_semaphore(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host_connections)
+            return self._host_slots[host]
+
+    def cancel(self):
+        """Stops all transfers as soon as their current chunk is written."""
+        self._cancelled.set()
+
+    def close(self):
+        self.cancel()
+        if self._file_pool:
+            self._file_pool.shutdown(wait=True)
+        self._segment_pool.shutdown(wait=True)
+        self._session.close()
+
+    def _probe(self, url):
+        """Returns a dict with total size (or None), Range support, validators and file name."""
+        with self._session.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            info = {
+                "name": filename_from_response(url, response),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "supports_ranges": response.status_code == 206,
+                "total": None,
+            }
+            if response.status_code == 206:
+                total = response.headers.get("Content-Range", "").rsplit("/", 1)[-1]
+            else:
+                total = response.headers.get("Content-Length", "")
+            if total.isdigit():
+                info["total"] = int(total)
+            return info
+
+    def _fetch_segment(self, url, path, journal, index, supports_ranges, progress):
+        """Downloads one journal segment into path, reconnecting from the last written byte on drops."""
+        segment = journal.segments[index]
+        host_slots = self._host_semaphore(url)
+        delay = RETRY_BACKOFF
+        for attempt in range(SEGMENT_RETRIES + 1):
+            if self._cancelled.is_set():
+                raise IOError("Download cancelled")
+            if not supports_ranges and segment["done"]:
+                progress(-segment["done"]) # No Range support: the only option is to start over
+                segment["done"] = 0
+            start = segment["start"] + segment["done"]
+            end = segment["end"]
+            if end is not None and start > end:
+                return # Segment already complete
+            headers = {}
+            if supports_ranges:
+                headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+                if journal.etag or journal.last_modified:
+                    headers["If-Range"] = journal.etag or journal.last_modified
+            try:
+                with host_slots, self._global_slots: # Queue on the host first, so a busy host holds no global slots
+                    with self._session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                        response.raise_for_status()
+                        if supports_ranges and response.status_code != 206:
+                            raise IOError(f"Remote file changed or Range ignored for {url}")
+                        if end is not None:
+                            # The byte count is checked below; without this urllib3 raises on a
+                            # dropped connection and discards the part of the chunk it already read
+                            response.raw.enforce_content_length = False
+                        with open(path, "r+b", buffering=0) as f:
+                            f.seek(start)
+                            for chunk in response.iter_content(CHUNK_SIZE):
+                                if self._cancelled.is_set():
+                                    raise IOError("Download cancelled")
+                                if end is not None:
+                                    chunk = chunk[:end + 1 - (segment["start"] + segment["done"])]
+                                f.write(chunk)
+                                journal.advance(index, len(chunk), f.fileno())
+                                progress(len(chunk))
+                if end is None or segment["start"] + segment["done"] > end:
+                    return
+                raise requests.ConnectionError("Connection closed before the segment was complete")
+            except requests.RequestException as e:
+                if attempt == SEGMENT_RETRIES:
+                    raise
+                self.log_callback(f"Connection dropped ({e.__class__.__name__}); resuming at byte {segment['start'] + segment['done']}...")
+                time.sleep(delay)
+                delay *= 2
+
+    def _claim_target(self, url, name):
+        """Picks and reserves the target path for url.
+
+        The first candidate name that no running download of this engine
+        holds wins if it is either free on disk or has a journal of this URL
+        (an earlier, unfinished download of the same link).
+        """
+        with self._targets_lock:
+            for candidate in unique_names(name):
+                path = os.path.join(self.download_dir, candidate)
+                if path in self._targets:
+                    continue
+                if os.path.exists(path) and not os.path.exists(journal_path_for(path, url)):
+                    continue # Another link's file, finished or in progress
+                self._targets[path] = url
+                return path
+        raise IOError(f"No free file name for {name} in {self.download_dir}")
+
+    def _release_target(self, path):
+        with self._targets_lock:
+            self._targets.pop(path, None)
+
+    def _open_journal(self, url, path, info):
+        """Reuses a matching journal (resume) or starts a fresh, preallocated download."""
+        total = info["total"]
+        journal = SegmentJournal.load(path, url)
+        if journal and os.path.exists(path) and info["supports_ranges"] and \
+                journal.matches(url, total, info["etag"], info["last_modified"]):
+            self.log_callback(f"Resuming {os.path.basename(path)}: {journal.remaining_bytes()} of {total} bytes left.")
+            return journal
+
+        if info["supports_ranges"] and total:
+            segments = [{"start": start, "end": end, "done": 0} for start, end in plan_segments(total, self.segments_per_file)]
+        else:
+            segments = [{"start": 0, "end": None, "done": 0}] # Unknown size or no Range support: one stream
+        journal = SegmentJournal(path, url, total, info["etag"], info["last_modified"], segments)
+        with open(path, "wb") as f:
+            if total:
+                f.truncate(total) # Preallocate so segments can be written in place
+        journal.save()
+        return journal
+
+    def download(self, url, progress_callback=None):
+        """Downloads (or resumes) one URL into download_dir and returns the target path."""
+        info = self._probe(url)
+        os.makedirs(self.download_dir, exist_ok=True)
+        path = self._claim_target(url, info["name"])
+        try:
+            self._download_into(url, path, info, progress_callback)
+        finally:
+            self._release_target(path)
+        return path
+
+    def _download_into(self, url, path, info, progress_callback):
+        journal = self._open_journal(url, path, info)
+        total = info["total"]
+
+        done = [journal.completed_bytes()]
+        done_lock = threading.Lock()
+
+        def progress(byte_count):
+            with done_lock:
+                done[0] += byte_count
+                current = done[0]
+            if progress_callback and total:
+                progress_callback(min(current / total, 1.0))
+
+        futures = [self._segment_pool.submit(self._fetch_segment, url, path, journal, index, info["supports_ranges"], progress)
+                   for index in range(len(journal.segments))]
+        try:
+            for future in as_completed(futures):
+                future.result() # Re-raise the first segment error
+        finally:
+            wait(futures) # The other segments stop at their next chunk once cancelled; record what they wrote
+            journal.save() # Keep the latest progress for a later resume
+        journal.delete()
+        if progress_callback: progress_callback(1.0)
+
+    def submit(self, url, done_callback=None, log_callback=None):
+        """Starts downloading url in the background (up to max_parallel_files at once).
+
+        done_callback(url, path) runs when the download ends; path is None if it failed.
+        """
+        log_callback = log_callback or self.log_callback
+        if self._file_pool is None:
+            self._file_pool = ThreadPoolExecutor(max_workers=self.max_parallel_files, thread_name_prefix="file")
+
+        def run():
+            name = filename_from_response(url)
+            log_callback(f"Downloading: {name}")
+            path = None
+            try:
+                path = self.download(url)
+                log_callback(f"Finished: {os.path.basename(path)}")
+            except Exception as e:
+                log_callback(f"ERROR downloading {name}: {e}")
+            if done_callback:
+                done_callback(url, path)
+
+        return self._file_pool.submit(run)
+
+    def download_many(self, urls, log_callback=None, count_progress_callback=None, url_done_callback=None):
+        """Downloads several URLs, up to max_parallel_files at a time. Returns the number completed."""
+        log_callback = log_callback or self.log_callback
+        completed = [0]
+        lock = threading.Lock()
+
+        def run(position, url):
+            name = filename_from_response(url)
+            log_callback(f"[{position}/{len(urls)}] Downloading: {name}")
+            try:
+                path = self.download(url)
+            except Exception as e:
+                log_callback(f"ERROR downloading {name}: {e}")
+                return
+            with lock:
+                completed[0] += 1
+                count = completed[0]
+            log_callback(f"[{position}/{len(urls)}] Finished: {os.path.basename(path)}")
+            if url_done_callback: url_done_callback(url)
+            if count_progress_callback: count_progress_callback(count)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel_files, max(1, len(urls))), thread_name_prefix="file") as pool:
+            for position, url in enumerate(urls, start=1):
+                pool.submit(run, position, url)
+        return completed[0]
+
+
+def initiate_builtin_downloads(urls, download_dir, log_callback, count_progress_callback=None, url_sent_callback=None, engine=None):
+    """Downloads a batch with the built-in engine; same contract as initiate_idm_direct_downloads."""
+    if not urls:
+        log_callback("No URLs provided to the downloader for this batch.")
+        if count_progress_callback: count_progress_callback(0)
+        return 0
+
+    log_callback(f"Downloading {len(urls)} files to '{download_dir}'...")
+    own_engine = engine is None
+    engine = engine or DownloadEngine(download_dir, log_callback=log_callback)
+    try:
+        done = engine.download_many(urls, log_callback, count_progress_callback, url_sent_callback)
+    finally:
+        if own_engine:
+            engine.close()
+    log_callback(f"Downloaded {done}/{len(urls)} files for this batch.")
+    return done
@@ -0,0 +1,116 @@
+"""Download link extraction from content page HTML.
+
+Two engines are available:
+  * "stream" - a streaming HTMLParser that only looks at tags inside the
+    download section and stops as soon as that section closes (default).
+  * "bs4"    - the original full BeautifulSoup tree, kept for verification.
+"""
+import re
+from html.parser import HTMLParser
+
+from circleftp.tracing import span
+
+# Selectors for the download section and its anchors on the target site
+SECTION_CLASS = "bg-light mt-2 rounded p-2 w-75 mx-auto"
+LINK_CLASS = "btn btn-success"
+
+ENGINES = ("stream", "bs4")
+DEFAULT_ENGINE = "stream"
+
+_SECTION_START = re.compile(r"<section", re.IGNORECASE)
+
+
+def _class_matches(attr_value, expected):
+    return attr_value is not None and " ".join(attr_value.split()) == expected
+
+
+class _SectionDone(Exception):
+    """Raised internally to stop parsing once the download section has closed."""
+
+
+class _DownloadLinkParser(HTMLParser):
+    """Collects hrefs of download anchors inside the first download section."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.section_found = False
+        self.links = []
+        self._section_depth = 0 # Nesting depth of <section> tags once inside the target
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "section":
+            if self._section_depth:
+                self._section_depth += 1
+            elif _class_matches(dict(attrs).get("class"), SECTION_CLASS):
+                self.section_found = True
+                self._section_depth = 1
+        elif tag == "a" and self._section_depth:
+            attrs = dict(attrs)
+            href = attrs.get("href")
+            if href and _class_matches(attrs.get("class"), LINK_CLASS):
+                self.links.append(href)
+
+    def handle_endtag(self, tag):
+        if tag == "section" and self._section_depth:
+            self._section_depth -= 1
+            if not self._section_depth:
+                raise _SectionDone()
+
+
+def _find_links_stream(html_content):
+    # Nothing before the first <section> can be inside the download section,
+    # so skip the <head>, inline scripts and styles without tokenizing them.
+    match = _SECTION_START.search(html_content)
+    if not match:
+        return None
+    parser = _DownloadLinkParser()
+    try:
+        parser.feed(html_content[match.start():])
+        parser.close()
+    except _SectionDone:
+        pass
+    return parser.links if parser.section_found else None
+
+
+def _find_links_bs4(html_content):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_content, 'html.parser')
+    download_section = soup.find('section', class_=SECTION_CLASS)
+    if not download_section:
+        return None
+    return [link['href'] for link in download_section.find_all('a', class_=LINK_CLASS, href=True) if link['href']]
+
+
+def find_download_links(html_content, engine=DEFAULT_ENGINE):
+    """Returns the ordered, de-duplicated download links in the page.
+
+    Returns None if the download section is missing and [] if the section has
+    no download anchors.
+    """
+    if engine == "stream":
+        links = _find_links_stream(html_content)
+    elif engine == "bs4":
+        links = _find_links_bs4(html_content)
+    else:
+        raise ValueError(f"Unknown extraction engine: {engine}")
+    return None if links is None else list(dict.fromkeys(links))
+
+
+def extract_download_links_from_html(html_content, log_callback, engine=DEFAULT_ENGINE):
+    """Extracts unique download URLs (in page order) from the provided HTML content.
+
+    The default "stream" engine never builds a DOM; "bs4" uses the full
+    BeautifulSoup tree and is kept for verification.
+    """
+    log_callback("Parsing HTML for download links...")
+    with span("parse html", engine=engine, bytes=len(html_content)):
+        download_urls = find_download_links(html_content, engine=engine)
+    if download_urls is None:
+        log_callback("WARNING: Download section not found. HTML structure might have changed.")
+        return []
+    if not download_urls:
+        log_callback("WARNING: No download links (<a> tags with 'btn-success') found in section.")
+        return []
+
+    log_callback(f"Found {len(download_urls)} potential download links.")
+    return download_urls
@@ -0,0 +1,82 @@
+"""Bounded-concurrency fetching of many content pages into one download queue."""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_FETCH_WORKERS = 4
+
+
+def _is_page_reference(entry):
+    return entry.startswith(('http://', 'https://', 'file:///')) or os.path.exists(entry)
+
+
+def parse_page_list(text):
+    """Turns the URL field into a list of content pages.
+
+    Accepts a single URL/path, several URLs separated by whitespace or commas,
+    or the path of a .txt file listing one page per line (like links.txt).
+    Lines that are not URLs or existing files are ignored.
+    """
+    text = (text or "").strip()
+    if not text:
+        return []
+    if os.path.isfile(text):
+        if not text.lower().endswith('.txt'):
+            return [text] # A single saved HTML page (its path may contain spaces)
+        with open(text, 'r', encoding='utf-8', errors='replace') as f:
+            entries = [line.strip() for line in f]
+    else:
+        entries = text.replace(',', ' ').split()
+    return list(dict.fromkeys(e for e in entries if e and _is_page_reference(e)))
+
+
+def fetch_pages_concurrently(page_urls, fetch_page, log_callback, max_workers=DEFAULT_FETCH_WORKERS,
+                             page_progress_callback=None, overall_progress_callback=None):
+    """Fetches and extracts many pages in parallel and merges their links.
+
+    `fetch_page(url, log_callback, progress_callback)` must return a list of
+    links (or None/[] on failure). Links are merged in page order with
+    duplicates removed. Returns (links, failed_pages).
+    """
+    total = len(page_urls)
+    if not total:
+        return [], []
+
+    page_fractions = [0.0] * total
+    progress_lock = threading.Lock()
+
+    def report(index, fraction):
+        with progress_lock:
+            page_fractions[index] = fraction
+            overall = sum(page_fractions) / total
+        if page_progress_callback: page_progress_callback(index, fraction)
+        if overall_progress_callback: overall_progress_callback(overall)
+
+    def run(index, url):
+        prefix = f"[page {index + 1}/{total}] "
+        page_log = lambda message: log_callback(prefix + message)
+        try:
+            return fetch_page(url, page_log, lambda fraction: report(index, fraction))
+        except Exception as e:
+            page_log(f"ERROR: Unexpected failure fetching {url}: {e}")
+            return None
+
+    results = [None] * total
+    completed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total)), thread_name_prefix="page-fetch") as pool:
+        futures = {pool.submit(run, i, url): i for i, url in enumerate(page_urls)}
+        for future in as_completed(futures):
+            index = futures[future]
+            results[index] = future.result()
+            completed += 1
+            report(index, 1.0)
+            log_callback(f"Pages done: {completed}/{total} ({len(results[index] or [])} links from page {index + 1}).")
+
+    merged = []
+    failed_pages = []
+    for url, links in zip(page_urls, results):
+        if links:
+            merged.extend(links)
+        else:
+            failed_pages.append(url)
+    return list(dict.fromkeys(merged)), failed_pages
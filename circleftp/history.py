@@ -0,0 +1,77 @@
+"""Persistent index of download URLs that were already dispatched."""
+import sqlite3
+import threading
+import time
+from urllib.parse import quote, unquote, urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {"http": 80, "https": 443, "ftp": 21}
+
+
+def normalize_url(url):
+    """Normalizes a URL so trivially different spellings map to the same key.
+
+    Lower-cases scheme and host, drops default ports and fragments, and
+    re-quotes the path so '%20' and ' ' (or '%5B' and '[') compare equal.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, _DEFAULT_PORTS.get(scheme)) else f"{host}:{port}"
+    if parts.username:
+        netloc = f"{parts.username}@{netloc}"
+    path = quote(unquote(parts.path), safe="/:@!$&'()*+,;=-._~")
+    return urlunsplit((scheme, netloc, path or "/", parts.query, ""))
+
+
+class SentHistory:
+    """SQLite-backed set of normalized URLs, safe to use from worker threads."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sent_urls ("
+                " url TEXT PRIMARY KEY,"
+                " original_url TEXT NOT NULL,"
+                " sent_at REAL NOT NULL"
+                ") WITHOUT ROWID"
+            )
+
+    def filter_unsent(self, urls):
+        """Splits urls into (unsent, already_sent), preserving order."""
+        unsent, already_sent = [], []
+        with self._lock:
+            for url in urls:
+                row = self._conn.execute("SELECT 1 FROM sent_urls WHERE url = ?", (normalize_url(url),)).fetchone()
+                (already_sent if row else unsent).append(url)
+        return unsent, already_sent
+
+    def mark_sent(self, urls):
+        """Records urls as dispatched."""
+        now = time.time()
+        rows = [(normalize_url(url), url, now) for url in urls]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO sent_urls (url, original_url, sent_at) VALUES (?, ?, ?)", rows)
+
+    def forget(self, urls):
+        """Removes urls from the history so they will be sent again. Returns how many were removed."""
+        with self._lock, self._conn:
+            cursor = self._conn.executemany("DELETE FROM sent_urls WHERE url = ?", [(normalize_url(url),) for url in urls])
+        return cursor.rowcount
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sent_urls").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
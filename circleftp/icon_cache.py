@@ -0,0 +1,46 @@
+"""Cache of icons already resized to the sizes the GUI uses."""
+import glob
+import hashlib
+import os
+
+from PIL import Image
+
+
+def _cache_name(source_path, size, digest):
+    stem = os.path.splitext(os.path.basename(source_path))[0]
+    return f"{stem}-{size[0]}x{size[1]}-{digest}.png"
+
+
+def load_resized_icon(source_path, size, cache_dir):
+    """Returns source_path resized to size, reusing a cached bitmap when possible.
+
+    Cache entries are keyed by a hash of the source file's bytes, so an entry
+    is rebuilt only when the asset itself changes. Cache write failures are
+    ignored; the resized image is still returned.
+    """
+    with open(source_path, "rb") as f:
+        digest = hashlib.sha1(f.read()).hexdigest()[:16]
+    cached_path = os.path.join(cache_dir, _cache_name(source_path, size, digest))
+
+    if os.path.exists(cached_path):
+        try:
+            image = Image.open(cached_path)
+            image.load() # Read now so the file handle is released
+            return image
+        except OSError:
+            pass # Corrupt entry: rebuild below
+
+    image = Image.open(source_path)
+    image = image.resize(size, Image.Resampling.LANCZOS)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Drop entries built from an older version of this asset
+        for stale_path in glob.glob(os.path.join(glob.escape(cache_dir), _cache_name(source_path, size, "*"))):
+            if stale_path != cached_path:
+                os.remove(stale_path)
+        temp_path = cached_path + ".tmp"
+        image.save(temp_path, format="PNG")
+        os.replace(temp_path, cached_path)
+    except OSError:
+        pass
+    return image
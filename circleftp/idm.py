@@ -0,0 +1,166 @@
+"""Internet Download Manager (IDM) command-line integration."""
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from circleftp.tracing import span
+
+# Hide the console window on Windows; the flag does not exist elsewhere
+NO_WINDOW_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# Start IDM independently of this app's console/process group (Windows only)
+DETACHED_FLAGS = getattr(subprocess, "DETACHED_PROCESS", 0)
+
+DEFAULT_DISPATCH_WORKERS = 4
+IDM_PROCESS_NAME = "idman.exe"
+DEFAULT_LAUNCH_TIMEOUT = 10.0 # Seconds to wait for a freshly launched IDM to show up
+
+
+def _display_name(url):
+    """Shortens a URL to its file name for log output."""
+    return os.path.basename(url.split('?')[0])
+
+
+def _run_idm(command):
+    with span(f"idm {command[1]}"): # "idm /d" per link, "idm /s" per batch
+        subprocess.run(command, creationflags=NO_WINDOW_FLAGS)
+
+
+def initiate_idm_direct_downloads(urls, idm_exec_path, log_callback, count_progress_callback=None,
+                                  url_sent_callback=None, max_workers=DEFAULT_DISPATCH_WORKERS, cancel_event=None):
+    """Sends a list of URLs to IDM for downloading.
+
+    All links are added to the IDM queue concurrently with '/a' (add without
+    starting), then the queue is started once with '/s'. There is no
+    per-link delay. Setting cancel_event stops adding the remaining links.
+    """
+    if not urls:
+        log_callback("No URLs provided to IDM for this batch.")
+        if count_progress_callback: count_progress_callback(0)
+        return 0
+
+    log_callback(f"Sending {len(urls)} links to IDM for this batch...")
+    lock = threading.Lock()
+    abort = threading.Event()
+    state = {"sent": 0}
+
+    def add_to_queue(position, url):
+        if abort.is_set() or (cancel_event is not None and cancel_event.is_set()):
+            return
+        # IDM command-line arguments: /d <URL> /n (no questions) /a (add to queue, don't start)
+        command = [idm_exec_path, '/d', url, '/n', '/a']
+        try:
+            _run_idm(command)
+        except FileNotFoundError:
+            if not abort.is_set():
+                abort.set()
+                log_callback(f"ERROR: IDM executable not found at '{idm_exec_path}'. Aborting batch.")
+            return
+        except Exception as e:
+            log_callback(f"ERROR sending {_display_name(url)} to IDM: {e}")
+            return
+        with lock:
+            state["sent"] += 1
+            sent = state["sent"]
+        log_callback(f"[{position}/{len(urls)}] Queued: {_display_name(url)}")
+        if url_sent_callback:
+            url_sent_callback(url)
+        if count_progress_callback:
+            count_progress_callback(sent)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))), thread_name_prefix="idm-dispatch") as pool:
+        for position, url in enumerate(urls, start=1):
+            pool.submit(add_to_queue, position, url)
+
+    if state["sent"]:
+        try:
+            _run_idm([idm_exec_path, '/s']) # Start the main queue once for the whole batch
+        except Exception as e:
+            log_callback(f"ERROR starting IDM queue: {e}")
+
+    log_callback(f"Sent {state['sent']}/{len(urls)} requests to IDM for this batch.")
+    return state["sent"]
+
+
+class IdmProcessWatcher:
+    """Finds the running IDM process and remembers its PID.
+
+    After the first hit, is_running() only validates that one PID (O(1));
+    the full process scan is the fallback when IDM was restarted or closed.
+    psutil is imported on first use.
+    """
+
+    def __init__(self, process_name=IDM_PROCESS_NAME):
+        self.process_name = process_name.lower()
+        self.pid = None
+        self._process = None # psutil.Process for self.pid (keeps its create_time to detect PID reuse)
+
+    def _matches(self, process):
+        try:
+            return (process.is_running() and process.name().lower() == self.process_name
+                    and process.status() != "zombie") # An exited child we launched but never reaped
+        except Exception: # psutil.NoSuchProcess / AccessDenied
+            return False
+
+    def _remember(self, process):
+        self._process = process
+        self.pid = process.pid if process else None
+
+    def is_running(self):
+        """True if IDM is running. Checks the cached PID first, then scans all processes."""
+        import psutil
+        if self._process is not None and self._matches(self._process):
+            return True
+        self._remember(None)
+        for proc in psutil.process_iter(['name']):
+            if (proc.info['name'] or '').lower() == self.process_name and self._matches(proc):
+                self._remember(proc)
+                return True
+        return False
+
+    def watch_pid(self, pid):
+        """Starts tracking a process this app launched; returns False if it is not IDM (any more)."""
+        import psutil
+        try:
+            process = psutil.Process(pid)
+        except psutil.Error:
+            return False
+        if not self._matches(process):
+            return False
+        self._remember(process)
+        return True
+
+    def launch(self, idm_exec_path, timeout=DEFAULT_LAUNCH_TIMEOUT, poll_interval=0.1):
+        """Starts IDM unless it is running, then polls until its process is up.
+
+        Returns True once IDM is running, False if it did not appear within
+        timeout seconds. Raises OSError (e.g. FileNotFoundError) if the
+        executable cannot be started.
+        """
+        if self.is_running():
+            return True
+        with span("idm launch"):
+            return self._launch_and_wait(idm_exec_path, timeout, poll_interval)
+
+    def _launch_and_wait(self, idm_exec_path, timeout, poll_interval):
+        launched = subprocess.Popen(idm_exec_path, creationflags=DETACHED_FLAGS, close_fds=True)
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.watch_pid(launched.pid):
+                return True
+            # A second instance may hand over to an existing one and exit; look for that one too
+            if launched.poll() is not None and self.is_running():
+                return True
+            if time.monotonic() >= deadline:
+                return self.is_running()
+            time.sleep(poll_interval)
+
+
+def write_idm_export_file(urls, file_path):
+    """Writes urls as an IDM .ef2 export file for Tasks > Import in IDM."""
+    with open(file_path, 'w', encoding='utf-8', newline='\r\n') as f:
+        for url in urls:
+            f.write(f"<\n{url}\n>\n")
+    return file_path
@@ -0,0 +1,79 @@
+"""Thread-safe, bounded log buffer that the GUI drains in batches."""
+import collections
+import os
+import queue
+import threading
+import time
+
+DEFAULT_MAX_LINES = 2000           # Lines kept visible in the log textbox
+DEFAULT_SPILL_MAX_BYTES = 5 * 1024 * 1024
+
+
+class LogSink:
+    """Collects log messages from any thread; the UI drains them at a fixed rate.
+
+    Only the newest `max_lines` lines stay visible. Older lines are appended
+    to `spill_path` (rotated to '<name>.1' once it exceeds spill_max_bytes)
+    instead of growing the widget forever.
+    """
+
+    def __init__(self, max_lines=DEFAULT_MAX_LINES, spill_path=None, spill_max_bytes=DEFAULT_SPILL_MAX_BYTES):
+        self.max_lines = max(1, max_lines)
+        self.spill_path = spill_path
+        self.spill_max_bytes = spill_max_bytes
+        self._queue = queue.SimpleQueue()
+        self._visible = collections.deque() # Lines currently shown (only touched by the draining thread)
+        self._spill_lock = threading.Lock()
+
+    def write(self, message):
+        """Queues a message. Cheap and safe to call from worker threads."""
+        self._queue.put(str(message))
+
+    def drain(self, max_messages=10000):
+        """Takes pending messages off the queue.
+
+        Returns (new_lines, lines_to_remove): the lines to append to the widget
+        and how many of its oldest lines to delete to respect max_lines.
+        """
+        new_lines = []
+        for _ in range(max_messages):
+            try:
+                new_lines.extend(self._queue.get_nowait().split("\n"))
+            except queue.Empty:
+                break
+        if not new_lines:
+            return [], 0
+
+        overflow = len(self._visible) + len(new_lines) - self.max_lines
+        spilled = []
+        lines_to_remove = 0
+        if overflow > 0:
+            lines_to_remove = min(overflow, len(self._visible))
+            spilled = [self._visible.popleft() for _ in range(lines_to_remove)]
+            if len(new_lines) > self.max_lines: # A burst larger than the whole view
+                spilled.extend(new_lines[:-self.max_lines])
+                new_lines = new_lines[-self.max_lines:]
+        self._visible.extend(new_lines)
+        if spilled:
+            self._spill(spilled)
+        return new_lines, lines_to_remove
+
+    def clear(self):
+        """Forgets the visible lines (the widget was cleared); they are kept in the spill file."""
+        if self._visible:
+            self._spill(list(self._visible))
+        self._visible.clear()
+
+    def _spill(self, lines):
+        if not self.spill_path:
+            return
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._spill_lock:
+            try:
+                os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+                if os.path.exists(self.spill_path) and os.path.getsize(self.spill_path) > self.spill_max_bytes:
+                    os.replace(self.spill_path, self.spill_path + ".1")
+                with open(self.spill_path, "a", encoding="utf-8") as f:
+                    f.writelines(f"{stamp} {line}\n" for line in lines)
+            except OSError:
+                pass # Losing old log lines must never break the UI
@@ -0,0 +1,79 @@
+"""On-disk cache of fetched content pages and the links extracted from them."""
+import gzip
+import hashlib
+import json
+import os
+import time
+
+DEFAULT_TTL_MINUTES = 360
+
+
+class PageCache:
+    """Stores the link list (and optionally the raw HTML/API body) per normalized page URL.
+
+    Entries younger than `ttl` seconds are used as-is. Older entries keep
+    their ETag/Last-Modified validators so the API path can revalidate them
+    with a conditional request instead of downloading the post again.
+    A ttl of 0 makes every entry stale, so pages are always revalidated or fetched.
+    """
+
+    def __init__(self, cache_dir, ttl=DEFAULT_TTL_MINUTES * 60):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+
+    def _paths(self, url):
+        from circleftp.history import normalize_url # Keeps sqlite3 out of start-up imports
+        key = hashlib.sha1(normalize_url(url).encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body.gz"
+
+    def get(self, url):
+        """Returns the cached entry for url (fresh or stale), or None."""
+        entry_path, _ = self._paths(url)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or not isinstance(entry.get("links"), list):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        return self.ttl > 0 and time.time() - entry.get("fetched_at", 0) < self.ttl
+
+    def put(self, url, links, body=None, etag=None, last_modified=None, source=None):
+        """Saves the links for url; body (HTML or API JSON text) is stored compressed next to it."""
+        entry_path, body_path = self._paths(url)
+        entry = {"url": url, "fetched_at": time.time(), "links": list(links), "source": source,
+                 "etag": etag, "last_modified": last_modified}
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if body is not None:
+                with gzip.open(body_path + ".tmp", "wt", encoding="utf-8") as f:
+                    f.write(body)
+                os.replace(body_path + ".tmp", body_path)
+            with open(entry_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(entry_path + ".tmp", entry_path)
+        except OSError:
+            pass # The cache is an optimization; a failed write only costs a re-fetch
+
+    def touch(self, url, entry):
+        """Marks a revalidated (304 Not Modified) entry as fresh again."""
+        entry_path, _ = self._paths(url)
+        entry["fetched_at"] = time.time()
+        try:
+            with open(entry_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(entry_path + ".tmp", entry_path)
+        except OSError:
+            pass
+
+    def invalidate(self, url):
+        """Drops the entry for url (links, validators and body), e.g. for a forced refresh."""
+        for path in self._paths(url):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,205 @@
+"""GUI-independent fetch -> extract -> dispatch pipeline.
+
+Heavy dependencies (requests, Selenium, psutil) are imported inside the
+functions that need them, so a run only loads what it actually uses.
+"""
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+from circleftp.backends import create_backend
+from circleftp.extract import DEFAULT_ENGINE, extract_download_links_from_html
+from circleftp.fetch_queue import DEFAULT_FETCH_WORKERS, fetch_pages_concurrently
+from circleftp.idm import DEFAULT_DISPATCH_WORKERS
+from circleftp.tracing import span
+
+
+# --- Utility Functions ---
+def is_connected_to_internet(host="8.8.8.8", port=53, timeout=3):
+    """Checks for an active internet connection."""
+    try:
+        socket.create_connection((host, port), timeout=timeout).close()
+        return True
+    except OSError:
+        return False
+
+
+def target_endpoints(page_urls, api_fetch=True, api_base_url=None):
+    """Returns the (host, port) pairs fetching page_urls will connect to first.
+
+    '/content/<id>' pages go to the JSON API host when api_fetch is on;
+    other web pages go to their own host. Local files need no network.
+    """
+    from circleftp.api import DEFAULT_API_BASE_URL, parse_content_id
+    endpoints = []
+    for url in page_urls:
+        if not is_web_url(url):
+            continue
+        parts = urlsplit(api_base_url or DEFAULT_API_BASE_URL) if api_fetch and parse_content_id(url) else urlsplit(url)
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+        except ValueError:
+            port = 443 if parts.scheme == "https" else 80
+        if parts.hostname:
+            endpoints.append((parts.hostname, port))
+    return list(dict.fromkeys(endpoints))
+
+
+def unreachable_endpoints(endpoints, timeout=3):
+    """Opens a TCP connection to every (host, port) in parallel; returns the ones that failed."""
+    if not endpoints:
+        return []
+    with span("reachability probe", hosts=len(endpoints)), \
+            ThreadPoolExecutor(max_workers=min(8, len(endpoints)), thread_name_prefix="reachability") as pool:
+        reachable = list(pool.map(lambda endpoint: is_connected_to_internet(*endpoint, timeout=timeout), endpoints))
+    return [endpoint for endpoint, ok in zip(endpoints, reachable) if not ok]
+
+
+def needs_browser(page_urls, api_fetch=True, cache=None):
+    """True if some web page cannot be served by the JSON API (or a fresh cache entry) and will have to be rendered."""
+    from circleftp.api import parse_content_id
+
+    def is_cached(url):
+        entry = cache.get(url) if cache else None
+        return bool(entry) and cache.is_fresh(entry)
+
+    return any(is_web_url(url) and not (api_fetch and parse_content_id(url)) and not is_cached(url) for url in page_urls)
+
+
+def is_web_url(url_or_path):
+    return url_or_path.startswith(('http://', 'https://'))
+
+
+def local_html_path(url_or_path):
+    """Returns the filesystem path for a local page (plain path or file:/// URI), or None."""
+    if url_or_path.startswith('file:///'):
+        path = unquote(urlsplit(url_or_path).path)
+        if os.name == 'nt' and path[2:3] == ':': # "/C:/..." -> "C:/..."
+            path = path[1:]
+        return path
+    if not is_web_url(url_or_path) and os.path.exists(url_or_path):
+        return url_or_path
+    return None
+
+
+def make_driver_pool(max_size=1, log_callback=None, page_load_strategy=None, block_resources=True):
+    """Creates a WebDriverPool whose drivers import Selenium only when the first one boots.
+
+    The pool's `page_load_strategy` ("eager", "none" or "normal"; None for
+    the default) and `block_resources` attributes apply to drivers booted
+    after they are changed.
+    """
+    from circleftp.driver_pool import WebDriverPool
+
+    def create_driver(browser_type):
+        from circleftp.browser import create_webdriver
+        return create_webdriver(browser_type, page_load_strategy=pool.page_load_strategy,
+                                block_resources=pool.block_resources)
+
+    pool = WebDriverPool(create_driver, max_size=max_size, log_callback=log_callback)
+    pool.page_load_strategy = page_load_strategy
+    pool.block_resources = block_resources
+    return pool
+
+
+# --- Fetch & Extract ---
+def make_page_cache(ttl_minutes, cache_dir=None):
+    """Creates the PageCache used for web pages (ttl_minutes=0 always fetches, but still records)."""
+    from circleftp.page_cache import PageCache
+    from circleftp.settings import PAGE_CACHE_DIR
+    return PageCache(cache_dir or PAGE_CACHE_DIR, ttl=max(0, ttl_minutes) * 60)
+
+
+def fetch_page_links(url_or_path, log_callback, progress_callback=None, browser_type="chrome",
+                     api_fetch=True, api_base_url=None, driver_pool=None, engine=DEFAULT_ENGINE,
+                     cache=None, refresh=False):
+    """Fetches one content page and returns its links, or None on failure.
+
+    Web URLs are answered from `cache` (a PageCache) while fresh; refresh
+    drops their cache entry first. Otherwise they go through the JSON API
+    first and fall back to Selenium. Saved pages are read straight from
+    disk; Selenium is only used for them if the file has no download
+    section (e.g. it still needs JavaScript to render).
+    """
+    if not is_web_url(url_or_path):
+        cache = None # Saved files are cheap to re-read and may change without a new URL
+    if cache and refresh:
+        cache.invalidate(url_or_path) # Nothing below may reuse the old links or revalidate against them
+    elif cache:
+        cached = cache.get(url_or_path)
+        if cached and cache.is_fresh(cached):
+            age_minutes = int((time.time() - cached.get("fetched_at", 0)) / 60)
+            log_callback(f"Using {len(cached['links'])} cached links for {url_or_path} (fetched {age_minutes} min ago).")
+            if progress_callback: progress_callback(1.0)
+            return cached["links"]
+
+    if is_web_url(url_or_path) and api_fetch:
+        from circleftp.api import get_download_links_api
+        links = get_download_links_api(url_or_path, log_callback, progress_callback, base_url=api_base_url,
+                                       cache=cache)
+        if links is not None:
+            return links
+        log_callback("API fetch unavailable; falling back to browser fetch.")
+
+    local_path = local_html_path(url_or_path)
+    if local_path:
+        log_callback(f"Reading local HTML: {local_path}")
+        try:
+            with open(local_path, 'r', encoding='utf-8', errors='replace') as f:
+                html_content = f.read()
+        except OSError as e:
+            log_callback(f"ERROR: Could not read '{local_path}': {e}")
+            return None
+        links = extract_download_links_from_html(html_content, log_callback, engine=engine)
+        if links:
+            if progress_callback: progress_callback(1.0)
+            return links
+        log_callback("No links in the saved file as-is; rendering it with the browser.")
+
+    # The links are read from the rendered DOM; page_source is never serialized
+    from circleftp.browser import get_download_links_selenium
+    links = get_download_links_selenium(url_or_path, browser_type, log_callback, progress_callback, driver_pool=driver_pool)
+    if cache and links:
+        cache.put(url_or_path, links, source="browser")
+    return links
+
+
+def fetch_links(page_urls, log_callback, progress_callback=None, fetch_workers=DEFAULT_FETCH_WORKERS, **fetch_options):
+    """Fetches one or many content pages. Returns (links, failed_pages).
+
+    fetch_options are passed on to fetch_page_links (browser_type, api_fetch, ...).
+    """
+    def fetch_one(url, page_log, page_progress):
+        with span("fetch page", url=url):
+            return fetch_page_links(url, page_log, page_progress, **fetch_options)
+
+    with span("fetch pages", pages=len(page_urls)):
+        if len(page_urls) == 1:
+            links = fetch_one(page_urls[0], log_callback, progress_callback)
+            return (links or []), ([] if links is not None else list(page_urls))
+
+        log_callback(f"Fetching {len(page_urls)} content pages ({min(fetch_workers, len(page_urls))} at a time)...")
+        return fetch_pages_concurrently(page_urls, fetch_one, log_callback, max_workers=fetch_workers,
+                                        overall_progress_callback=progress_callback)
+
+
+# --- Dispatch ---
+def dispatch_batch(urls, log_callback, backend="idm", idm_path=None, download_dir=None, count_progress_callback=None,
+                   url_sent_callback=None, dispatch_workers=DEFAULT_DISPATCH_WORKERS):
+    """Hands a batch of links to a download backend. Returns the number sent/downloaded.
+
+    backend is a DownloadBackend, or the name of one (see BACKENDS) to
+    create just for this batch from the remaining options.
+    """
+    own_backend = isinstance(backend, str)
+    if own_backend:
+        backend = create_backend(backend, log_callback, idm_path=idm_path, download_dir=download_dir,
+                                 dispatch_workers=dispatch_workers)
+    try:
+        with span("dispatch batch", backend=backend.name, links=len(urls)):
+            return backend.submit_batch(urls, count_progress_callback, url_sent_callback)
+    finally:
+        if own_backend:
+            backend.close()
@@ -0,0 +1,89 @@
+"""Shared progress model: workers update counters, the UI polls a snapshot."""
+import threading
+
+# Share of the overall progress bar taken by each phase of a run
+DEFAULT_PHASES = (("fetch", 0.40), ("extract", 0.10), ("dispatch", 0.50))
+
+
+class ProgressModel:
+    """Per-phase progress counters that are cheap to update from any thread.
+
+    Workers call set_fraction() or set_count(); nothing is scheduled on
+    the UI thread. The GUI (or a headless reporter) reads overall() at its
+    own pace.
+    """
+
+    def __init__(self, phases=DEFAULT_PHASES):
+        self.weights = dict(phases)
+        self._lock = threading.Lock()
+        self._done = {}
+        self._total = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._done = {phase: 0.0 for phase in self.weights}
+            self._total = {phase: 1.0 for phase in self.weights}
+
+    def set_fraction(self, phase, fraction):
+        """Sets a phase's completion as a 0..1 fraction."""
+        with self._lock:
+            self._done[phase] = min(max(float(fraction), 0.0), 1.0)
+            self._total[phase] = 1.0
+
+    def set_count(self, phase, done, total):
+        """Sets a phase's completion as `done` out of `total` items."""
+        with self._lock:
+            self._total[phase] = float(max(total, 0))
+            self._done[phase] = float(min(max(done, 0), total))
+
+    def complete(self, *phases):
+        """Marks the given phases (all phases if none are given) as finished."""
+        with self._lock:
+            for phase in phases or self.weights:
+                self._done[phase] = self._total[phase] = 1.0
+
+    def _fraction(self, phase):
+        total = self._total[phase]
+        return self._done[phase] / total if total else 1.0 # A phase with nothing to do counts as done
+
+    def overall(self):
+        """Weighted completion of the whole run, 0..1."""
+        with self._lock:
+            return sum(weight * self._fraction(phase) for phase, weight in self.weights.items())
+
+    def snapshot(self):
+        """Returns {phase: (done, total)} plus the 'overall' fraction."""
+        with self._lock:
+            snapshot = {phase: (self._done[phase], self._total[phase]) for phase in self.weights}
+        snapshot["overall"] = self.overall()
+        return snapshot
+
+    def describe(self):
+        """One-line text summary, e.g. 'fetch 100% | extract 100% | dispatch 3/10 | 65%'."""
+        snapshot = self.snapshot()
+        parts = []
+        for phase in self.weights:
+            done, total = snapshot[phase]
+            parts.append(f"{phase} {int(done)}/{int(total)}" if total > 1 else f"{phase} {done / total if total else 1:.0%}")
+        parts.append(f"{snapshot['overall']:.0%}")
+        return " | ".join(parts)
+
+
+def start_reporter(model, report, interval=1.0):
+    """Calls report(model) every `interval` seconds from a daemon thread while it changes.
+
+    Returns a threading.Event; set it to stop the reporter.
+    """
+    stop_event = threading.Event()
+
+    def poll():
+        last_value = None
+        while not stop_event.wait(interval):
+            value = model.overall()
+            if value != last_value:
+                report(model)
+                last_value = value
+
+    threading.Thread(target=poll, daemon=True).start()
+    return stop_event
@@ -0,0 +1,171 @@
+"""Completion-driven scheduling that keeps N downloads in flight."""
+import os
+import re
+import threading
+import time
+from urllib.parse import unquote, urlsplit
+
+# Names of files that are still being written by browsers/download managers
+PARTIAL_SUFFIXES = (".part", ".crdownload", ".tmp", ".download", ".partial", ".cfdl.json")
+
+
+def url_file_name(url):
+    return os.path.basename(unquote(urlsplit(url).path))
+
+
+class AutoContinueScheduler:
+    """Dispatches links so that `target_in_flight` downloads are always active.
+
+    `dispatch(url)` hands one link to the download backend and returns True on
+    success. The backend (or a DirectoryWatcher) reports finished downloads
+    through `notify_completed`, which frees a slot for the next link.
+    """
+
+    def __init__(self, urls, dispatch, target_in_flight, log_callback, sent_callback=None):
+        self.pending = list(urls)
+        self.total = len(self.pending)
+        self.dispatch = dispatch
+        self.target_in_flight = max(1, target_in_flight)
+        self.log_callback = log_callback
+        self.sent_callback = sent_callback
+
+        self.in_flight = {}  # url -> file name expected on disk
+        self.dispatched = 0
+        self.completed = 0
+        self._condition = threading.Condition()
+        self._stopped = False
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    @property
+    def stopped(self):
+        return self._stopped
+
+    def notify_completed(self, url=None, file_name=None):
+        """Marks a download as finished, by URL or by the file name that appeared on disk.
+
+        A file name that matches no link in flight is ignored: the watched
+        folder (usually ~/Downloads) also receives browser downloads and
+        screenshots, and those must not free a slot.
+        """
+        with self._condition:
+            if url is None and file_name is not None:
+                url = self._match_file(file_name)
+                if url is None:
+                    self.log_callback(f"Auto-continue: ignoring '{file_name}' (matches no download in flight).")
+                    return
+            if url in self.in_flight:
+                del self.in_flight[url]
+                self.completed += 1
+                self._condition.notify_all()
+
+    def _match_file(self, file_name):
+        stem, ext = os.path.splitext(file_name)
+        for url, expected in self.in_flight.items():
+            expected_stem, expected_ext = os.path.splitext(expected)
+            if not expected_stem:
+                continue # URL without a file name; only an exact URL report can finish it
+            if file_name == expected:
+                return url
+            # Download managers add suffixes like "_1" or " (1)" to duplicate names; S01E10 is not a copy of S01E1
+            if ext == expected_ext and re.fullmatch(re.escape(expected_stem) + r"(?:_\d+| \(\d+\))", stem):
+                return url
+        return None
+
+    def run(self, wait_for_completion=False, progress_callback=None):
+        """Dispatches all links, waiting for free slots. Blocks until done or stopped.
+
+        With wait_for_completion=True it also waits for the last downloads to
+        finish. Returns the number of links dispatched.
+        """
+        while True:
+            with self._condition:
+                while not self._stopped and self.pending and len(self.in_flight) >= self.target_in_flight:
+                    self._condition.wait()
+                if self._stopped or not self.pending:
+                    break
+                url = self.pending.pop(0)
+                self.in_flight[url] = url_file_name(url)
+
+            if self.dispatch(url):
+                self.dispatched += 1
+                if self.sent_callback: self.sent_callback(url)
+                self.log_callback(f"Auto-continue: {self.dispatched}/{self.total} dispatched, {len(self.in_flight)} in flight.")
+            else:
+                with self._condition:
+                    self.in_flight.pop(url, None)
+            if progress_callback: progress_callback(self.dispatched, self.total)
+
+        if wait_for_completion:
+            with self._condition:
+                while not self._stopped and self.in_flight:
+                    self._condition.wait()
+        return self.dispatched
+
+
+class DirectoryWatcher:
+    """Polls a download folder and reports files that appeared and stopped growing.
+
+    A new file counts as finished once its size and modification time have
+    been unchanged for `debounce` seconds. Files present when watching starts
+    and partial-download files are ignored. With include_subfolders=True the
+    direct subfolders are watched too (IDM sorts downloads into category
+    folders such as Video/ and Compressed/).
+    """
+
+    def __init__(self, directory, on_file_finished, poll_interval=2.0, debounce=5.0, include_subfolders=False):
+        self.directory = directory
+        self.include_subfolders = include_subfolders
+        self.on_file_finished = on_file_finished
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._stop = threading.Event()
+        self._thread = None
+        self._known = set()
+        self._candidates = {} # path -> (size, mtime, first seen stable at)
+
+    def _scan(self, directory, entries, descend):
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if entry.is_dir() and descend:
+                        self._scan(entry.path, entries, False)
+                    elif entry.is_file() and not entry.name.lower().endswith(PARTIAL_SUFFIXES):
+                        stat = entry.stat()
+                        entries[entry.path] = (stat.st_size, stat.st_mtime)
+        except OSError:
+            pass
+
+    def _snapshot(self):
+        """Returns {path: (size, mtime)} for the watched files."""
+        entries = {}
+        self._scan(self.directory, entries, self.include_subfolders)
+        return entries
+
+    def start(self):
+        self._known = set(self._snapshot())
+        self._thread = threading.Thread(target=self._run, name="download-dir-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval * 2)
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            now = time.monotonic()
+            for path, (size, mtime) in self._snapshot().items():
+                if path in self._known:
+                    continue
+                previous = self._candidates.get(path)
+                if previous is None or previous[:2] != (size, mtime):
+                    self._candidates[path] = (size, mtime, now)
+                elif now - previous[2] >= self.debounce:
+                    self._known.add(path)
+                    del self._candidates[path]
+                    self.on_file_finished(os.path.basename(path))
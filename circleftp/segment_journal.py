@@ -0,0 +1,110 @@
+"""Sidecar journal recording which byte ranges of a download are complete."""
+import hashlib
+import json
+import os
+import threading
+import time
+
+JOURNAL_SUFFIX = ".cfdl.json"
+
+
+def journal_path_for(target_path, url):
+    """The journal of url's download into target_path: '<target>.<url hash>.cfdl.json'."""
+    key = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+    return f"{target_path}.{key}{JOURNAL_SUFFIX}"
+
+
+class SegmentJournal:
+    """Tracks per-segment progress of one download and persists it atomically.
+
+    Each segment is a dict with 'start', 'end' (inclusive, or None for an
+    unknown size) and 'done' (bytes written from 'start'). The server's
+    validators (ETag, Last-Modified, Content-Length) are stored too, so a
+    resume only happens when the remote file is provably unchanged. The
+    journal file is keyed by target path and URL, so two links never share one.
+    """
+
+    def __init__(self, target_path, url, total_size, etag=None, last_modified=None, segments=None, save_interval=1.0):
+        self.path = journal_path_for(target_path, url)
+        self.url = url
+        self.total_size = total_size
+        self.etag = etag
+        self.last_modified = last_modified
+        self.segments = segments or []
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._last_save = 0.0
+
+    @classmethod
+    def load(cls, target_path, url):
+        """Returns url's journal stored next to target_path, or None if missing/unreadable."""
+        try:
+            with open(journal_path_for(target_path, url), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data["url"] != url:
+                return None
+            return cls(target_path, url, data["total_size"], data.get("etag"),
+                       data.get("last_modified"), data["segments"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def matches(self, url, total_size, etag, last_modified):
+        """True if the journal describes the same remote file."""
+        if url != self.url or total_size != self.total_size or total_size is None:
+            return False
+        if etag and self.etag:
+            return etag == self.etag
+        if last_modified and self.last_modified:
+            return last_modified == self.last_modified
+        return False # Without a validator we cannot prove the file is unchanged
+
+    def remaining_bytes(self):
+        return sum((s["end"] - s["start"] + 1) - s["done"] for s in self.segments if s["end"] is not None)
+
+    def completed_bytes(self):
+        return sum(s["done"] for s in self.segments)
+
+    def advance(self, index, byte_count, fileno=None):
+        """Records byte_count more bytes written for segment index; saves periodically.
+
+        fileno, if given, is fsynced before the journal is written so the
+        journal never claims bytes that are not on disk. Writers must use
+        unbuffered file objects for this to cover every segment.
+        """
+        with self._lock:
+            self.segments[index]["done"] += byte_count
+            due = time.monotonic() - self._last_save >= self.save_interval
+            if due:
+                self._last_save = time.monotonic()
+        if due:
+            if fileno is not None:
+                os.fsync(fileno)
+            self.save()
+
+    def save(self):
+        with self._save_lock:
+            self._write()
+
+    def _write(self):
+        with self._lock:
+            data = {
+                "url": self.url,
+                "total_size": self.total_size,
+                "etag": self.etag,
+                "last_modified": self.last_modified,
+                "segments": [dict(s) for s in self.segments],
+            }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path) # Atomic: readers see the old or the new journal, never half of one
+
+    def delete(self):
+        for path in (self.path, self.path + ".tmp"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,81 @@
+"""Append-only journal of the current batch session, so a closed or crashed app can resume."""
+import json
+import os
+import threading
+import time
+
+
+class SessionJournal:
+    """Records the extracted link list once, then one line per dispatch checkpoint.
+
+    The file is JSON lines: a 'start' record (written to a temp file and
+    swapped in with os.replace) followed by small 'progress' records that
+    are appended and fsynced. A torn last line from a crash is ignored on
+    load, so the journal never points past what was really recorded.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._last_index = None
+
+    def start(self, source, links, backend=None):
+        """Begins a new session, replacing any previous journal."""
+        record = {"event": "start", "time": time.time(), "source": source, "backend": backend, "links": list(links)}
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self._last_index = 0
+
+    def record_progress(self, index):
+        """Appends a checkpoint: links[:index] have been dispatched."""
+        with self._lock:
+            if index == self._last_index or not os.path.exists(self.path):
+                return
+            line = (json.dumps({"event": "progress", "index": index}) + "\n").encode("utf-8")
+            with open(self.path, "a+b") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n": # Start a fresh line after a torn write
+                        line = b"\n" + line
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._last_index = index
+
+    def finish(self):
+        """Ends the session; there is nothing left to resume."""
+        with self._lock:
+            for path in (self.path, self.path + ".tmp"):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            self._last_index = None
+
+    def load(self):
+        """Returns the unfinished session as a dict (source, backend, links, index, time), or None."""
+        session = None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue # Torn write; later lines are still valid
+                    if record.get("event") == "start":
+                        session = {"source": record.get("source"), "backend": record.get("backend"),
+                                   "links": record.get("links") or [], "index": 0, "time": record.get("time")}
+                    elif record.get("event") == "progress" and session is not None:
+                        session["index"] = int(record.get("index", session["index"]))
+        except (OSError, ValueError, TypeError, AttributeError):
+            return None
+        if not session or session["index"] >= len(session["links"]):
+            return None
+        return session
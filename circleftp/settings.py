@@ -0,0 +1,46 @@
+"""Paths and persisted user settings shared by the GUI and the command line."""
+import json
+import os
+import sys
+
+# --- Base Directory Configuration (for .exe bundling) ---
+if getattr(sys, 'frozen', False): # Running as a bundled exe
+    BUNDLE_DIR = sys._MEIPASS
+else: # Running from source: the project root (parent of this package)
+    BUNDLE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# --- Configuration File for User Settings ---
+# Stored in user's home directory for persistence.
+CONFIG_DIR = os.path.join(os.path.expanduser('~'), 'CircleFTPDownloaderConfig')
+CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
+SENT_HISTORY_FILE = os.path.join(CONFIG_DIR, "sent_history.sqlite3") # URLs already sent to IDM
+ICON_CACHE_DIR = os.path.join(CONFIG_DIR, "icon_cache") # Icons pre-resized for the GUI
+LOG_SPILL_FILE = os.path.join(CONFIG_DIR, "logs", "activity.log") # Log lines scrolled out of the GUI
+PAGE_CACHE_DIR = os.path.join(CONFIG_DIR, "page_cache") # Links (and raw pages) fetched recently
+TRACE_FILE = os.path.join(CONFIG_DIR, "traces", "last_run.json") # Chrome trace-event timings of the last run
+CATALOG_FILE = os.path.join(CONFIG_DIR, "catalog.sqlite3") # Content IDs, titles and links from catalog crawls
+SESSION_JOURNAL_FILE = os.path.join(CONFIG_DIR, "session.jsonl") # Links and progress of an unfinished batch run
+
+DEFAULT_IDM_PATH = r"C:\Program Files (x86)\Internet Download Manager\IDMan.exe"
+DEFAULT_DOWNLOAD_DIR = os.path.join(os.path.expanduser('~'), 'Downloads', 'CircleFTP') # Built-in downloader target
+DEFAULT_IDM_DOWNLOAD_DIR = os.path.join(os.path.expanduser('~'), 'Downloads') # Watched for finished IDM downloads
+
+# --- Resource Directories ---
+DRIVER_DIR = os.path.join(BUNDLE_DIR, "drivers")
+ASSETS_DIR = os.path.join(BUNDLE_DIR, "assets")
+
+CHROMEDRIVER_PATH = os.path.join(DRIVER_DIR, "chromedriver.exe")
+GECKODRIVER_PATH = os.path.join(DRIVER_DIR, "geckodriver.exe")
+EDGEDRIVER_PATH = os.path.join(DRIVER_DIR, "msedgedriver.exe")
+
+
+def load_config():
+    """Returns the saved settings, or {} if there is no config file.
+
+    Raises ValueError (json.JSONDecodeError) if the file is corrupted.
+    """
+    if not os.path.exists(CONFIG_FILE):
+        return {}
+    with open(CONFIG_FILE, 'r') as f:
+        config = json.load(f)
+    return config if isinstance(config, dict) else {}
@@ -0,0 +1,108 @@
+"""Lightweight timing spans for one run, exportable as Chrome trace-event JSON.
+
+Code marks phases with `with span("driver.get"):`. Spans are only recorded
+while a Tracer is active (start_trace() ... stop_trace()), so the calls cost
+next to nothing otherwise. Open the exported file in chrome://tracing or
+https://ui.perfetto.dev.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_active = None # The Tracer spans are recorded into, or None
+
+
+def _format_duration(seconds):
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:.2f}s"
+
+
+class Tracer:
+    """Thread-safe collection of completed spans."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = [] # (name, start, end, thread id, thread name, args)
+        self.started = time.perf_counter()
+
+    def add(self, name, start, end, args=None):
+        thread = threading.current_thread()
+        with self._lock:
+            self._events.append((name, start, end, thread.ident, thread.name, args or {}))
+
+    @contextmanager
+    def span(self, name, **args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter(), args)
+
+    def totals(self):
+        """Returns {name: (total seconds, count, longest seconds)} in order of first start."""
+        totals = {}
+        with self._lock:
+            events = sorted(self._events, key=lambda event: event[1])
+        for name, start, end, _, _, _ in events:
+            total, count, longest = totals.get(name, (0.0, 0, 0.0))
+            totals[name] = (total + end - start, count + 1, max(longest, end - start))
+        return totals
+
+    def summary(self):
+        """One log line: total time per phase, with counts for repeated phases."""
+        parts = []
+        for name, (total, count, longest) in self.totals().items():
+            parts.append(f"{name} {_format_duration(total)}"
+                         + (f" (x{count}, max {_format_duration(longest)})" if count > 1 else ""))
+        wall = time.perf_counter() - self.started
+        return f"Timings ({_format_duration(wall)} total): " + (", ".join(parts) if parts else "no phases recorded")
+
+    def to_chrome_trace(self):
+        """Returns the spans as a Chrome trace-event document ("X" complete events, microseconds)."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+        trace_events = []
+        thread_names = {}
+        for name, start, end, tid, thread_name, args in events:
+            thread_names[tid] = thread_name
+            trace_events.append({"name": name, "cat": "circleftp", "ph": "X", "pid": pid, "tid": tid,
+                                 "ts": round((start - self.started) * 1e6), "dur": round((end - start) * 1e6),
+                                 "args": {key: str(value) for key, value in args.items()}})
+        for tid, thread_name in thread_names.items():
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": thread_name}})
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def export(self, path):
+        """Writes the Chrome trace-event JSON to path (atomically). Returns path."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
+        os.replace(path + ".tmp", path)
+        return path
+
+
+def start_trace():
+    """Starts recording spans into a new Tracer and returns it."""
+    global _active
+    _active = Tracer()
+    return _active
+
+
+def stop_trace():
+    """Stops recording; returns the Tracer that was active (or None)."""
+    global _active
+    tracer, _active = _active, None
+    return tracer
+
+
+@contextmanager
+def span(name, **args):
+    """Times the enclosed block as phase `name` if a trace is active."""
+    tracer = _active
+    if tracer is None:
+        yield
+        return
+    with tracer.span(name, **args):
+        yield